@@ -1,6 +1,12 @@
-from fastapi import APIRouter, File, UploadFile
-from fastapi.responses import StreamingResponse
-from app.core.author_matcher import load_fingerprints, match_author, supabase
+import asyncio
+
+from typing import Optional
+
+from fastapi import APIRouter, File, UploadFile, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.core.author_matcher import load_fingerprints, match_author
+from app.services.repositories import author_matches
+from app.services.pagination import NEXT_CURSOR_HEADER, decode_cursor, page_size, projection
 from app.core.audio_transcriber import generate_transcription_sync, generate_transcription_stream
 
 router = APIRouter()
@@ -15,16 +21,16 @@ async def upload_audio(file: UploadFile = File(...)):
 
     # 2. Match author
     fingerprints = load_fingerprints()
-    result = match_author(transcript, fingerprints)
+    result = await asyncio.to_thread(match_author, transcript, fingerprints)
 
     # 3. Save to Supabase
     try:
-        supabase.table("author_matches").insert({
+        await author_matches.insert({
             "transcript": transcript,
             "matched_author": result["author"],
             "confidence": result["confidence"],
             "raw_response": result
-        }).execute()
+        })
     except Exception as e:
         result["save_error"] = str(e)
 
@@ -73,22 +79,38 @@ async def stream_transcription(file: UploadFile = File(...)):
 
 
 @router.get("/scan-history")
-def get_scan_history():
-    response = supabase.table("author_matches").select("*").order("created_at", desc=True).limit(20).execute()
-    return response.data
+async def get_scan_history(
+    limit: Optional[int] = Query(None, description="Page size (default 50, max 200)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, or * for all"),
+):
+    """
+    Author-match history, newest first, one keyset page at a time.
+    The next page's cursor is in the X-Next-Cursor header (absent on the last page).
+    """
+    columns = projection(fields, author_matches.columns, author_matches.list_columns)
+    rows, next_cursor = await author_matches.list_page(columns, page_size(limit), decode_cursor(cursor))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return JSONResponse(content=rows, headers=headers)
+
+
+@router.get("/scan-history/summary")
+async def get_scan_history_summary(count: str = Query("estimated", pattern="^(exact|planned|estimated)$")):
+    """Total number of author matches and the newest match time."""
+    return await author_matches.summary(count)
 
 
 @router.get("/scan-history/{scan_id}")
 async def get_scan_detail(scan_id: str):
-    resp = supabase.table("author_matches").select("*").eq("id", scan_id).execute()
-    if not resp.data:
+    record = await author_matches.get(scan_id)
+    if not record:
         return {"error": "Scan not found"}
-    return resp.data[0]
+    return record
 
 
 @router.delete("/scan-history/{scan_id}")
 async def delete_scan(scan_id: str):
-    supabase.table("author_matches").delete().eq("id", scan_id).execute()
+    await author_matches.delete(scan_id)
     return {"status": "deleted"}
 
 
@@ -96,20 +118,20 @@ async def delete_scan(scan_id: str):
 async def rescan_scan(scan_id: str):
     from app.core.author_matcher import load_fingerprints, match_author
 
-    record = supabase.table("author_matches").select("*").eq("id", scan_id).execute()
-    if not record.data:
+    record = await author_matches.get(scan_id)
+    if not record:
         return {"error": "Not found"}
 
-    transcript = record.data[0]["transcript"]
-    result = match_author(transcript, load_fingerprints())
+    transcript = record["transcript"]
+    result = await asyncio.to_thread(match_author, transcript, load_fingerprints())
 
     # Update record
-    supabase.table("author_matches").update({
+    await author_matches.update(scan_id, {
         "author": result["author"],
         "confidence": float(result["confidence"]),
         "raw_scores": result["raw_scores"],
         "timestamp": result["timestamp"],
-    }).eq("id", scan_id).execute()
+    })
 
     return {"status": "rescanned"}
 
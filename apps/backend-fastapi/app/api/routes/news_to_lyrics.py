@@ -2,18 +2,13 @@ import os
 from fastapi import APIRouter, HTTPException, Query, Body
 from pydantic import BaseModel
 from typing import Optional
-from supabase import create_client
+from app.services.repositories import news
 from app.ai.lyrics_generator import generate_lyrics
 from app.ai.tts_generator import generate_vocals
 from app.services.audio_mixer import mix_audio
 
 router = APIRouter()
 
-supabase = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-)
-
 class LyricsRequest(BaseModel):
     news_id: str
     genre: str = "gangsta rap"
@@ -35,12 +30,12 @@ async def news_to_song(
     print("Generating WAV song for:", news_id)
 
     # Fetch news item
-    news_item = supabase.table("smart_news").select("*").eq("id", news_id).single().execute()
-    if not news_item.data:
+    news_item = await news.get_article(news_id)
+    if not news_item:
         raise HTTPException(status_code=404, detail="News not found")
 
-    title = news_item.data["title"]
-    summary = news_item.data["summary"]
+    title = news_item["title"]
+    summary = news_item["summary"]
 
     # Generate lyrics & vocals
     lyrics = generate_lyrics(title, summary, genre)
@@ -52,12 +47,12 @@ async def news_to_song(
     mix_audio(vocals_path, beat_path, output_path)
 
     # Save to Supabase history
-    supabase.table("news_songs").insert({
+    await news.insert_song({
         "news_id": news_id,
         "genre": genre,
         "lyrics": lyrics,
         "song_url": f"/songs/{news_id}_song.wav"
-    }).execute()
+    })
 
     return {
         "news_id": news_id,
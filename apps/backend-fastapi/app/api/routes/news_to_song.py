@@ -1,14 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.services.suno_music import generate_music, get_download_url, get_lyrics, get_track_status
-from supabase import create_client, Client
 import os
 import time
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # Secure this
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 router = APIRouter()
 
 
@@ -1,40 +1,39 @@
 import os
-import shutil
-import tempfile
+import asyncio
 import uuid
 import logging
-import json
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 from dotenv import load_dotenv
 
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, File, UploadFile, Form, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 # --- Import and setup RQ for job queueing ---
 from redis import Redis
 from rq import Queue
+from rq.exceptions import NoSuchJobError
 from rq.job import Job
 
 # --- Supabase Imports ---
-from supabase.client import create_client, Client
-from app.services.supabase_layer import get_supabase_client  # use your centralized client
+from app.services.repositories import scans
+from app.services.pagination import NEXT_CURSOR_HEADER, decode_cursor, page_size, projection
+from app.services import admission, job_telemetry, result_cache
+from app.services.database_layer import decode_legacy_json
+from app.services.blob_store import BlobTooLarge, get_blob_store
+from app.config import MAX_UPLOAD_BYTES
 
 from app.services import tasks  # make sure tasks.py has __init__.py in folder
+from app.services.scan_events import make_event, stream_events
 
 
 # Initialize environment variables
 load_dotenv()
 
 # --- Configuration and Initialization ---
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 REDIS_URL = os.getenv("REDIS_URL")
 
-# Supabase Client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 logger = logging.getLogger("post_truth_scanner")
 
 router = APIRouter()
@@ -46,6 +45,10 @@ try:
     redis_conn.ping()
     q = Queue('analysis_queue', connection=redis_conn)
     text_analysis_queue = Queue('text_analysis_queue', connection=redis_conn)
+    # Lower-priority lanes: workers take from these only when the queues above are empty
+    bulk_queue = Queue(admission.lane_queue(q.name, admission.BULK), connection=redis_conn)
+    text_analysis_bulk_queue = Queue(admission.lane_queue(text_analysis_queue.name, admission.BULK),
+                                     connection=redis_conn)
     logger.info("Successfully connected to Redis.")
 except Exception as e:
     logger.error(f"Failed to connect to Redis at {REDIS_URL}. Error: {e}")
@@ -53,43 +56,98 @@ except Exception as e:
     # which is desirable behavior to prevent silent failures.
     raise RuntimeError("Failed to connect to Redis. Check REDIS_URL environment variable and Redis service.")
 
+
+def _fetch_job(scan_id: str) -> Optional[Job]:
+    try:
+        return Job.fetch(scan_id, connection=redis_conn)
+    except NoSuchJobError:
+        return None
+
+
+async def _queue_state(queue: Optional[Queue], scan_id: str) -> str:
+    """
+    Falls back to RQ's job hash for a scan that isn't in the result cache yet.
+    Without a queue the job is looked up whichever queue it was sent to.
+    """
+    job: Optional[Job] = await asyncio.to_thread(queue.fetch_job if queue else _fetch_job, scan_id)
+    if job is None:
+        return result_cache.PENDING
+    status = job.get_status()
+    if status == "failed":
+        return result_cache.FAILED
+    if status == "started":
+        return result_cache.RUNNING
+    if status in ("queued", "deferred", "scheduled"):
+        return result_cache.QUEUED
+    # Finished without a row: re-check the database shortly
+    return result_cache.PENDING
+
+
+async def _admit(queue: Queue, job_type: str, user: Optional[str], priority: str) -> None:
+    """429 with Retry-After when the queue is over budget or the user over quota (see admission)."""
+    try:
+        await admission.admit(queue.name, job_type, user, priority)
+    except admission.AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+
+
+def _poll_response(content: Any, status_code: int, if_none_match: Optional[str]) -> Response:
+    """JSON response with an ETag; 304 with no body when the client already has it."""
+    response = JSONResponse(status_code=status_code, content=content)
+    etag = result_cache.etag_for(response.body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if result_cache.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
 # --- Define the Pydantic model for the JSON payload ---
 class ScanInput(BaseModel):
     text: str
     scan_id: str
     user_id: str  # <-- include user_id in the request payload
+    stream: bool = False  # publish field-level results for /analyze-text/stream/{scan_id}
+    priority: Literal["interactive", "bulk"] = "interactive"  # bulk jobs run when no interactive scan is waiting
 
-async def save_upload_to_temp(upload: UploadFile) -> Path:
-    """Saves an uploaded file to a temporary location and returns the path."""
-    suffix = Path(upload.filename).suffix or ""
-    tmp_dir = Path(tempfile.mkdtemp(prefix="post_scan_"))
-    out_path = tmp_dir / (str(uuid.uuid4()) + suffix)
-    
-    # Using aiofiles for robust async file operations
-    import aiofiles
-    async with aiofiles.open(out_path, 'wb') as f:
+async def save_upload_to_blob_store(upload: UploadFile) -> str:
+    """Streams an upload into the blob store and returns its blob id; 413 past MAX_UPLOAD_BYTES."""
+    async def chunks():
         while content := await upload.read(1024 * 1024):
-            await f.write(content)
-    logger.info(f"Saved upload to {out_path}")
-    return out_path
+            yield content
+
+    try:
+        return await get_blob_store().put(chunks(), Path(upload.filename or "").suffix, MAX_UPLOAD_BYTES)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=f"Media is larger than {e.max_bytes / (1024 * 1024):.0f} MB.")
 
 @router.post("/analyze-post")
-async def analyze_post_endpoint(caption: str = Form(...), media: UploadFile = File(...)):
+async def analyze_post_endpoint(
+    request: Request,
+    caption: str = Form(...),
+    media: UploadFile = File(...),
+    user_id: Optional[str] = Form(None),
+    priority: Literal["interactive", "bulk"] = Form("interactive"),
+):
     """
     Submits a post for analysis to a background worker.
-    Returns a scan ID immediately.
+    Returns a scan ID immediately, or 429 with Retry-After when the queue is
+    over budget or the user (client address without `user_id`) is over quota.
     """
+    await _admit(q, "media", user_id or (request.client.host if request.client else None), priority)
     # Create the unique scan ID here, which will be used for the database result
     scan_id = str(uuid.uuid4())
-    media_path = await save_upload_to_temp(media)
+    blob_id = await save_upload_to_blob_store(media)
     
     try:
+        await result_cache.mark_queued(scan_id)
         # Enqueue the job using RQ's built-in method
         # Pass the generated scan_id as the job_id to ensure consistency
-        job = q.enqueue(
+        queue = bulk_queue if priority == admission.BULK else q
+        job = queue.enqueue(
             tasks.perform_analysis_job_sync,
             caption,
-            str(media_path),
+            blob_id,        # workers resolve the media through the blob store
             scan_id,        # pass scan_id explicitly
             job_id=scan_id
         )
@@ -98,191 +156,200 @@ async def analyze_post_endpoint(caption: str = Form(...), media: UploadFile = Fi
 
         # IMPORTANT: Return the unique scan_id, NOT the job.id
         # The frontend needs this ID to poll for the result in the database
-        return JSONResponse(status_code=202, content={"message": "Analysis job submitted.", "scan_id": scan_id})
+        return JSONResponse(status_code=202, content={"message": "Analysis job submitted.", "scan_id": scan_id,
+                                                      "events_url": f"/scan-events/{scan_id}"})
 
     except Exception as e:
         logger.exception("Failed to submit job to queue")
-        # Ensure temporary file is cleaned up on failure
-        if media_path.parent.exists():
-            shutil.rmtree(media_path.parent)
+        # mark_queued already ran; don't leave polls waiting on a job that was never enqueued
+        await asyncio.to_thread(result_cache.set_job_state, scan_id, result_cache.FAILED)
+        # Drop this submission's reference; gc removes the blob if nothing else uses it
+        await asyncio.to_thread(get_blob_store().release, blob_id)
         raise HTTPException(status_code=500, detail="Failed to submit analysis job.")
 
 @router.get("/scan-results/{scan_id}")
-async def get_scan_results(scan_id: str):
+async def get_scan_results(scan_id: str, if_none_match: Optional[str] = Header(None)):
     """
-    Retrieves the status and result of a completed analysis job by checking the database.
+    Retrieves the status and result of an analysis job. Served from the Redis result
+    cache when possible; send the returned ETag as If-None-Match to get a 304.
     """
     try:
-        # Check Supabase for the scan result using the provided scan_id
-        response = supabase.table("scan_results").select("*").eq("scan_id", scan_id).execute()
-        
-        if response.data:
-            # If data is found, the job is complete. Return the result.
-            result = response.data[0]
-            return JSONResponse(status_code=200, content=result)
-        else:
-            # If no data is found, the job is likely still in progress or the ID is invalid.
-            # We can check the RQ job status for a more accurate response.
-            job: Job = q.fetch_job(scan_id)
-            if job and job.get_status() == 'failed':
-                 raise HTTPException(status_code=500, detail="Analysis job failed.")
-            
-            # This is the expected response while the job is running
-            return JSONResponse(status_code=202, content={"status": "Analysis in progress. Keep polling."})
-            
+        result, state = await result_cache.get_scan_result(
+            scan_id, lambda: scans.get(scan_id), lambda: _queue_state(None, scan_id)
+        )
     except Exception as e:
         logger.error(f"Failed to retrieve scan results: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve scan results from database.")
 
+    if result:
+        # If data is found, the job is complete. Return the result.
+        return _poll_response(result, 200, if_none_match)
+    if state == result_cache.FAILED:
+        raise HTTPException(status_code=500, detail="Analysis job failed.")
+
+    # This is the expected response while the job is running
+    return _poll_response({"status": "Analysis in progress. Keep polling."}, 202, if_none_match)
+
 @router.get("/post-scans")
-async def get_all_scans():
+async def get_all_scans(
+    limit: Optional[int] = Query(None, description="Page size (default 50, max 200)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, or * for all"),
+    min_score: Optional[float] = Query(None, description="Only scans scoring at least this"),
+    max_score: Optional[float] = Query(None, description="Only scans scoring at most this"),
+    person: Optional[List[str]] = Query(None, description="Entity filter; repeat to require several"),
+    organization: Optional[List[str]] = Query(None),
+    location: Optional[List[str]] = Query(None),
+):
     """
-    Retrieves the full history of all past analysis results from the database.
+    Retrieves analysis history, newest first, one keyset page at a time.
+    The body is the list of rows; the cursor for the next page is returned in the
+    X-Next-Cursor header (absent on the last page). Score and entity filters are
+    evaluated by Postgres against the JSONB columns.
     """
+    columns = projection(fields, scans.columns, scans.list_columns)
+    after = decode_cursor(cursor)
+    entities = {key: values for key, values in
+                (("persons", person), ("organizations", organization), ("locations", location)) if values}
     try:
-        response = supabase.table("scan_results").select("*").order("created_at", desc=True).execute()
-        return JSONResponse(status_code=200, content=response.data)
+        rows, next_cursor = await scans.list_page(columns, page_size(limit), after,
+                                                  min_score=min_score, max_score=max_score, entities=entities)
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return JSONResponse(status_code=200, content=rows, headers=headers)
     except Exception as e:
         logger.error(f"Failed to retrieve all scan results: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve scan history from database.")
 
+@router.get("/post-scans/summary")
+async def get_scans_summary(count: str = Query("estimated", pattern="^(exact|planned|estimated)$")):
+    """Total number of scans and the newest scan time, without transferring any rows."""
+    try:
+        return await scans.summary(count)
+    except Exception as e:
+        logger.error(f"Failed to summarize scan results: {e}")
+        raise HTTPException(status_code=500, detail="Failed to summarize scan history.")
+
 @router.post("/analyze-text")
 async def analyze_text_endpoint(data: ScanInput):
     """
     Submits a block of text for analysis.
-    Enqueues job with RQ, worker will upsert results.
+    Enqueues job with RQ, worker will upsert results. Returns 429 with
+    Retry-After when the queue is over budget or the user over quota.
     """
+    await _admit(text_analysis_queue, "text", data.user_id, data.priority)
+    # --- Step 1: Ensure scan_id exists ---
+    scan_id = data.scan_id or str(uuid.uuid4())
     try:
-        # --- Step 1: Ensure scan_id exists ---
-        scan_id = data.scan_id or str(uuid.uuid4())
         logger.info(f"Received text analysis request with scan_id={scan_id} for user {data.user_id}")
 
         # --- Step 2: Do NOT insert placeholder anymore ---
         # The worker will upsert results directly.
 
         # --- Step 3: Enqueue text analysis job ---
-        job = text_analysis_queue.enqueue(
+        await result_cache.mark_queued(scan_id)
+        queue = text_analysis_bulk_queue if data.priority == admission.BULK else text_analysis_queue
+        job = queue.enqueue(
             tasks.perform_text_analysis_job,
             data.text,             # text to analyze
             scan_id,               # scan_id
             data.user_id,          # user_id
+            data.stream,           # publish field-level updates while the LLM streams
             job_id=scan_id         # use scan_id as RQ job_id for tracking
         )
         logger.info(f"Submitted text analysis job {job.id} with scan_id={scan_id} to Redis queue.")
 
         # --- Step 4: Respond immediately to client ---
-        return JSONResponse(
-            status_code=202,
-            content={"message": "Analysis job submitted.", "scan_id": scan_id},
-        )
+        content = {"message": "Analysis job submitted.", "scan_id": scan_id, "events_url": f"/scan-events/{scan_id}"}
+        if data.stream:
+            content["stream_url"] = f"/analyze-text/stream/{scan_id}"
+        return JSONResponse(status_code=202, content=content)
 
     except Exception as e:
         logger.exception("Failed to submit text analysis job")
+        # mark_queued already ran; don't leave polls waiting on a job that was never enqueued
+        await asyncio.to_thread(result_cache.set_job_state, scan_id, result_cache.FAILED)
         raise HTTPException(status_code=500, detail="Failed to submit analysis job.")
 
-    """
-    Submits a block of text for analysis.
-    Creates a placeholder scan_results row, then enqueues job with RQ.
-    """
-    try:
-        # --- Step 1: Ensure scan_id exists ---
-        scan_id = data.scan_id or str(uuid.uuid4())
-        logger.info(f"Received text analysis request with scan_id={scan_id} for user {data.user_id}")
-
-        # --- Step 2: Insert placeholder row in scan_results ---
-        try:
-            placeholder = {
-                "scan_id": scan_id,
-                "user_id": data.user_id,
-                "caption": data.text,
-                "truth_summary": None,
-                "score": None,
-                "mismatch_reason": None,
-                "entities": None,
-            }
-
-            supabase.table("scan_results").insert(placeholder).execute()
-            logger.info(f"Inserted placeholder scan_result row for scan_id={scan_id}")
-        except Exception as e:
-            logger.warning(f"Failed to insert placeholder row for scan_id={scan_id}: {e}")
-
-        # --- Step 3: Enqueue text analysis job with all required args ---
-        job = text_analysis_queue.enqueue(
-            tasks.perform_text_analysis_job,
-            data.text,             # text to analyze
-            scan_id,               # scan_id
-            data.user_id,          # user_id              
-            job_id=scan_id         # use scan_id as RQ job_id for tracking
-        )
-        logger.info(f"Submitted text analysis job {job.id} with scan_id={scan_id} to Redis queue.")
+async def _scan_snapshot(scan_id: str) -> Dict[str, Any]:
+    """Current state of a scan as an event, from the result cache (database/RQ only on a miss)."""
+    result, state = await result_cache.get_scan_result(
+        scan_id, lambda: scans.get(scan_id), lambda: _queue_state(None, scan_id)
+    )
+    if result:
+        return make_event(scan_id, "completed", {"score": result.get("score")})
+    if state == result_cache.FAILED:
+        return make_event(scan_id, "failed", {"reason": "Analysis job failed."})
+    return make_event(scan_id, "status", {"state": state})
 
-        # --- Step 4: Respond immediately to client ---
-        return JSONResponse(
-            status_code=202,
-            content={"message": "Analysis job submitted.", "scan_id": scan_id},
-        )
 
-    except Exception as e:
-        logger.exception("Failed to submit text analysis job")
-        raise HTTPException(status_code=500, detail="Failed to submit analysis job.")
+@router.get("/scan-events/{scan_id}")
+async def stream_scan_events(scan_id: str):
+    """
+    Pushes status for an /analyze-post or /analyze-text job over SSE instead of polling:
+    `status` (current state on connect), `started`, `stage` ({"stage": ...}), `field`
+    (text jobs submitted with `stream: true`), then `completed` or `failed`, after
+    which the stream closes. Fetch the full result once from /scan-results/{scan_id}.
+    """
+    return StreamingResponse(
+        stream_events(scan_id, snapshot=lambda: _scan_snapshot(scan_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/analyze-text/stream/{scan_id}")
+async def stream_text_analysis(scan_id: str):
+    """
+    Relays field-level analysis updates (summary, entities, score, ...) over SSE
+    as the worker parses them out of the LLM stream. Submit with `stream: true`.
+    Same stream as /scan-events/{scan_id}.
+    """
+    return await stream_scan_events(scan_id)
+
+@router.get("/scan-telemetry/stats")
+async def get_stage_stats(
+    window_minutes: int = Query(60, ge=1, le=job_telemetry.TELEMETRY_RETENTION_SECONDS // 60),
+    job_type: Optional[str] = Query(None, pattern="^(media|text)$"),
+):
+    """p50/p95/max duration, count and errors per job stage over the last `window_minutes`."""
+    stats = await job_telemetry.stage_stats(window_minutes * 60, job_type)
+    return {"window_minutes": window_minutes, "stages": stats}
+
+@router.get("/scan-telemetry/{scan_id}")
+async def get_scan_telemetry(scan_id: str):
+    """
+    Per-stage timings of one job: live from Redis while it runs (and for a day
+    after), then the breakdown saved with the scan result.
+    """
+    telemetry = await job_telemetry.get_job_telemetry(scan_id)
+    if telemetry:
+        return telemetry
+    result = await scans.get(scan_id)
+    stage_timings = decode_legacy_json(result.get("stage_timings")) if result else None
+    if not stage_timings:
+        raise HTTPException(status_code=404, detail="No telemetry for this scan.")
+    return {**stage_timings, "status": "completed"}
 
 @router.get("/text-scan-results/{scan_id}")
-async def get_text_scan_results(scan_id: str):
+async def get_text_scan_results(scan_id: str, if_none_match: Optional[str] = Header(None)):
     """
-    Retrieves the results of a completed text analysis job from Supabase.
-    This endpoint is polled by the frontend.
+    Retrieves the results of a completed text analysis job.
+    This endpoint is polled by the frontend; polls are answered from the Redis
+    result cache and honour If-None-Match.
     """
-    response = supabase.table("scan_results").select("*").eq("scan_id", scan_id).execute()
-    
-    results = response.data
-    if not results:
-        # If no results are found, the job is not yet complete.
-        # Check RQ job status for a more detailed response
-        job = text_analysis_queue.fetch_job(scan_id)
-        if job and job.is_failed:
+    result, state = await result_cache.get_scan_result(
+        scan_id, lambda: scans.get(scan_id), lambda: _queue_state(None, scan_id)
+    )
+    if not result:
+        if state == result_cache.FAILED:
              raise HTTPException(status_code=500, detail="Analysis job failed.")
-        
+
         # This is the expected response while the job is running
-        raise HTTPException(status_code=202, detail="Analysis results not yet available. Keep polling.")
-    
-    result = results[0]
-
-    # --- Parse JSON fields ---
-    def safe_parse_json(value, fallback={}):
-        if not value:
-            return fallback
-        if isinstance(value, dict):
-            return value
-        if isinstance(value, str):
-            try:
-                parsed = json.loads(value)
-                # Sometimes Supabase stores as a stringified JSON string
-                if isinstance(parsed, str):
-                    try:
-                        return json.loads(parsed)
-                    except json.JSONDecodeError:
-                        return fallback
-                return parsed
-            except json.JSONDecodeError:
-                return fallback
-        return fallback
+        return _poll_response({"detail": "Analysis results not yet available. Keep polling."}, 202, if_none_match)
 
-    
-    # Get the entities and ensure it's a dictionary
-    entities_data = safe_parse_json(result.get("entities"), {})
-    # if isinstance(entities_data, str):
-    #     try:
-    #         # If it's a string, attempt to parse it as JSON
-    #         entities_data = json.loads(entities_data)
-    #     except json.JSONDecodeError:
-    #         # If the string is invalid JSON, default to an empty dictionary
-    #         entities_data = {}
-    # elif not isinstance(entities_data, dict):
-    #     # If it's not a string or a dict (e.g., None), default to an empty dictionary
-    #     entities_data = {}
-
-    # Create a new, clean dictionary for the response
-    results_data = safe_parse_json(result.get("results"), {})
+    # entities / results are JSONB and arrive structured; only rows written by
+    # older workers (see app/scripts/migrate_scan_results_jsonb.py) are strings.
+    entities_data = decode_legacy_json(result.get("entities")) or {}
+    results_data = decode_legacy_json(result.get("results")) or {}
 
     response_data: Dict[str, Any] = {
         "scan_id": result.get("scan_id", scan_id),
@@ -294,4 +361,4 @@ async def get_text_scan_results(scan_id: str):
         "results": results_data,
     }
 
-    return JSONResponse(content=response_data, status_code=200)
\ No newline at end of file
+    return _poll_response(response_data, 200, if_none_match)
\ No newline at end of file
@@ -12,3 +12,29 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:lnBg9h106AFq3B0b
 
 # Redis URL for RQ worker.
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Groq (OpenAI-compatible) endpoint. Point GROQ_BASE_URL at the local stand-in
+# server (`python -m app.loadtest.fake_llm_server`) to load-test without quota.
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com").rstrip("/")
+GROQ_CHAT_URL = f"{GROQ_BASE_URL}/openai/v1/chat/completions"
+
+# Smart News collector. It normally runs as its own process
+# (`python -m app.workers.collector_main`); set this to also run it inside the API.
+RUN_NEWS_COLLECTOR_IN_API = os.getenv("RUN_NEWS_COLLECTOR_IN_API", "false").lower() in ("1", "true", "yes")
+# Feeds are hashed into COLLECTOR_SHARDS shards. Each shard is owned through a Redis
+# lease that its collector renews every ttl/3; running instances split the shards evenly.
+COLLECTOR_SHARDS = int(os.getenv("COLLECTOR_SHARDS", "8"))
+COLLECTOR_LEASE_TTL_SECONDS = float(os.getenv("COLLECTOR_LEASE_TTL_SECONDS", "30"))
+
+# Persistence backend: "supabase" (default) or "sqlite", a local WAL-mode file at
+# SQLITE_PATH for offline runs and reproducible single-machine benchmarks.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "app/tmp/storage.sqlite3")
+
+# Uploaded media are stored once per content hash and passed to workers by blob id.
+# With the "local" backend BLOB_STORE_PATH must be shared by the API and the workers
+# (same host or a shared volume); unreferenced blobs are removed by app.scripts.gc_blobs.
+BLOB_BACKEND = os.getenv("BLOB_BACKEND", "local").lower()
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "app/tmp/blobs")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
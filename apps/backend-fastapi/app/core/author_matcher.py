@@ -5,20 +5,13 @@ import json
 from datetime import datetime
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from supabase import create_client, Client
 
-FINGERPRINTS_PATH = "app/data/author_fingerprints.yaml"
-
-# Load Supabase client
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-if not SUPABASE_URL:
-    raise RuntimeError("SUPABASE_URL is not set. Did you forget to load the .env file?")
+from app.services.storage_layer import StorageClient, get_storage_client
 
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-if not SUPABASE_KEY:
-    raise RuntimeError("SUPABASE_SERVICE_ROLE_KEY is not set. Check your .env.")
+FINGERPRINTS_PATH = "app/data/author_fingerprints.yaml"
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Shared process-wide storage client
+storage: StorageClient = get_storage_client()
 
 def load_fingerprints() -> Dict[str, Dict[str, List[str] | str]]:
     """Load author fingerprints from YAML file."""
@@ -72,9 +65,9 @@ def match_author(text: str, fingerprints: Dict[str, Dict[str, List[str] | str]])
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
-    # Save match result to Supabase
+    # Save match result
     try:
-        db_res = supabase.table("author_matches").insert({
+        db_res = storage.table("author_matches").insert({
             "transcript": text,
             "matched_author": best_match,
             "confidence": best_score,
@@ -0,0 +1,97 @@
+# app/loadtest/benchmark_storage.py
+"""
+Throughput of the storage paths the API and workers use, against whichever
+backend STORAGE_BACKEND selects. With the SQLite backend the numbers are
+reproducible on one machine and need no network:
+
+    STORAGE_BACKEND=sqlite SQLITE_PATH=/tmp/bench.sqlite3 python -m app.loadtest.benchmark_storage
+    python -m app.loadtest.benchmark_storage --rows 2000 --concurrency 32
+
+Rows are written under a fresh run id so repeated runs don't collide.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from app.config import STORAGE_BACKEND
+from app.services.pagination import decode_cursor
+from app.services.repositories import author_matches, scans
+from app.services.storage_layer import get_storage_client
+from app.workers.news_dedupe import SeenUrlFilter
+from app.workers.news_store import NewsBatchWriter
+
+
+def _report(name: str, count: int, seconds: float) -> None:
+    print(f"{name:<28} {count / seconds:>10.0f} ops/s  ({count} in {seconds * 1000:.0f} ms)")
+
+
+async def _timed(name: str, count: int, concurrency: int, make_call) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await make_call(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    _report(name, count, time.perf_counter() - started)
+
+
+async def run(rows: int, concurrency: int, page: int) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    scan_ids = [f"bench-{run_id}-{i}" for i in range(rows)]
+    entities = {"persons": ["Ada Lovelace"], "organizations": ["Analytical Engine Co"], "locations": []}
+    print(f"Backend: {STORAGE_BACKEND}  run: {run_id}  concurrency: {concurrency}")
+
+    await _timed("scan_results upsert", rows, concurrency, lambda i: scans.upsert({
+        "scan_id": scan_ids[i], "user_id": run_id, "caption": f"caption {i}", "truth_summary": "summary",
+        "score": i % 100, "mismatch_reason": "N/A", "entities": entities, "results": {"score": i % 100},
+    }))
+    await _timed("scan_results get", rows, concurrency, lambda i: scans.get(scan_ids[i]))
+    await _timed("author_matches insert", rows, concurrency, lambda i: author_matches.insert({
+        "transcript": f"transcript {i}", "matched_author": "bench", "confidence": 0.5, "raw_response": {"i": i},
+    }))
+
+    started, pages, cursor = time.perf_counter(), 0, None
+    columns = ",".join(("created_at", "id", *scans.list_columns))
+    while True:
+        _, cursor = await scans.list_page(columns, page, decode_cursor(cursor))
+        pages += 1
+        if not cursor:
+            break
+    _report(f"history pages of {page}", pages, time.perf_counter() - started)
+
+    await _timed("filtered page (score, entity)", 50, concurrency, lambda i: scans.list_page(
+        columns, page, min_score=50, entities={"persons": ["Ada Lovelace"]}))
+    await _timed("summary (count)", 50, concurrency, lambda i: scans.summary("exact"))
+
+    storage = get_storage_client()
+    news_rows = [{"title": f"t{i}", "summary": "s", "source_name": "bench", "source_url": f"https://bench/{run_id}/{i}",
+                  "bias": "center", "trust_score": 0.5, "language": "en"} for i in range(rows)]
+    writer = NewsBatchWriter(storage)
+    for row in news_rows:
+        writer.add(row, [{"claim_text": "c", "claim_type": "factual", "context": "bench"}] * 3)
+    started = time.perf_counter()
+    await writer.flush_async()
+    _report("smart_news + claims flush", rows, time.perf_counter() - started)
+
+    seen = SeenUrlFilter(storage)
+    urls = [row["source_url"] for row in news_rows] + [f"https://bench/{run_id}/new/{i}" for i in range(rows)]
+    started = time.perf_counter()
+    await asyncio.to_thread(seen.filter_new, urls)
+    _report("dedupe lookups (cold)", len(urls), time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page", type=int, default=50, help="history page size")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.concurrency, args.page))
+
+
+if __name__ == "__main__":
+    main()
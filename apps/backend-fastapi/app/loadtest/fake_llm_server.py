@@ -0,0 +1,335 @@
+# app/loadtest/fake_llm_server.py
+"""
+Local OpenAI-compatible stand-in for Groq, used to load-test the analysis
+pipelines without spending quota.
+
+Modes:
+  canned  - answer every request with a canned JSON response for its prompt family
+  record  - forward each new request to the real upstream once and append the response to a
+            recordings file; requests already recorded are answered from it
+  replay  - answer from the recordings file (falls back to canned on a miss)
+
+Run it with:
+    python -m app.loadtest.fake_llm_server --config app/loadtest/fake_llm.yaml --port 8089
+
+and point the backend at it with GROQ_BASE_URL=http://localhost:8089.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import yaml
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+logger = logging.getLogger("fake_llm_server")
+
+DEFAULT_CONFIG_PATH = "app/loadtest/fake_llm.yaml"
+
+# ======================================================
+# Prompt Families
+# ======================================================
+# Ordered: the first family whose marker appears in the prompt wins.
+FAMILY_MARKERS = [
+    ("bias", ["political bias detection"]),
+    ("comparison", ["fact-checking ai", "claims to evaluate"]),
+    ("claims", ["extract factual claims"]),
+    ("entities", ["entity recognition"]),
+    ("analysis", ["truth analysis"]),
+    ("summary", ["summarize"]),
+]
+
+CANNED_RESPONSES: Dict[str, Any] = {
+    "bias": {"bias": "center", "confidence": 0.62},
+    "summary": "Officials confirmed the announcement on Tuesday. Reactions were mixed across the region.",
+    "claims": {
+        "claims": [
+            "officials made an announcement",
+            "the announcement happened on Tuesday",
+        ]
+    },
+    # The collector asks for a bare JSON list instead of a json_object.
+    "claims_list": [
+        {"claim_text": "Officials made an announcement on Tuesday", "claim_type": "factual", "context": "politics"},
+        {"claim_text": "The policy will raise prices", "claim_type": "causal", "context": "economy"},
+    ],
+    "entities": {
+        "persons": ["Joe Biden"],
+        "organizations": ["United Nations"],
+        "locations": ["Paris"],
+        "events": [],
+    },
+    "comparison": {
+        "results": [
+            {
+                "claim": "officials made an announcement",
+                "status": "supported",
+                "explanation": "The summary describes an official announcement.",
+            }
+        ]
+    },
+    "analysis": {
+        "summary": "The text reports an official announcement with limited sourcing.",
+        "sentiment": "neutral",
+        "intent": "inform",
+        "entities": {"persons": ["Joe Biden"], "organizations": ["United Nations"], "locations": ["Paris"]},
+        "mismatch_reason": "N/A",
+        "score": 0.7,
+    },
+    "unknown": {"result": "ok"},
+}
+
+
+def classify_prompt(messages: List[Dict[str, Any]]) -> str:
+    """Maps a chat request onto one of the prompt families we serve canned answers for."""
+    text = " ".join(str(m.get("content", "")) for m in messages).lower()
+    for family, markers in FAMILY_MARKERS:
+        if any(marker in text for marker in markers):
+            return family
+    return "unknown"
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a request that determine the completion."""
+    canonical = {
+        "model": body.get("model"),
+        "messages": body.get("messages"),
+        "temperature": body.get("temperature"),
+        "response_format": body.get("response_format"),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# ======================================================
+# Latency + Error Injection
+# ======================================================
+def sample_latency_ms(spec: Dict[str, Any], rng: random.Random, recorded_ms: Optional[float] = None) -> float:
+    """
+    Draws a latency from a distribution spec, e.g.
+      {distribution: lognormal, median_ms: 600, sigma: 0.4}
+      {distribution: uniform, min_ms: 100, max_ms: 900}
+      {distribution: normal, mean_ms: 500, stddev_ms: 120}
+      {distribution: exponential, mean_ms: 400}
+      {distribution: fixed, ms: 250}
+      {distribution: recorded}   # replay the latency captured in record mode
+    """
+    dist = spec.get("distribution", "fixed")
+    if dist == "fixed":
+        value = spec.get("ms", 0)
+    elif dist == "uniform":
+        value = rng.uniform(spec.get("min_ms", 0), spec.get("max_ms", 0))
+    elif dist == "normal":
+        value = rng.gauss(spec.get("mean_ms", 0), spec.get("stddev_ms", 0))
+    elif dist == "lognormal":
+        value = rng.lognormvariate(math.log(max(spec.get("median_ms", 1), 1)), spec.get("sigma", 0.5))
+    elif dist == "exponential":
+        value = rng.expovariate(1.0 / max(spec.get("mean_ms", 1), 1))
+    elif dist == "recorded":
+        value = recorded_ms if recorded_ms is not None else spec.get("ms", 0)
+    else:
+        raise ValueError(f"Unknown latency distribution: {dist}")
+    return max(0.0, min(float(value), float(spec.get("cap_ms", 120_000))))
+
+
+class FakeLLM:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.mode = config.get("mode", "canned")
+        self.rng = random.Random(config.get("seed"))
+        self.upstream_url = config.get("upstream_url", "https://api.groq.com").rstrip("/")
+        self.upstream_key = os.getenv("FAKE_LLM_UPSTREAM_KEY") or os.getenv("GROQ_API_KEY")
+        self.recordings_path = Path(config.get("recordings_path", "app/loadtest/recordings.jsonl"))
+        self.recordings: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        if self.mode in ("record", "replay"):
+            self._load_recordings()
+
+    def _load_recordings(self):
+        if not self.recordings_path.exists():
+            logger.warning(f"No recordings at {self.recordings_path} yet.")
+            return
+        with open(self.recordings_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.recordings[entry["key"]] = entry
+        logger.info(f"Loaded {len(self.recordings)} recorded responses.")
+
+    def family_config(self, family: str) -> Dict[str, Any]:
+        merged = dict(self.config.get("default", {}))
+        merged.update(self.config.get("families", {}).get(family, {}))
+        return merged
+
+    def _count(self, family: str, outcome: str):
+        bucket = self.stats.setdefault(family, {})
+        bucket[outcome] = bucket.get(outcome, 0) + 1
+
+    def canned_completion(self, body: Dict[str, Any], family: str) -> Dict[str, Any]:
+        wants_object = (body.get("response_format") or {}).get("type") == "json_object"
+        if family == "claims" and not wants_object:
+            content = CANNED_RESPONSES["claims_list"]
+        else:
+            content = CANNED_RESPONSES.get(family, CANNED_RESPONSES["unknown"])
+        content_str = content if isinstance(content, str) else json.dumps(content)
+        prompt_text = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        return {
+            "id": f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content_str},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": approx_tokens(prompt_text),
+                "completion_tokens": approx_tokens(content_str),
+                "total_tokens": approx_tokens(prompt_text) + approx_tokens(content_str),
+            },
+        }
+
+    async def _stream_chunks(self, completion: Dict[str, Any], chunk_ms: float):
+        """Re-emits a finished completion as OpenAI-style SSE chunks (`stream: true`)."""
+        content = completion["choices"][0]["message"]["content"]
+        base = {"id": completion.get("id"), "object": "chat.completion.chunk",
+                "created": completion.get("created"), "model": completion.get("model")}
+        for i in range(0, len(content), 4):
+            chunk = {**base, "choices": [{"index": 0, "delta": {"content": content[i:i + 4]}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(chunk_ms / 1000)
+        final = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                 "x_groq": {"usage": completion.get("usage")}}
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    def respond(self, body: Dict[str, Any], completion: Dict[str, Any], family: str):
+        if body.get("stream"):
+            chunk_ms = self.family_config(family).get("stream_chunk_ms", 15)
+            return StreamingResponse(self._stream_chunks(completion, chunk_ms), media_type="text/event-stream")
+        return JSONResponse(content=completion)
+
+    async def record_completion(self, body: Dict[str, Any], family: str, auth_header: Optional[str]):
+        headers = {"Authorization": auth_header or f"Bearer {self.upstream_key}"}
+        # Always record the non-streamed form; streaming clients get it re-chunked
+        upstream_body = {k: v for k, v in body.items() if k != "stream"}
+        started = time.perf_counter()
+        async with httpx.AsyncClient(timeout=120) as client:
+            resp = await client.post(
+                f"{self.upstream_url}/openai/v1/chat/completions", headers=headers, json=upstream_body
+            )
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        if resp.status_code == 200:
+            entry = {
+                "key": request_key(upstream_body),
+                "family": family,
+                "latency_ms": round(latency_ms, 1),
+                "response": resp.json(),
+            }
+            self.recordings[entry["key"]] = entry
+            self.recordings_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.recordings_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            return self.respond(body, entry["response"], family)
+        # Errors aren't recorded; pass them through as sent (the body isn't always JSON)
+        return Response(resp.content, status_code=resp.status_code, media_type=resp.headers.get("content-type"))
+
+    async def handle(self, body: Dict[str, Any], auth_header: Optional[str]):
+        family = classify_prompt(body.get("messages", []))
+        cfg = self.family_config(family)
+
+        lookup = {k: v for k, v in body.items() if k != "stream"}
+        recorded = self.recordings.get(request_key(lookup)) if self.mode in ("record", "replay") else None
+
+        if self.mode == "record":
+            if recorded:
+                self._count(family, "replayed")
+                return self.respond(body, recorded["response"], family)
+            self._count(family, "recorded")
+            return await self.record_completion(body, family, auth_header)
+
+        latency_ms = sample_latency_ms(
+            cfg.get("latency", {}), self.rng, recorded_ms=recorded["latency_ms"] if recorded else None
+        )
+        await asyncio.sleep(latency_ms / 1000)
+
+        if self.rng.random() < cfg.get("error_rate", 0.0):
+            status = self.rng.choice(cfg.get("error_statuses", [429, 500, 503]))
+            self._count(family, f"error_{status}")
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return JSONResponse(
+                status_code=status,
+                headers=headers,
+                content={"error": {"message": "Injected failure from fake LLM server", "type": "fake_error"}},
+            )
+
+        if recorded:
+            self._count(family, "replayed")
+            return self.respond(body, recorded["response"], family)
+
+        self._count(family, "canned")
+        return self.respond(body, self.canned_completion(body, family), family)
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    if not Path(path).exists():
+        logger.warning(f"Config {path} not found, using defaults.")
+        return {}
+    with open(path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def create_app(config: Dict[str, Any]) -> FastAPI:
+    app = FastAPI(title="Gangsta AI Fake LLM")
+    fake = FakeLLM(config)
+    app.state.fake_llm = fake
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        return await fake.handle(body, request.headers.get("authorization"))
+
+    # Groq SDK path and the generic OpenAI path.
+    app.add_api_route("/openai/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/stats")
+    async def stats():
+        return {"mode": fake.mode, "recordings": len(fake.recordings), "families": fake.stats}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the local fake LLM server.")
+    parser.add_argument("--config", default=os.getenv("FAKE_LLM_CONFIG", DEFAULT_CONFIG_PATH))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("FAKE_LLM_PORT", "8089")))
+    parser.add_argument("--mode", choices=["canned", "record", "replay"], help="Overrides the config file mode.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = load_config(args.config)
+    if args.mode:
+        config["mode"] = args.mode
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
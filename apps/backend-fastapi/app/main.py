@@ -5,10 +5,9 @@ load_dotenv()  # Load .env first
 import asyncio
 from fastapi import FastAPI
 from app.api.routes import author_fingerprint, audio_scan, news_to_song, post_truth_scanner, stem_splitter
-from app.api.routes.truth_scan_results import router as truth_scan_results_router # Corrected import for the new router
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.workers import smart_news_collector 
+from app.config import RUN_NEWS_COLLECTOR_IN_API
 
 app = FastAPI(title="Gangsta AI Backend")
 
@@ -28,6 +27,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset pagination cursor for history endpoints
 )
 
 # ✅ Include routers AFTER app and middleware are ready
@@ -36,11 +36,14 @@ app.include_router(audio_scan.router)
 app.include_router(news_to_song.router, prefix="/api")
 app.mount("/songs", StaticFiles(directory="app/tmp/songs"), name="songs")
 app.include_router(post_truth_scanner.router)
-app.include_router(truth_scan_results_router)
 app.include_router(stem_splitter.router, prefix="/api")
 @app.on_event("startup")
 async def start_smart_news_collector():
-    asyncio.create_task(smart_news_collector.start_background_task())
+    # Ingestion runs in its own process (app.workers.collector_main) unless explicitly enabled here.
+    # Even then it joins the sharded collector group, so feeds are split across API replicas.
+    if RUN_NEWS_COLLECTOR_IN_API:
+        from app.workers.collector_main import run_sharded_collector
+        asyncio.create_task(run_sharded_collector())
 
 
 
@@ -0,0 +1,108 @@
+# app/scripts/benchmark_language_id.py
+"""
+Compares app.services.language_id against langdetect on throughput and agreement.
+
+    python -m app.scripts.benchmark_language_id
+    python -m app.scripts.benchmark_language_id --file headlines.txt --repeat 5
+
+--file takes one text per line; without it a small multilingual news sample is used.
+"""
+
+import argparse
+import time
+
+from langdetect import DetectorFactory, detect
+
+from app.services import language_id
+
+SAMPLE_TEXTS = [
+    "The Senate passed the spending bill late on Tuesday, averting a government shutdown.",
+    "Stocks fell sharply as investors weighed the prospect of higher interest rates.",
+    "Le gouvernement a annoncé mardi une réforme des retraites très contestée par les syndicats.",
+    "Die Bundesregierung hat am Mittwoch neue Maßnahmen zur Stärkung der Wirtschaft beschlossen.",
+    "El presidente anunció un nuevo plan de vivienda para las familias de bajos ingresos.",
+    "Il governo italiano ha approvato il decreto sull'energia dopo una lunga discussione.",
+    "O Banco Central manteve a taxa de juros inalterada pela terceira reunião consecutiva.",
+    "De regering heeft besloten de belasting op energie volgend jaar te verlagen.",
+    "Президент подписал закон о государственном бюджете на следующий год.",
+    "أعلنت الحكومة عن خطة جديدة لدعم الاقتصاد الوطني خلال العام المقبل.",
+    "政府は来年度の予算案を閣議決定し、国会に提出する方針だ。",
+    "国务院常务会议部署进一步稳定经济增长的政策措施。",
+    "정부는 내년도 예산안을 국무회의에서 의결했다고 밝혔다.",
+    "Serikali imetangaza mpango mpya wa kuboresha huduma za afya vijijini.",
+    "Hükümet, gelecek yıl için yeni bir ekonomi paketi açıkladı.",
+    "Rząd przyjął projekt ustawy budżetowej na przyszły rok.",
+    "सरकार ने अगले साल के लिए नई आर्थिक योजना की घोषणा की है।",
+    "Chính phủ đã công bố kế hoạch kinh tế mới cho năm tới.",
+    "Regeringen presenterade på tisdagen en ny budget för nästa år.",
+    "Breaking: Fire crews battle wildfire near Los Angeles as winds pick up",
+]
+
+
+def _load_texts(path: str):
+    if not path:
+        return list(SAMPLE_TEXTS)
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _langdetect_all(texts):
+    labels = []
+    for text in texts:
+        try:
+            labels.append(detect(text))
+        except Exception:
+            labels.append(language_id.DEFAULT_LANGUAGE)
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--file", help="one text per line")
+    parser.add_argument("--repeat", type=int, default=20, help="times the corpus is repeated for timing")
+    args = parser.parse_args()
+
+    texts = _load_texts(args.file)
+    DetectorFactory.seed = 0  # make the reference labels reproducible
+
+    started = time.perf_counter()
+    language_id.get_language_model()
+    print(f"Model load: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    corpus = texts * args.repeat
+    # Unique suffixes defeat the cache, so the uncached path is what gets timed
+    uncached = [f"{text} {i}" for i, text in enumerate(corpus)]
+
+    started = time.perf_counter()
+    reference = _langdetect_all(corpus)
+    langdetect_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for text in uncached:
+        language_id.detect_language(text)
+    single_s = time.perf_counter() - started
+
+    language_id._cache.clear()
+    started = time.perf_counter()
+    batch = language_id.detect_languages(uncached)
+    batch_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    language_id.detect_languages(uncached)
+    cached_s = time.perf_counter() - started
+
+    n = len(corpus)
+    print(f"Texts: {n} ({len(texts)} unique x {args.repeat})")
+    for name, seconds in (("langdetect", langdetect_s), ("language_id single", single_s),
+                          ("language_id batch", batch_s), ("language_id cached", cached_s)):
+        print(f"{name:<20} {n / seconds:>10.0f} texts/s  ({seconds * 1000:.0f} ms)")
+
+    agree = sum(1 for a, b in zip(reference, batch) if a == b)
+    print(f"Agreement with langdetect: {agree / n:.1%}")
+    for text, ref, ours in zip(texts, reference, batch):
+        if ref != ours:
+            print(f"  langdetect={ref:<6} language_id={ours:<6} {text[:70]}")
+
+
+if __name__ == "__main__":
+    main()
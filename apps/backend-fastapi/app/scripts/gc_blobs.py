@@ -0,0 +1,29 @@
+# app/scripts/gc_blobs.py
+"""
+Deletes uploaded media blobs that no queued or running job references.
+
+    python -m app.scripts.gc_blobs --dry-run
+    python -m app.scripts.gc_blobs --grace-minutes 60
+
+Safe to run from cron on any host that sees the blob store: blobs written or
+re-uploaded within the grace period are kept even while their count is zero.
+"""
+
+import argparse
+
+from app.services.blob_store import get_blob_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true", help="report what would be deleted")
+    parser.add_argument("--grace-minutes", type=float, default=60,
+                        help="keep unreferenced blobs touched more recently than this")
+    args = parser.parse_args()
+
+    deleted, freed = get_blob_store().gc(args.grace_minutes * 60, dry_run=args.dry_run)
+    print(f"{'Would delete' if args.dry_run else 'Deleted'} {deleted} blobs ({freed / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
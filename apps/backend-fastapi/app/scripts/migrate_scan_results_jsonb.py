@@ -0,0 +1,80 @@
+# app/scripts/migrate_scan_results_jsonb.py
+"""
+One-off repair of scan_results rows whose entities / results were stored as
+json.dumps() strings (sometimes twice) instead of structured JSONB.
+
+    python -m app.scripts.migrate_scan_results_jsonb --dry-run
+    python -m app.scripts.migrate_scan_results_jsonb
+
+Idempotent: rows that already hold structured JSON are left alone. The column
+type change, the same unwrap in SQL and the indexes the /post-scans filters use
+ship as supabase/migrations/20261019000300_scan_results_jsonb.sql; this script
+does the same row repair through the API in batches, e.g. for rows written by
+an older deploy after the migration ran.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.database_layer import SCAN_JSON_COLUMNS, decode_legacy_json
+from app.services.pagination import keyset_filter
+from app.services.supabase_layer import get_supabase_client
+
+
+def _fix(row):
+    """Returns the changed columns for a row, or None if it is already structured."""
+    changes = {}
+    for column in SCAN_JSON_COLUMNS:
+        value = row.get(column)
+        if isinstance(value, str):
+            decoded = decode_legacy_json(value)
+            if not isinstance(decoded, str):
+                changes[column] = decoded
+    return changes or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true", help="count rows without updating them")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent row updates")
+    args = parser.parse_args()
+
+    supabase = get_supabase_client()
+    columns = ",".join(("id", "created_at", "scan_id", *SCAN_JSON_COLUMNS))
+    scanned = fixed = skipped = 0
+    after = None
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        while True:
+            query = supabase.table("scan_results").select(columns)
+            if after:
+                query = query.or_(keyset_filter(after))
+            rows = query.order("created_at", desc=True).order("id", desc=True).limit(args.batch_size).execute().data
+            if not rows:
+                break
+            scanned += len(rows)
+            after = (rows[-1]["created_at"], rows[-1]["id"])
+
+            updates = []
+            for row in rows:
+                changes = _fix(row)
+                if changes:
+                    updates.append((row["id"], changes))
+                elif any(isinstance(row.get(c), str) for c in SCAN_JSON_COLUMNS):
+                    skipped += 1
+                    print(f"  not JSON, left as is: scan_id={row.get('scan_id')}")
+
+            if updates and not args.dry_run:
+                list(pool.map(
+                    lambda item: supabase.table("scan_results").update(item[1]).eq("id", item[0]).execute(),
+                    updates,
+                ))
+            fixed += len(updates)
+            print(f"Scanned {scanned} rows, {'would fix' if args.dry_run else 'fixed'} {fixed}")
+
+    print(f"Done: {scanned} scanned, {fixed} {'to fix' if args.dry_run else 'fixed'}, {skipped} skipped")
+
+
+if __name__ == "__main__":
+    main()
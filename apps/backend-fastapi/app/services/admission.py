@@ -0,0 +1,149 @@
+# app/services/admission.py
+"""
+Admission control for the analysis queues.
+
+Each queue has two lanes: the base queue (interactive scans, the default) and
+{queue}_bulk, which workers drain only when the interactive lane is empty. A
+submission is admitted when:
+
+  - its lane is under ADMISSION_MAX_DEPTH jobs,
+  - the estimated wait is within the lane's budget; bulk jobs wait behind the
+    interactive lane too,
+  - the user is under their per-lane quota of submissions per window.
+
+Otherwise admit() raises AdmissionRejected with a Retry-After estimate, which
+the API returns as 429. The wait is the queued jobs ahead divided by the
+workers listening on the queue, times the mean job duration over the last
+ADMISSION_DURATION_WINDOW_SECONDS (see job_telemetry). It is only applied when
+jobs are actually waiting and at least ADMISSION_MIN_SAMPLES jobs finished in
+the window; otherwise (empty queue, cold start, workers down) only the depth
+limit applies. Redis failures admit the job: this is load shedding, not a
+correctness check.
+"""
+
+import logging
+import math
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from rq.worker_registration import WORKERS_BY_QUEUE_KEY
+
+from app.services import job_telemetry
+from app.services.redis_layer import get_async_redis
+
+logger = logging.getLogger("post_truth_scanner")
+
+INTERACTIVE, BULK = "interactive", "bulk"
+
+ADMISSION_DURATION_WINDOW_SECONDS = int(os.getenv("ADMISSION_DURATION_WINDOW_SECONDS", "900"))
+ADMISSION_MIN_SAMPLES = int(os.getenv("ADMISSION_MIN_SAMPLES", "5"))
+# Retry-After for a full queue when there is no duration estimate to go by
+FULL_QUEUE_RETRY_SECONDS = 30
+MAX_DEPTH = {
+    INTERACTIVE: int(os.getenv("ADMISSION_MAX_DEPTH", "500")),
+    BULK: int(os.getenv("ADMISSION_MAX_BULK_DEPTH", "5000")),
+}
+MAX_WAIT_SECONDS = {
+    INTERACTIVE: float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "120")),
+    BULK: float(os.getenv("ADMISSION_MAX_BULK_WAIT_SECONDS", "3600")),
+}
+USER_QUOTA_WINDOW_SECONDS = int(os.getenv("ADMISSION_USER_WINDOW_SECONDS", "60"))
+USER_QUOTA = {
+    INTERACTIVE: int(os.getenv("ADMISSION_USER_QUOTA", "10")),
+    BULK: int(os.getenv("ADMISSION_USER_BULK_QUOTA", "200")),
+}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def lane_queue(queue_name: str, priority: str) -> str:
+    """RQ queue name for a lane; workers listen on both, interactive first."""
+    return f"{queue_name}_bulk" if priority == BULK else queue_name
+
+
+def _rq_key(queue_name: str) -> str:
+    return f"rq:queue:{queue_name}"
+
+
+def _user_key(queue_name: str, priority: str, user: str) -> str:
+    return f"admission:{lane_queue(queue_name, priority)}:{user}"
+
+
+async def queue_load(queue_name: str, job_type: str) -> Dict[str, Any]:
+    """
+    Depth of both lanes, workers listening on the queue (RQ's per-queue worker
+    set) and the mean job duration in seconds, None without enough samples.
+    """
+    pipe = get_async_redis().pipeline()
+    pipe.llen(_rq_key(lane_queue(queue_name, INTERACTIVE)))
+    pipe.llen(_rq_key(lane_queue(queue_name, BULK)))
+    pipe.scard(WORKERS_BY_QUEUE_KEY % queue_name)
+    interactive, bulk, workers = await pipe.execute()
+    samples, mean_ms = await job_telemetry.jobs_finished(job_type, ADMISSION_DURATION_WINDOW_SECONDS)
+    return {
+        INTERACTIVE: interactive,
+        BULK: bulk,
+        "workers": workers,
+        "job_seconds": mean_ms / 1000 if samples >= ADMISSION_MIN_SAMPLES else None,
+    }
+
+
+def _check_load(load: Dict[str, Any], priority: str) -> None:
+    depth = load[priority]
+    # Jobs drain at `workers` per mean job duration
+    drain_rate = load["workers"] / load["job_seconds"] if load["job_seconds"] and load["workers"] else None
+    if depth >= MAX_DEPTH[priority]:
+        drain = (depth - MAX_DEPTH[priority] + 1) / drain_rate if drain_rate else FULL_QUEUE_RETRY_SECONDS
+        raise AdmissionRejected(f"The {priority} analysis queue is full.", drain)
+    ahead = load[INTERACTIVE] + (load[BULK] if priority == BULK else 0)
+    if not ahead or not drain_rate:
+        return
+    wait = ahead / drain_rate
+    if wait > MAX_WAIT_SECONDS[priority]:
+        raise AdmissionRejected(f"Estimated wait of {wait:.0f}s is over the {priority} budget.",
+                                wait - MAX_WAIT_SECONDS[priority])
+
+
+async def _take_quota(queue_name: str, priority: str, user: str) -> None:
+    """Sliding-window quota: records the submission, or undoes it and rejects when over."""
+    redis = get_async_redis()
+    key = _user_key(queue_name, priority, user)
+    now = time.time()
+    member = uuid.uuid4().hex
+    pipe = redis.pipeline()
+    pipe.zremrangebyscore(key, 0, now - USER_QUOTA_WINDOW_SECONDS)
+    pipe.zadd(key, {member: now})
+    pipe.zcard(key)
+    pipe.expire(key, USER_QUOTA_WINDOW_SECONDS)
+    _, _, count, _ = await pipe.execute()
+    if count <= USER_QUOTA[priority]:
+        return
+    await redis.zrem(key, member)
+    oldest = await redis.zrange(key, 0, 0, withscores=True)
+    retry_after = oldest[0][1] + USER_QUOTA_WINDOW_SECONDS - now if oldest else USER_QUOTA_WINDOW_SECONDS
+    raise AdmissionRejected(
+        f"Quota of {USER_QUOTA[priority]} {priority} scans per {USER_QUOTA_WINDOW_SECONDS}s reached.", retry_after)
+
+
+async def admit(queue_name: str, job_type: str, user: Optional[str], priority: str = INTERACTIVE) -> None:
+    """
+    Raises AdmissionRejected if a `priority` job for `user` shouldn't be enqueued
+    on `queue_name` now. Call just before enqueueing; an admitted submission
+    counts against the user's quota.
+    """
+    try:
+        _check_load(await queue_load(queue_name, job_type), priority)
+        if user:
+            await _take_quota(queue_name, priority, user)
+    except AdmissionRejected as e:
+        logger.info(f"Rejected {priority} submission to {queue_name} for {user}: {e.reason}")
+        raise
+    except Exception as e:
+        logger.warning(f"Admission check failed for {queue_name}, admitting: {e}")
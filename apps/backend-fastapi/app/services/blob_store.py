@@ -0,0 +1,71 @@
+# app/services/blob_store.py
+"""
+Blob store for uploaded media. The API streams an upload in with put() and
+enqueues the returned blob id; the worker resolves it with path() and calls
+release() when the job is done.
+
+A blob id is the SHA-256 of the content plus the lower-cased file extension
+(media analysis tells video from image by extension), so identical uploads
+are stored once. Each put() and release() moves a reference count in Redis;
+blobs nobody references are deleted by gc() (python -m app.scripts.gc_blobs)
+after a grace period, never by release() itself, so a concurrent put() of
+the same content can't lose its file.
+"""
+
+import re
+from pathlib import Path
+from typing import AsyncIterator, Protocol, Tuple
+
+from app.config import BLOB_BACKEND
+
+BLOB_BACKENDS = ("local",)
+
+_BLOB_ID_RE = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]{1,8})?$")
+_SUFFIX_RE = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+
+class BlobTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the {max_bytes} byte limit")
+        self.max_bytes = max_bytes
+
+
+def make_blob_id(digest: str, suffix: str) -> str:
+    suffix = suffix.lower()
+    return digest + (suffix if _SUFFIX_RE.match(suffix) else "")
+
+
+def check_blob_id(blob_id: str) -> str:
+    """Blob ids arrive through the queue; anything else must never become a path."""
+    if not _BLOB_ID_RE.match(blob_id):
+        raise ValueError(f"Invalid blob id '{blob_id}'")
+    return blob_id
+
+
+class BlobStore(Protocol):
+    async def put(self, chunks: AsyncIterator[bytes], suffix: str, max_bytes: int) -> str:
+        """Stores the streamed content (BlobTooLarge past max_bytes) and returns its blob id, referenced once."""
+
+    def path(self, blob_id: str) -> Path:
+        """Local path of a stored blob, for workers to read."""
+
+    def release(self, blob_id: str) -> None:
+        """Drops one reference; unreferenced blobs are left for gc()."""
+
+    def gc(self, grace_seconds: float, dry_run: bool = False) -> Tuple[int, int]:
+        """Deletes blobs unreferenced and untouched for grace_seconds; returns (blobs, bytes)."""
+
+
+_store = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide store for the configured backend."""
+    global _store
+    if _store is None:
+        if BLOB_BACKEND == "local":
+            from app.services.local_blob_store import LocalBlobStore
+            _store = LocalBlobStore()
+        else:
+            raise ValueError(f"Unknown BLOB_BACKEND '{BLOB_BACKEND}' (expected one of {', '.join(BLOB_BACKENDS)})")
+    return _store
@@ -0,0 +1,149 @@
+import os
+import re
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+from app.services.prompt_budget import split_sentences
+
+logger = logging.getLogger(__name__)
+
+# Sentences scoring at or above this are sent to the LLM for claim extraction
+CLAIM_SCORE_THRESHOLD = 0.5
+# Every this many pre-filter calls (per process) the per-call avoided fractions are logged
+PREFILTER_SUMMARY_EVERY = int(os.getenv("PREFILTER_SUMMARY_EVERY", "100"))
+
+_NUMBER_RE = re.compile(r"\d")
+_PERCENT_MONEY_RE = re.compile(r"\d\s*(%|percent|per cent)|[$€£¥]\s*\d|\d\s*(million|billion|trillion|k\b)", re.I)
+_DATE_RE = re.compile(
+    r"\b(jan(uary)?|feb(ruary)?|mar(ch)?|apr(il)?|may|june?|july?|aug(ust)?|sep(t(ember)?)?|oct(ober)?|"
+    r"nov(ember)?|dec(ember)?|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"yesterday|today|tonight|morning|afternoon|evening|night|last (week|month|year)|(19|20)\d{2})\b",
+    re.I,
+)
+_ASSERTION_RE = re.compile(
+    r"\b(said|says|announced|confirmed|reported|claimed|stated|denied|revealed|according to|"
+    r"killed|died|arrested|charged|elected|won|lost|signed|passed|approved|banned|launched|"
+    r"rose|fell|increased|decreased|doubled|cut|raised|caused|led to|"
+    r"is|are|was|were|has|have|had|will)\b",
+    re.I,
+)
+_OPINION_RE = re.compile(
+    r"\b(i think|i feel|i believe|imo|in my opinion|love|hate|amazing|awesome|best|worst|beautiful|"
+    r"lol|lmao|omg|vibes|mood|blessed|so cute|can't wait)\b",
+    re.I,
+)
+_GREETING_RE = re.compile(r"^\W*(hi|hello|hey|good (morning|night|evening)|thanks|thank you|happy \w+)\b", re.I)
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'\-]*")
+
+
+def _has_named_entity(words: List[str]) -> bool:
+    # Capitalised words after the first one are a cheap proxy for proper nouns
+    return any(w[0].isupper() and not w.isupper() or (w.isupper() and len(w) > 1) for w in words[1:])
+
+
+def score_sentence(sentence: str) -> float:
+    """Scores how likely a sentence is to contain a checkable factual claim (0..1)."""
+    words = _WORD_RE.findall(sentence)
+    if len(words) < 3:
+        return 0.0
+
+    score = 0.0
+    if _NUMBER_RE.search(sentence):
+        score += 0.25
+    if _PERCENT_MONEY_RE.search(sentence):
+        score += 0.15
+    if _DATE_RE.search(sentence):
+        score += 0.2
+    if _has_named_entity(words):
+        score += 0.3
+    if _ASSERTION_RE.search(sentence):
+        score += 0.3
+    if len(words) >= 6:
+        score += 0.2
+
+    if _OPINION_RE.search(sentence):
+        score -= 0.3
+    if _GREETING_RE.search(sentence):
+        score -= 0.3
+    if sentence.rstrip().endswith("?"):
+        score -= 0.3
+    return max(0.0, min(score, 1.0))
+
+
+def select_claim_candidates(text: str, threshold: float = CLAIM_SCORE_THRESHOLD) -> List[str]:
+    """Returns the sentences of `text` that look like they contain claims, in original order."""
+    return [s for s in split_sentences(text) if score_sentence(s) >= threshold]
+
+
+def select_caption_candidates(text: str) -> List[str]:
+    """
+    Returns the caption sentences worth checking against the media, in original order.
+    Descriptive sentences ("a dog on a beach at night") pass without scoring; a sentence
+    is dropped only when it is emoji/too short, or an opinion, greeting or question
+    with no number or name in it.
+    """
+    candidates = []
+    for sentence in split_sentences(text):
+        words = _WORD_RE.findall(sentence)
+        if len(words) < 3:
+            continue
+        negative = (_OPINION_RE.search(sentence) or _GREETING_RE.search(sentence)
+                    or sentence.rstrip().endswith("?"))
+        # Not _DATE_RE: "good morning" / "happy friday" are exactly the greetings to drop
+        concrete = _NUMBER_RE.search(sentence) or _has_named_entity(words)
+        if negative and not concrete:
+            continue
+        candidates.append(sentence)
+    return candidates
+
+
+# ======================================================
+# Call Accounting
+# ======================================================
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+_total_calls = 0
+
+
+def _record(call: str, candidates: List[str]) -> Tuple[str, bool]:
+    global _total_calls
+    with _stats_lock:
+        stats = _stats.setdefault(call, {"calls": 0, "avoided": 0})
+        stats["calls"] += 1
+        if not candidates:
+            stats["avoided"] += 1
+        avoided_fraction = stats["avoided"] / stats["calls"]
+        _total_calls += 1
+        summarize = PREFILTER_SUMMARY_EVERY and _total_calls % PREFILTER_SUMMARY_EVERY == 0
+
+    if summarize:
+        summary = " ".join(f"{name}={s['avoided']}/{s['calls']} ({s['avoided_fraction']:.1%})"
+                           for name, s in get_prefilter_stats().items())
+        logger.info(f"Claim pre-filter LLM calls avoided: {summary}")
+    if not candidates:
+        logger.info(f"Claim pre-filter skipped LLM call={call} (avoided {avoided_fraction:.1%} of calls so far)")
+        return "", False
+    return " ".join(candidates), True
+
+
+def prefilter_claims(text: str, call: str, threshold: float = CLAIM_SCORE_THRESHOLD) -> Tuple[str, bool]:
+    """
+    Runs the pre-stage for one extraction call.
+    Returns (candidate_text, should_call_llm); candidate_text keeps only likely-claim sentences.
+    """
+    return _record(call, select_claim_candidates(text, threshold))
+
+
+def prefilter_caption(text: str, call: str) -> Tuple[str, bool]:
+    """`prefilter_claims` for media captions, using `select_caption_candidates`."""
+    return _record(call, select_caption_candidates(text))
+
+
+def get_prefilter_stats() -> Dict[str, Dict[str, float]]:
+    """Per-call counts of extraction requests seen and LLM calls avoided."""
+    with _stats_lock:
+        return {
+            call: {**stats, "avoided_fraction": stats["avoided"] / stats["calls"] if stats["calls"] else 0.0}
+            for call, stats in _stats.items()
+        }
@@ -1,12 +1,21 @@
 import os
 import json
+import time
 import logging
 from typing import List, Dict, Any, Optional
 
 from groq import Groq
 
+from app.config import GROQ_BASE_URL
+from app.services.claim_prefilter import prefilter_caption
+from app.services.prompt_budget import count_tokens, fit_to_budget, model_budget, record_usage_from_response
+
 logger = logging.getLogger(__name__)
 
+GROQ_MODEL = "llama-3.1-8b-instant"
+# Tokens taken by the fixed instructions/examples in the prompts below
+PROMPT_OVERHEAD_TOKENS = 600
+
 # Lazy initialize the Groq client
 _groq_client = None
 
@@ -17,7 +26,7 @@ def _get_groq_client():
         if not api_key:
             logger.warning("GROQ_API_KEY not found. Groq client not initialized.")
             return None
-        _groq_client = Groq(api_key=api_key)
+        _groq_client = Groq(api_key=api_key, base_url=GROQ_BASE_URL)
     return _groq_client
 
 async def extract_claims_with_groq(caption: str) -> Optional[List[str]]:
@@ -29,6 +38,12 @@ async def extract_claims_with_groq(caption: str) -> Optional[List[str]]:
     if not groq_client:
         return None
 
+    # Emoji-only, greeting and opinion captions short-circuit; descriptive ones always reach the LLM
+    caption, has_candidates = prefilter_caption(caption, "claims.extract")
+    if not has_candidates:
+        return []
+
+    caption = fit_to_budget(caption, model_budget(GROQ_MODEL, reserved=PROMPT_OVERHEAD_TOKENS))
     prompt = f"""
     You are a highly analytical AI trained to extract factual claims from text.
     Your task is to identify and extract every single verifiable claim from the following caption.
@@ -55,8 +70,9 @@ async def extract_claims_with_groq(caption: str) -> Optional[List[str]]:
     """
     response_content = None
     try:
+        started = time.perf_counter()
         completion = groq_client.chat.completions.with_raw_response.create(
-            model="llama-3.1-8b-instant",
+            model=GROQ_MODEL,
             messages=[
                 {"role": "user", "content": prompt}
             ],
@@ -65,6 +81,8 @@ async def extract_claims_with_groq(caption: str) -> Optional[List[str]]:
         # Correctly parse the raw response
         parsed_response_obj = completion.parse()
         response_content = parsed_response_obj.choices[0].message.content
+        record_usage_from_response("claims.extract", GROQ_MODEL, parsed_response_obj.usage, prompt,
+                                   response_content, (time.perf_counter() - started) * 1000)
         parsed_response = json.loads(response_content)
         claims = parsed_response.get("claims", [])
         return claims
@@ -82,7 +100,18 @@ async def compare_claims_with_groq(claims: List[str], summary: str) -> Optional[
     if not groq_client:
         return None
 
-    claims_str = "\n".join([f"- {c}" for c in claims])
+    # Split the budget: claims take up to half, the media summary gets the rest
+    budget = model_budget(GROQ_MODEL, reserved=PROMPT_OVERHEAD_TOKENS)
+    claim_lines = []
+    used = 0
+    for c in claims:
+        cost = count_tokens(f"- {c}") + 1
+        if used + cost > budget // 2:
+            break
+        claim_lines.append(f"- {c}")
+        used += cost
+    claims_str = "\n".join(claim_lines)
+    summary = fit_to_budget(summary, budget - used)
     prompt = f"""
     You are a fact-checking AI. Your task is to compare a list of factual claims against a summary of a piece of media. For each claim, you must determine its status based on the summary.
     
@@ -121,8 +150,9 @@ async def compare_claims_with_groq(claims: List[str], summary: str) -> Optional[
     """
     response_content = None
     try:
+        started = time.perf_counter()
         completion = groq_client.chat.completions.with_raw_response.create(
-            model="llama-3.1-8b-instant",
+            model=GROQ_MODEL,
             messages=[
                 {"role": "user", "content": prompt}
             ],
@@ -130,6 +160,8 @@ async def compare_claims_with_groq(claims: List[str], summary: str) -> Optional[
         )
         parsed_response_obj = completion.parse()
         response_content = parsed_response_obj.choices[0].message.content
+        record_usage_from_response("claims.compare", GROQ_MODEL, parsed_response_obj.usage, prompt,
+                                   response_content, (time.perf_counter() - started) * 1000)
         parsed_response = json.loads(response_content)
         return parsed_response
     except Exception as e:
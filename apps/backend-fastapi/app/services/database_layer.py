@@ -1,20 +1,43 @@
+import json
 import logging
 from typing import Dict, Any, Optional
-from supabase import Client
+from app.services.storage_layer import StorageClient
 
 logger = logging.getLogger("post_truth_scanner")
 
+# JSONB columns of scan_results. Write dicts/lists, never json.dumps() strings:
+# a string is stored as a JSON string scalar and can't be filtered server-side.
+SCAN_JSON_COLUMNS = ("entities", "results", "stage_timings")
+
+
+def decode_legacy_json(value: Any, max_depth: int = 3) -> Any:
+    """
+    Unwraps values written as json.dumps() strings (sometimes twice) by older
+    workers. Structured values are returned as-is; undecodable strings too.
+    """
+    for _ in range(max_depth):
+        if not isinstance(value, str):
+            break
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            break
+    return value
+
 
 def save_scan_result(
-    supabase: Client,
+    storage: StorageClient,
     scan_id: str,
     user_id: str,
     caption: str,
-    analysis_data: Dict[str, Any]
+    analysis_data: Dict[str, Any],
+    stage_timings: Optional[Dict[str, Any]] = None
 ) -> bool:
     """
     Saves or updates a scan result in the 'scan_results' table.
     Uses upsert on 'scan_id' to ensure a placeholder row is updated or inserted.
+    `analysis_data` is also stored whole in `results`.
+    `stage_timings` is the job's per-stage breakdown (see job_telemetry).
     """
 
     try:
@@ -26,7 +49,9 @@ def save_scan_result(
             "truth_summary": analysis_data.get("truth_summary", "Analysis failed"),
             "score": analysis_data.get("score", 0),
             "mismatch_reason": analysis_data.get("mismatch_reason", "N/A"),
-            "entities": analysis_data.get("entities", {})  # leave as dict for JSONB
+            "entities": analysis_data.get("entities", {}),  # leave as dict for JSONB
+            "results": analysis_data,  # full analysis output, as the text path stores it
+            "stage_timings": stage_timings,
         }
 
         logger.info(
@@ -38,7 +63,7 @@ def save_scan_result(
         )
 
         # Upsert handles both insert and update
-        response = supabase.table("scan_results").upsert(
+        response = storage.table("scan_results").upsert(
             result_to_save, on_conflict="scan_id"
         ).execute()
 
@@ -46,7 +71,7 @@ def save_scan_result(
             logger.info("Scan result saved successfully!")
             return True
         else:
-            logger.error(f"Failed to save scan result. Supabase response: {response.data}")
+            logger.error(f"Failed to save scan result. Storage response: {response.data}")
             return False
 
     except Exception as e:
@@ -54,12 +79,12 @@ def save_scan_result(
         return False
 
 
-def get_scan_result(supabase: Client, scan_id: str) -> Optional[Dict[str, Any]]:
+def get_scan_result(storage: StorageClient, scan_id: str) -> Optional[Dict[str, Any]]:
     """
     Retrieves a single scan result from the database by scan_id.
     """
     try:
-        response = supabase.table("scan_results").select("*").eq("scan_id", scan_id).execute()
+        response = storage.table("scan_results").select("*").eq("scan_id", scan_id).execute()
         if response.data:
             return response.data[0]
         else:
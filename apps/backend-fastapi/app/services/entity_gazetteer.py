@@ -0,0 +1,248 @@
+import os
+import re
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_PATH = "app/data/entity_gazetteer.yaml"
+# Names learned from LLM results, kept apart from the curated list; the oldest are dropped first
+LEARNED_CAPACITY = int(os.getenv("ENTITY_LEARNED_CAPACITY", "5000"))
+
+# Output keys, matching the LLM entity schema
+CATEGORIES = ("persons", "organizations", "locations", "events")
+
+_WORD = r"[A-Z][\w'’\-]*(?:\.[A-Z]\.?)*"
+_CAPITALISED_RUN_RE = re.compile(rf"\b{_WORD}(?:\s+(?:(?:of|the|de|da|von|der|al|bin)\s+)?{_WORD})*")
+_SENTENCE_START_WORDS = {
+    "a", "an", "the", "in", "on", "at", "for", "but", "and", "or", "if", "as", "after", "before", "when",
+    "while", "this", "that", "these", "those", "he", "she", "it", "they", "we", "i", "you", "his", "her",
+    "their", "our", "my", "there", "here", "what", "why", "how", "who", "officials", "police", "some",
+    "many", "more", "most", "new", "breaking", "watch", "live", "update", "let", "also",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "january", "february",
+    "march", "april", "may", "june", "july", "august", "september", "october", "november", "december",
+}
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher over lowercased text. All patterns are found in a single
+    pass, so matching cost depends on the text length, not the gazetteer size.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.patterns: List[str] = []
+        for pattern in patterns:
+            self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str):
+        node = 0
+        for ch in pattern.lower():
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _build_failure_links(self):
+        # Depth-1 nodes fail back to the root; deeper nodes follow their parent's failure chain
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str):
+        """Yields (start, end, pattern_index) for every pattern occurrence in `text`."""
+        node = 0
+        for i, ch in enumerate(text.lower()):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for idx in self._out[node]:
+                yield i - len(self.patterns[idx]) + 1, i + 1, idx
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    before_ok = start == 0 or not text[start - 1].isalnum()
+    after_ok = end == len(text) or not text[end].isalnum()
+    return before_ok and after_ok
+
+
+def _case_matches(pattern: str, span: str) -> bool:
+    # Every capital in the pattern must be capital in the text, so "US" never matches "us"
+    return all(not p.isupper() or s.isupper() for p, s in zip(pattern, span))
+
+
+class Gazetteer:
+    def __init__(self, learned_capacity: int = LEARNED_CAPACITY):
+        # alias -> (category, canonical name); curated lists, outlets and authors
+        self._entries: Dict[str, Tuple[str, str]] = {}
+        # name -> (category, name); LLM-extracted names, least recently learned first
+        self._learned: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._learned_capacity = learned_capacity
+        self._matcher: Optional[AhoCorasick] = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries) + len(self._learned)
+
+    def add(self, category: str, canonical: str, aliases: Iterable[str] = ()) -> None:
+        canonical = (canonical or "").strip()
+        if category not in CATEGORIES or len(canonical) < 2:
+            return
+        with self._lock:
+            for name in (canonical, *aliases):
+                name = (name or "").strip()
+                if len(name) >= 2 and name not in self._entries:
+                    self._entries[name] = (category, canonical)
+                    self._learned.pop(name, None)
+                    self._matcher = None
+
+    def learn(self, entities: Dict[str, List[str]], text: str) -> int:
+        """
+        Adds names from an LLM entity result that occur verbatim in `text` (the
+        text they were extracted from) to the capped learned list, so a
+        hallucinated name never becomes a local match. Returns the number learned.
+        """
+        names = [(category, name.strip()) for category in CATEGORIES for name in entities.get(category) or []
+                 if isinstance(name, str) and len(name.strip()) >= 2]
+        if not names:
+            return 0
+        matcher = AhoCorasick(name for _, name in names)
+        found = {matcher.patterns[idx] for start, end, idx in matcher.iter_matches(text)
+                 if _is_word_boundary(text, start, end) and _case_matches(matcher.patterns[idx], text[start:end])}
+
+        learned = 0
+        with self._lock:
+            for category, name in names:
+                if name not in found or name in self._entries:
+                    continue
+                self._learned[name] = (category, name)
+                self._learned.move_to_end(name)
+                learned += 1
+            while len(self._learned) > self._learned_capacity:
+                self._learned.popitem(last=False)
+            if learned:
+                self._matcher = None
+        return learned
+
+    def _lookup(self, name: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            return self._entries.get(name) or self._learned.get(name)
+
+    def _get_matcher(self) -> AhoCorasick:
+        with self._lock:
+            if self._matcher is None:
+                self._matcher = AhoCorasick([*self._entries, *(n for n in self._learned if n not in self._entries)])
+            return self._matcher
+
+    def match(self, text: str) -> Tuple[Dict[str, List[str]], List[Tuple[int, int]]]:
+        """Returns (entities by category, matched character spans), preferring leftmost-longest matches."""
+        matcher = self._get_matcher()
+        candidates = []
+        for start, end, idx in matcher.iter_matches(text):
+            pattern = matcher.patterns[idx]
+            if _is_word_boundary(text, start, end) and _case_matches(pattern, text[start:end]):
+                candidates.append((start, end, pattern))
+
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        entities: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+        spans: List[Tuple[int, int]] = []
+        last_end = -1
+        for start, end, pattern in candidates:
+            if start < last_end:
+                continue
+            entry = self._lookup(pattern)
+            if entry is None:  # learned name dropped since the matcher was built
+                continue
+            category, canonical = entry
+            if canonical not in entities[category]:
+                entities[category].append(canonical)
+            spans.append((start, end))
+            last_end = end
+        return entities, spans
+
+
+def proper_noun_spans(text: str) -> List[Tuple[int, int]]:
+    """Capitalised word runs that probably name something; used to judge gazetteer coverage."""
+    spans = []
+    for m in _CAPITALISED_RUN_RE.finditer(text):
+        span_text = m.group(0)
+        first_word = span_text.split()[0].lower().strip(".'’")
+        if " " not in span_text and first_word in _SENTENCE_START_WORDS:
+            continue
+        spans.append((m.start(), m.end()))
+    return spans
+
+
+def coverage_confidence(text: str, matched_spans: List[Tuple[int, int]]) -> float:
+    """Fraction of proper-noun runs in `text` that overlap a gazetteer match (1.0 if there are none)."""
+    candidates = proper_noun_spans(text)
+    if not candidates:
+        return 1.0
+    covered = sum(1 for s, e in candidates if any(ms < e and s < me for ms, me in matched_spans))
+    return covered / len(candidates)
+
+
+def load_curated(gazetteer: Gazetteer, path: str = GAZETTEER_PATH) -> None:
+    """Loads the curated YAML lists into `gazetteer`."""
+    with open(path, "r") as f:
+        data = yaml.safe_load(f) or {}
+    for category in CATEGORIES:
+        for entry in data.get(category) or []:
+            if isinstance(entry, dict):
+                for canonical, aliases in entry.items():
+                    gazetteer.add(category, canonical, aliases or [])
+            else:
+                gazetteer.add(category, str(entry))
+
+
+def load_history(gazetteer: Gazetteer, storage, limit: int = 5000) -> None:
+    """
+    Merges names we have already seen into the gazetteer:
+    outlets from smart_news, matched authors from author_matches,
+    and previously extracted entities from scan_results. Scan entities come
+    from the LLM, so they are only learned where they occur in the scan's caption.
+    """
+    try:
+        news = storage.table("smart_news").select("source_name").order("created_at", desc=True).limit(limit).execute()
+        for row in news.data or []:
+            gazetteer.add("organizations", row.get("source_name") or "")
+
+        authors = storage.table("author_matches").select("matched_author").limit(limit).execute()
+        for row in authors.data or []:
+            gazetteer.add("persons", row.get("matched_author") or "")
+
+        scans = (storage.table("scan_results").select("caption,entities")
+                 .order("created_at", desc=True).limit(limit).execute())
+        for row in scans.data or []:
+            entities = row.get("entities")
+            if isinstance(entities, str):
+                try:
+                    entities = json.loads(entities)
+                except json.JSONDecodeError:
+                    continue
+            if isinstance(entities, dict) and row.get("caption"):
+                gazetteer.learn(entities, row["caption"])
+    except Exception as e:
+        logger.warning(f"Failed to load gazetteer history from Supabase: {e}")
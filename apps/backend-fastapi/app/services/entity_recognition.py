@@ -1,12 +1,24 @@
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from groq import Groq
 
+from app.config import GROQ_BASE_URL
+from app.services.entity_gazetteer import CATEGORIES, Gazetteer, coverage_confidence, load_curated, load_history
+
 logger = logging.getLogger(__name__)
 
+# Below this share of proper nouns covered by the gazetteer we fall back to the LLM
+LOCAL_CONFIDENCE_THRESHOLD = float(os.getenv("ENTITY_LOCAL_CONFIDENCE", "0.8"))
+HISTORY_REFRESH_SECONDS = 3600
+
+_gazetteer: Optional[Gazetteer] = None
+_history_loaded_at = 0.0
+
 # Lazy initialize the Groq client
 _groq_client = None
 
@@ -17,17 +29,58 @@ def _get_groq_client():
         if not api_key:
             logger.warning("GROQ_API_KEY not found. Groq client not initialized.")
             return None
-        _groq_client = Groq(api_key=api_key)
+        _groq_client = Groq(api_key=api_key, base_url=GROQ_BASE_URL)
     return _groq_client
 
+def _get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+        load_curated(_gazetteer)
+    return _gazetteer
+
+
+def _load_history_sync():
+    from app.services.storage_layer import get_storage_client
+    load_history(_get_gazetteer(), get_storage_client())
+
+
+async def _refresh_history_if_stale():
+    global _history_loaded_at
+    if time.time() - _history_loaded_at < HISTORY_REFRESH_SECONDS:
+        return
+    _history_loaded_at = time.time()
+    try:
+        await asyncio.to_thread(_load_history_sync)
+        logger.info(f"Entity gazetteer refreshed from history ({len(_get_gazetteer())} names).")
+    except Exception as e:
+        logger.warning(f"Could not refresh entity gazetteer from history: {e}")
+
+
+def recognize_entities_locally(text: str) -> Tuple[Dict[str, List[str]], float]:
+    """
+    Gazetteer lookup with no network calls.
+    Returns (entities, coverage confidence in 0..1).
+    """
+    entities, spans = _get_gazetteer().match(text)
+    return entities, coverage_confidence(text, spans)
+
+
 async def recognize_entities(text: str) -> Optional[Dict[str, List[str]]]:
     """
     Recognizes and categorizes entities (Person, Organization, Location, Event) from text.
+    Uses the local gazetteer first and only asks Groq when its coverage is low.
     Returns a dictionary of recognized entities or None on failure.
     """
+    await _refresh_history_if_stale()
+    local_entities, confidence = recognize_entities_locally(text)
+    if confidence >= LOCAL_CONFIDENCE_THRESHOLD:
+        return local_entities
+
+    logger.info(f"Gazetteer coverage {confidence:.2f} below {LOCAL_CONFIDENCE_THRESHOLD}, falling back to Groq.")
     groq_client = _get_groq_client()
     if not groq_client:
-        return None
+        return local_entities
 
     prompt = f"""
     You are an expert entity recognition AI. Your task is to identify and list all named entities from the text provided.
@@ -70,7 +123,14 @@ async def recognize_entities(text: str) -> Optional[Dict[str, List[str]]]:
         parsed_response_obj = completion.parse()
         response_content = parsed_response_obj.choices[0].message.content
         parsed_response = json.loads(response_content)
-        return parsed_response
     except Exception as e:
         logger.error(f"Failed to recognize entities with Groq: {e}\nResponse text: {response_content}")
-        return None
+        return local_entities
+
+    # Learn the new names that really are in the text, so the next mention is resolved locally
+    _get_gazetteer().learn(parsed_response, text)
+    for category in CATEGORIES:
+        merged = list(parsed_response.get(category) or [])
+        merged += [name for name in local_entities[category] if name not in merged]
+        parsed_response[category] = merged
+    return parsed_response
@@ -0,0 +1,195 @@
+# app/services/job_telemetry.py
+"""
+Per-stage timing for analysis jobs.
+
+While a job runs, each stage's start/end, duration, input sizes and outcome are
+written to the Redis hash scan_telemetry:{scan_id} (live view). Finished stages
+are also added to the sorted set stage_timings:{job_type}:{stage}, scored by end
+time, which stage_stats() reads to report p50/p95 over a time window. Finished
+jobs and their durations go to jobs_finished:{job_type}, which admission
+control reads to estimate queue wait.
+
+Library code deeper in the call stack (Gemini, keyframes, Whisper) records
+sub-stages with the module-level stage(), which is a no-op outside a job.
+Telemetry failures are logged and swallowed; they never fail the job.
+
+The breakdown is saved with the result in scan_results.stage_timings, added by
+supabase/migrations/20261019000200_scan_results_stage_timings.sql.
+"""
+
+import contextvars
+import json
+import logging
+import math
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.redis_layer import get_async_redis, get_redis
+
+logger = logging.getLogger("post_truth_scanner")
+
+TELEMETRY_TTL_SECONDS = int(os.getenv("TELEMETRY_TTL_SECONDS", "86400"))
+# Aggregates older than this are trimmed on write; also the widest window stage_stats() can report
+TELEMETRY_RETENTION_SECONDS = int(os.getenv("TELEMETRY_RETENTION_SECONDS", str(7 * 86400)))
+
+# Finished jobs (completed or failed) are kept this long for wait estimates
+FINISHED_WINDOW_SECONDS = int(os.getenv("TELEMETRY_FINISHED_WINDOW_SECONDS", "3600"))
+
+_current: contextvars.ContextVar[Optional["JobTelemetry"]] = contextvars.ContextVar("job_telemetry", default=None)
+
+
+def _job_key(scan_id: str) -> str:
+    return f"scan_telemetry:{scan_id}"
+
+
+def _stage_key(job_type: str, stage_name: str) -> str:
+    return f"stage_timings:{job_type}:{stage_name}"
+
+
+def _finished_key(job_type: str) -> str:
+    return f"jobs_finished:{job_type}"
+
+
+class JobTelemetry:
+    def __init__(self, scan_id: str, job_type: str):
+        self.scan_id = scan_id
+        self.job_type = job_type
+        self.started_at = time.time()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        _current.set(self)
+        self._write({"job_type": job_type, "status": "running", "started_at": self.started_at})
+
+    def _write(self, fields: Dict[str, Any], stage_name: Optional[str] = None,
+               record: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            pipe = get_redis().pipeline()
+            pipe.hset(_job_key(self.scan_id), mapping={k: json.dumps(v) for k, v in fields.items()})
+            pipe.expire(_job_key(self.scan_id), TELEMETRY_TTL_SECONDS)
+            if stage_name and record and record.get("ended_at"):
+                key = _stage_key(self.job_type, stage_name)
+                member = json.dumps({"ms": record["duration_ms"], "ok": record["outcome"] == "ok",
+                                     "id": uuid.uuid4().hex[:8]})
+                pipe.zadd(key, {member: record["ended_at"]})
+                pipe.zremrangebyscore(key, 0, record["ended_at"] - TELEMETRY_RETENTION_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record telemetry for scan_id={self.scan_id}: {e}")
+
+    @contextmanager
+    def stage(self, name: str, **inputs: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Times the block as stage `name`. `inputs` (sizes, counts) are stored with it;
+        the yielded dict can take more fields once they are known (e.g. output sizes).
+        """
+        record: Dict[str, Any] = {"started_at": time.time(), "inputs": inputs}
+        self.stages[name] = record
+        self._write({"current_stage": name, f"stage:{name}": record})
+        started = time.perf_counter()
+        try:
+            yield record
+            record["outcome"] = "ok"
+        except BaseException as e:
+            record["outcome"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            record["ended_at"] = time.time()
+            self._write({f"stage:{name}": record}, name, record)
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Stage timings so far, in the shape persisted with the scan result."""
+        return {
+            "job_type": self.job_type,
+            "total_ms": round((time.time() - self.started_at) * 1000, 1),
+            "stages": {name: {k: v for k, v in record.items() if k != "started_at"}
+                       for name, record in self.stages.items()},
+        }
+
+    def finish(self, outcome: str) -> None:
+        finished_at = time.time()
+        total_ms = round((finished_at - self.started_at) * 1000, 1)
+        self._write({"status": outcome, "current_stage": None, "finished_at": finished_at,
+                     "total_ms": total_ms})
+        _current.set(None)
+        try:
+            pipe = get_redis().pipeline()
+            member = json.dumps({"id": self.scan_id, "ms": total_ms})
+            pipe.zadd(_finished_key(self.job_type), {member: finished_at})
+            pipe.zremrangebyscore(_finished_key(self.job_type), 0, finished_at - FINISHED_WINDOW_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record job completion for scan_id={self.scan_id}: {e}")
+
+
+@contextmanager
+def stage(name: str, **inputs: Any) -> Iterator[Dict[str, Any]]:
+    """Records a sub-stage on the job running in this context, if any."""
+    telemetry = _current.get()
+    if telemetry is None:
+        yield {}
+        return
+    with telemetry.stage(name, **inputs) as record:
+        yield record
+
+
+# --- Reading (API) ---
+
+async def get_job_telemetry(scan_id: str) -> Optional[Dict[str, Any]]:
+    raw = await get_async_redis().hgetall(_job_key(scan_id))
+    if not raw:
+        return None
+    fields = {(k.decode() if isinstance(k, bytes) else k): json.loads(v) for k, v in raw.items()}
+    stages = {k[len("stage:"):]: fields.pop(k) for k in list(fields) if k.startswith("stage:")}
+    return {**fields, "stages": stages}
+
+
+async def jobs_finished(job_type: str, window_seconds: float) -> Tuple[int, Optional[float]]:
+    """(count, mean duration in ms) of `job_type` jobs that finished, either outcome, in the last `window_seconds`."""
+    now = time.time()
+    members = await get_async_redis().zrangebyscore(_finished_key(job_type), now - window_seconds, now)
+    durations = []
+    for member in members:
+        try:
+            durations.append(json.loads(member)["ms"])
+        except (ValueError, KeyError, TypeError):
+            continue  # written before durations were recorded
+    return len(durations), (sum(durations) / len(durations) if durations else None)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank percentile
+    return sorted_values[max(math.ceil(q * len(sorted_values)) - 1, 0)]
+
+
+async def stage_stats(window_seconds: float, job_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """count / errors / p50 / p95 / max duration per (job_type, stage) for stages that ended in the window."""
+    redis = get_async_redis()
+    now = time.time()
+    pattern = _stage_key(job_type or "*", "*")
+    keys = sorted([k.decode() if isinstance(k, bytes) else k async for k in redis.scan_iter(match=pattern)])
+    pipe = redis.pipeline()
+    for key in keys:
+        pipe.zrangebyscore(key, now - window_seconds, now)
+    results = await pipe.execute() if keys else []
+
+    stats = []
+    for key, members in zip(keys, results):
+        samples = [json.loads(m) for m in members]
+        if not samples:
+            continue
+        durations = sorted(s["ms"] for s in samples)
+        _, key_job_type, stage_name = key.split(":", 2)
+        stats.append({
+            "job_type": key_job_type,
+            "stage": stage_name,
+            "count": len(samples),
+            "errors": sum(1 for s in samples if not s["ok"]),
+            "p50_ms": _percentile(durations, 0.50),
+            "p95_ms": _percentile(durations, 0.95),
+            "max_ms": durations[-1],
+        })
+    return stats
@@ -0,0 +1,95 @@
+import json
+from typing import Any, List, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONObjectParser:
+    """
+    Parses a JSON object that arrives in chunks (e.g. an LLM token stream) and
+    hands back each top-level field as soon as its value is complete.
+
+        parser = IncrementalJSONObjectParser()
+        for chunk in stream:
+            for key, value in parser.feed(chunk):
+                ...
+
+    Anything before the opening brace (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._started = False
+        self.done = False
+        self.fields: dict = {}
+        self._decoder = json.JSONDecoder()
+
+    def _skip(self, chars: str) -> None:
+        while self._pos < len(self._buf) and self._buf[self._pos] in chars:
+            self._pos += 1
+
+    def _try_field(self) -> Tuple[bool, Any, Any]:
+        """Attempts `"key": value` at the current position without consuming input on failure."""
+        buf = self._buf
+        pos = self._pos
+        try:
+            key, pos = self._decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            return False, None, None
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buf) or buf[pos] != ":":
+            return False, None, None
+        pos += 1
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buf):
+            return False, None, None
+
+        is_container_or_string = buf[pos] in "{[\""
+        try:
+            value, end = self._decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            return False, None, None
+
+        # Numbers/literals may still be growing ("0.7" -> "0.75"), so wait for a delimiter
+        if not is_container_or_string:
+            look = end
+            while look < len(buf) and buf[look] in _WHITESPACE:
+                look += 1
+            if look >= len(buf) or buf[look] not in ",}":
+                return False, None, None
+
+        self._pos = end
+        return True, key, value
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Adds a chunk and returns the (key, value) pairs completed by it, in order."""
+        if self.done:
+            return []
+        self._buf += chunk
+        completed: List[Tuple[str, Any]] = []
+
+        if not self._started:
+            start = self._buf.find("{", self._pos)
+            if start == -1:
+                self._pos = len(self._buf)
+                return completed
+            self._pos = start + 1
+            self._started = True
+
+        while True:
+            self._skip(_WHITESPACE + ",")
+            if self._pos >= len(self._buf):
+                break
+            if self._buf[self._pos] == "}":
+                self._pos += 1
+                self.done = True
+                break
+            ok, key, value = self._try_field()
+            if not ok:
+                break
+            self.fields[key] = value
+            completed.append((key, value))
+        return completed
@@ -0,0 +1,136 @@
+# app/services/local_blob_store.py
+"""
+Local-disk blob store:
+
+    {BLOB_STORE_PATH}/objects/ab/ab12...ef.mp4   content, named by blob id
+    {BLOB_STORE_PATH}/incoming/                  uploads being hashed
+
+Uploads are hashed while they are written to incoming/ and then renamed into
+objects/ (same filesystem, so the rename is atomic); if the blob already exists
+the new copy is dropped and the existing file's mtime refreshed. Reference
+counts live in the Redis hash blob_refs so the API and every worker see the
+same counts.
+
+put() takes its reference and stores or refreshes the file while holding the
+blob's Redis lock, and gc() re-reads the count and mtime and deletes under that
+same lock, so a blob is never deleted once put() has returned its id.
+"""
+
+import hashlib
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+import aiofiles
+
+from app.config import BLOB_STORE_PATH
+from app.services.blob_store import BlobTooLarge, check_blob_id, make_blob_id
+from app.services.redis_layer import get_async_redis, get_redis
+
+logger = logging.getLogger("post_truth_scanner")
+
+REFS_KEY = "blob_refs"
+# Held only around a rename/utime or an unlink, so a short timeout is plenty
+BLOB_LOCK_TIMEOUT_SECONDS = 30
+
+
+def _lock_key(blob_id: str) -> str:
+    return f"blob_lock:{blob_id}"
+
+
+class LocalBlobStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or BLOB_STORE_PATH)
+        self.objects = self.root / "objects"
+        self.incoming = self.root / "incoming"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.incoming.mkdir(parents=True, exist_ok=True)
+
+    def path(self, blob_id: str) -> Path:
+        check_blob_id(blob_id)
+        return self.objects / blob_id[:2] / blob_id
+
+    async def put(self, chunks: AsyncIterator[bytes], suffix: str, max_bytes: int) -> str:
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = self.incoming / uuid.uuid4().hex
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise BlobTooLarge(max_bytes)
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            blob_id = make_blob_id(digest.hexdigest(), suffix)
+            final_path = self.path(blob_id)
+            final_path.parent.mkdir(exist_ok=True)
+            redis = get_async_redis()
+            async with redis.lock(_lock_key(blob_id), timeout=BLOB_LOCK_TIMEOUT_SECONDS,
+                                  blocking_timeout=BLOB_LOCK_TIMEOUT_SECONDS):
+                await redis.hincrby(REFS_KEY, blob_id, 1)
+                try:
+                    try:
+                        os.utime(final_path)  # already stored: keep that copy
+                        logger.info(f"Upload matches stored blob {blob_id} ({size} bytes)")
+                    except FileNotFoundError:
+                        os.replace(tmp_path, final_path)
+                        logger.info(f"Stored blob {blob_id} ({size} bytes)")
+                except BaseException:
+                    await redis.hincrby(REFS_KEY, blob_id, -1)
+                    raise
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        return blob_id
+
+    def release(self, blob_id: str) -> None:
+        try:
+            redis = get_redis()
+            if redis.hincrby(REFS_KEY, check_blob_id(blob_id), -1) <= 0:
+                redis.hdel(REFS_KEY, blob_id)
+        except Exception as e:
+            # A leaked reference only keeps the blob on disk
+            logger.warning(f"Failed to release blob {blob_id}: {e}")
+
+    def gc(self, grace_seconds: float, dry_run: bool = False) -> Tuple[int, int]:
+        redis = get_redis()
+        cutoff = time.time() - grace_seconds
+        deleted = freed = 0
+
+        # Uploads abandoned mid-stream (e.g. the API process died)
+        for tmp_path in self.incoming.iterdir():
+            if tmp_path.stat().st_mtime < cutoff and not dry_run:
+                tmp_path.unlink(missing_ok=True)
+
+        for blob_path in self.objects.glob("*/*"):
+            try:
+                stat = blob_path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime >= cutoff or int(redis.hget(REFS_KEY, blob_path.name) or 0) > 0:
+                continue
+            if dry_run:
+                deleted += 1
+                freed += stat.st_size
+                continue
+
+            lock = redis.lock(_lock_key(blob_path.name), timeout=BLOB_LOCK_TIMEOUT_SECONDS)
+            if not lock.acquire(blocking=False):
+                continue  # a put() of the same content is storing it
+            try:
+                # Re-checked under the lock: a put() that got there first holds a reference
+                if int(redis.hget(REFS_KEY, blob_path.name) or 0) > 0 or blob_path.stat().st_mtime >= cutoff:
+                    continue
+                blob_path.unlink()
+                deleted += 1
+                freed += stat.st_size
+            except FileNotFoundError:
+                pass
+            finally:
+                lock.release()
+        return deleted, freed
@@ -13,6 +13,8 @@ load_dotenv()
 
 import aiofiles
 
+from app.services import job_telemetry
+
 # Optional clients
 try:
     import google.generativeai as genai
@@ -139,7 +141,9 @@ async def analyze_media_with_gemini(media_path: Path, caption: str) -> str:
     Returns a comprehensive text summary.
     """
     if is_video(media_path):
-        keyframes = extract_keyframes(media_path)
+        with job_telemetry.stage("keyframes") as record:
+            keyframes = extract_keyframes(media_path)
+            record["frames"] = len(keyframes)
         if not keyframes:
             return "Video analysis failed: No keyframes extracted."
         
@@ -154,7 +158,8 @@ async def analyze_media_with_gemini(media_path: Path, caption: str) -> str:
             
         parts.append("Please provide a combined visual summary.")
         
-        summary = await analyze_with_gemini(parts, model_name="gemini-2.5-flash-preview-05-20")
+        with job_telemetry.stage("gemini", images=len(keyframes)):
+            summary = await analyze_with_gemini(parts, model_name="gemini-2.5-flash-preview-05-20")
         return summary
 
     else: # It's an image
@@ -162,12 +167,14 @@ async def analyze_media_with_gemini(media_path: Path, caption: str) -> str:
             {"mime_type": "image/jpeg", "data": encode_image_to_base64(media_path)},
             f"Analyze this image in the context of the caption: '{caption}'. Provide a detailed description of this image and extract any text you see."
         ]
-        summary = await analyze_with_gemini(parts, model_name="gemini-2.5-flash-preview-05-20")
+        with job_telemetry.stage("gemini", images=1):
+            summary = await analyze_with_gemini(parts, model_name="gemini-2.5-flash-preview-05-20")
         return summary
 
 async def transcribe_audio_from_video(video_path: Path) -> str:
     """Transcribes audio from a video file using the Whisper model."""
-    audio_path = extract_audio_from_video(video_path)
+    with job_telemetry.stage("audio_extract"):
+        audio_path = extract_audio_from_video(video_path)
     if not audio_path:
         return ""
     
@@ -177,7 +184,8 @@ async def transcribe_audio_from_video(video_path: Path) -> str:
 
     try:
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, lambda: model.transcribe(str(audio_path), fp16=False))
+        with job_telemetry.stage("whisper", audio_bytes=audio_path.stat().st_size):
+            result = await loop.run_in_executor(None, lambda: model.transcribe(str(audio_path), fp16=False))
         return result['text']
     except Exception as e:
         logger.error(f"Whisper transcription failed: {e}")
@@ -0,0 +1,70 @@
+# app/services/pagination.py
+"""
+Keyset (cursor) pagination and column projection for history endpoints.
+
+Pages are ordered by (created_at, id) descending. The cursor is the sort key of
+the last row served, so fetching page N costs the same as page 1 (no OFFSET).
+"""
+
+import base64
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "200"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Always selected: needed to build the next cursor
+KEY_COLUMNS = ("created_at", "id")
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    raw = json.dumps([row.get("created_at"), row.get("id")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(created_at, str):
+            raise ValueError("created_at")
+        return created_at, row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1.")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def projection(fields: Optional[str], allowed: Iterable[str], default: Iterable[str]) -> str:
+    """
+    Turns `?fields=a,b` into a select list. Unknown columns are rejected so a typo
+    can't turn into a PostgREST error; `fields=*` selects every column.
+    """
+    if fields is not None and fields.strip() == "*":
+        return "*"
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(default)
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    columns: List[str] = list(dict.fromkeys([*KEY_COLUMNS, *requested]))
+    return ",".join(columns)
+
+
+def keyset_filter(after: Tuple[str, Any]) -> str:
+    """PostgREST `or` filter for rows strictly after the cursor in (created_at, id) DESC order."""
+    created_at, row_id = after
+    ts = json.dumps(created_at)  # quoted: timestamps contain ':' and '+'
+    rid = json.dumps(str(row_id))
+    return f"created_at.lt.{ts},and(created_at.eq.{ts},id.lt.{rid})"
@@ -0,0 +1,143 @@
+import os
+import re
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional local tokenizer. Llama 3 uses a tiktoken-style BPE, so cl100k_base is a
+# close stand-in; without tiktoken we fall back to a word/punctuation estimate.
+try:
+    import tiktoken
+except Exception as e:
+    tiktoken = None
+    logger.warning(f"tiktoken not available, using approximate token counts: {e}")
+
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+# Max prompt tokens we are willing to send per request, per model.
+# Kept well under the context window so requests also fit per-request TPM limits.
+MODEL_PROMPT_BUDGETS: Dict[str, int] = {
+    "llama-3.1-8b-instant": int(os.getenv("PROMPT_BUDGET_LLAMA_8B", "5000")),
+}
+
+_encoder = None
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|(?<=[.!?…][\"')\]])\s+|\n{2,}")
+
+
+def _get_encoder():
+    global _encoder
+    if _encoder is None and tiktoken is not None:
+        try:
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"Failed to load tiktoken encoding, using approximate counts: {e}")
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens locally. Exact with tiktoken, otherwise a ~1.3 tokens/word estimate."""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return int(len(_WORD_RE.findall(text)) * 1.3) + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits text on sentence-ending punctuation and paragraph breaks."""
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s and s.strip()]
+
+
+def model_budget(model: str = DEFAULT_MODEL, reserved: int = 0) -> int:
+    """Prompt tokens left for user content once `reserved` tokens (instructions etc.) are spent."""
+    budget = MODEL_PROMPT_BUDGETS.get(model, MODEL_PROMPT_BUDGETS[DEFAULT_MODEL])
+    return max(budget - reserved, 0)
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    encoder = _get_encoder()
+    if encoder is not None:
+        return encoder.decode(encoder.encode(text, disallowed_special=())[:max_tokens])
+    words = text.split()
+    return " ".join(words[: max(int(max_tokens / 1.3), 1)])
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """
+    Trims text to at most `max_tokens`, dropping whole sentences from the end.
+    Only a single over-long leading sentence is cut mid-sentence.
+    """
+    if not text or count_tokens(text) <= max_tokens:
+        return text or ""
+
+    kept: List[str] = []
+    used = 0
+    for sentence in split_sentences(text):
+        cost = count_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+
+    if not kept:
+        return _truncate_tokens(text, max_tokens)
+    return " ".join(kept)
+
+
+# ======================================================
+# Usage Accounting
+# ======================================================
+_usage_lock = threading.Lock()
+_usage_totals: Dict[str, Dict[str, int]] = {}
+
+
+def record_usage(
+    call: str,
+    model: str,
+    prompt_tokens: Optional[int],
+    completion_tokens: Optional[int],
+    latency_ms: Optional[float] = None,
+) -> None:
+    """Logs token counts for one LLM call and adds them to the per-call totals."""
+    prompt_tokens = int(prompt_tokens or 0)
+    completion_tokens = int(completion_tokens or 0)
+    with _usage_lock:
+        totals = _usage_totals.setdefault(call, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+
+    latency = f" latency_ms={latency_ms:.0f}" if latency_ms is not None else ""
+    logger.info(
+        f"LLM usage call={call} model={model} prompt_tokens={prompt_tokens} "
+        f"completion_tokens={completion_tokens}{latency}"
+    )
+
+
+def record_usage_from_response(call: str, model: str, usage: Any, prompt: str = "", completion: str = "",
+                               latency_ms: Optional[float] = None) -> None:
+    """
+    Records usage from an OpenAI-style `usage` block (dict or SDK object).
+    Falls back to local counts of the prompt/completion when the provider omits it.
+    """
+    if isinstance(usage, dict):
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+    else:
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+
+    if prompt_tokens is None:
+        prompt_tokens = count_tokens(prompt)
+    if completion_tokens is None:
+        completion_tokens = count_tokens(completion)
+    record_usage(call, model, prompt_tokens, completion_tokens, latency_ms)
+
+
+def get_usage_totals() -> Dict[str, Dict[str, int]]:
+    with _usage_lock:
+        return {call: dict(totals) for call, totals in _usage_totals.items()}
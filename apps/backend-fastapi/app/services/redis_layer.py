@@ -0,0 +1,28 @@
+import logging
+
+from redis import Redis
+import redis.asyncio as aioredis
+
+from app.config import REDIS_URL
+
+logger = logging.getLogger("post_truth_scanner")
+
+# One connection pool per process for each flavour of client
+_redis: Redis = None
+_async_redis: aioredis.Redis = None
+
+
+def get_redis() -> Redis:
+    """Returns the process-wide synchronous Redis client (workers, RQ jobs)."""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(REDIS_URL)
+    return _redis
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Returns the process-wide asyncio Redis client (API handlers)."""
+    global _async_redis
+    if _async_redis is None:
+        _async_redis = aioredis.from_url(REDIS_URL)
+    return _async_redis
@@ -0,0 +1,144 @@
+# app/services/repositories.py
+"""
+Async data access for route handlers.
+
+Both storage backends (Supabase, SQLite) are synchronous, so every query runs on
+a dedicated thread pool (one thread per pooled HTTP connection) against the
+shared client. Handlers await I/O instead of blocking the event loop.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.pagination import encode_cursor, keyset_filter
+from app.services.storage_layer import get_storage_client
+from app.services.supabase_layer import SUPABASE_MAX_CONNECTIONS
+
+Row = Dict[str, Any]
+
+_executor = ThreadPoolExecutor(max_workers=SUPABASE_MAX_CONNECTIONS, thread_name_prefix="storage")
+
+
+async def run_query(build: Callable[[Any], Any]) -> Any:
+    """Runs `build(client).execute()` off the event loop and returns the response."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: build(get_storage_client()).execute())
+
+
+async def fetch_page(table: str, columns: str, limit: int, after: Optional[Tuple[str, Any]] = None,
+                     where: Optional[Callable[[Any], Any]] = None) -> Tuple[List[Row], Optional[str]]:
+    """
+    One keyset page ordered by (created_at, id) DESC. `where(query)` may add filters.
+    Returns (rows, next cursor or None when this is the last page).
+    """
+    def build(db):
+        query = db.table(table).select(columns)
+        if where:
+            query = where(query)
+        if after:
+            query = query.or_(keyset_filter(after))
+        # One extra row tells us whether another page exists
+        return query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+
+    rows = (await run_query(build)).data or []
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+async def fetch_summary(table: str, count: str = "estimated") -> Row:
+    """Row count (exact / planned / estimated) and newest created_at, without fetching rows."""
+    total = await run_query(lambda db: db.table(table).select("id", count=count, head=True))
+    latest = await run_query(lambda db: db.table(table).select("created_at").order("created_at", desc=True).limit(1))
+    return {
+        "total": total.count,
+        "count_method": count,
+        "latest_created_at": latest.data[0]["created_at"] if latest.data else None,
+    }
+
+
+class ScanRepository:
+    """scan_results: one row per text/media truth scan, keyed by scan_id."""
+
+    table = "scan_results"
+    columns = ("id", "scan_id", "user_id", "caption", "truth_summary", "score", "mismatch_reason",
+               "entities", "results", "stage_timings", "created_at")
+    # List views skip the heavy `results` JSON unless asked for it
+    list_columns = ("scan_id", "caption", "truth_summary", "score", "mismatch_reason", "entities")
+
+    async def get(self, scan_id: str) -> Optional[Row]:
+        response = await run_query(lambda db: db.table(self.table).select("*").eq("scan_id", scan_id).limit(1))
+        return response.data[0] if response.data else None
+
+    async def list_page(self, columns: str, limit: int, after: Optional[Tuple[str, Any]] = None,
+                        min_score: Optional[float] = None, max_score: Optional[float] = None,
+                        entities: Optional[Dict[str, List[str]]] = None) -> Tuple[List[Row], Optional[str]]:
+        """
+        Filters run in Postgres: score range on the numeric column, and `entities`
+        as JSONB containment, e.g. {"persons": ["Ada Lovelace"]} (entities @> ...).
+        """
+        def where(query):
+            if min_score is not None:
+                query = query.gte("score", min_score)
+            if max_score is not None:
+                query = query.lte("score", max_score)
+            if entities:
+                query = query.contains("entities", entities)
+            return query
+
+        return await fetch_page(self.table, columns, limit, after, where)
+
+    async def summary(self, count: str = "estimated") -> Row:
+        return await fetch_summary(self.table, count)
+
+    async def upsert(self, row: Row) -> Optional[Row]:
+        response = await run_query(lambda db: db.table(self.table).upsert(row, on_conflict="scan_id"))
+        return response.data[0] if response.data else None
+
+
+class AuthorMatchRepository:
+    """author_matches: audio transcripts and their matched author."""
+
+    table = "author_matches"
+    columns = ("id", "transcript", "matched_author", "author", "confidence", "timestamp",
+               "raw_response", "raw_scores", "created_at")
+    # List views skip raw_response / raw_scores unless asked for them
+    list_columns = ("transcript", "matched_author", "author", "confidence", "timestamp")
+
+    async def get(self, match_id: str) -> Optional[Row]:
+        response = await run_query(lambda db: db.table(self.table).select("*").eq("id", match_id).limit(1))
+        return response.data[0] if response.data else None
+
+    async def list_page(self, columns: str, limit: int,
+                        after: Optional[Tuple[str, Any]] = None) -> Tuple[List[Row], Optional[str]]:
+        return await fetch_page(self.table, columns, limit, after)
+
+    async def summary(self, count: str = "estimated") -> Row:
+        return await fetch_summary(self.table, count)
+
+    async def insert(self, row: Row) -> Optional[Row]:
+        response = await run_query(lambda db: db.table(self.table).insert(row))
+        return response.data[0] if response.data else None
+
+    async def update(self, match_id: str, changes: Row) -> None:
+        await run_query(lambda db: db.table(self.table).update(changes).eq("id", match_id))
+
+    async def delete(self, match_id: str) -> None:
+        await run_query(lambda db: db.table(self.table).delete().eq("id", match_id))
+
+
+class NewsRepository:
+    """smart_news articles and the songs generated from them."""
+
+    async def get_article(self, news_id: str) -> Optional[Row]:
+        response = await run_query(lambda db: db.table("smart_news").select("*").eq("id", news_id).limit(1))
+        return response.data[0] if response.data else None
+
+    async def insert_song(self, row: Row) -> Optional[Row]:
+        response = await run_query(lambda db: db.table("news_songs").insert(row))
+        return response.data[0] if response.data else None
+
+
+scans = ScanRepository()
+author_matches = AuthorMatchRepository()
+news = NewsRepository()
@@ -0,0 +1,150 @@
+# app/services/result_cache.py
+"""
+Redis read-through cache for scan-result polling.
+
+Two keys per scan:
+  scan_result:{scan_id}  the finished scan_results row (JSON), written by the worker
+                         when it saves, or by the API on the first database read.
+  scan_state:{scan_id}   "queued" / "running" / "failed" while there is no row yet,
+                         written at enqueue time and by the worker.
+
+While a scan is in progress, polls are answered from scan_state alone, so
+neither Supabase nor RQ's job hash is touched. Cache failures are logged and
+treated as misses: the database stays the source of truth.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.services.redis_layer import get_redis, get_async_redis
+
+logger = logging.getLogger("post_truth_scanner")
+
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+# Outlives any realistic job; a worker that dies mid-job stops blocking the database path after this
+JOB_STATE_TTL_SECONDS = int(os.getenv("JOB_STATE_TTL_SECONDS", "1800"))
+# Unknown scan ids (no row, no state) are re-checked at most this often
+MISS_TTL_SECONDS = int(os.getenv("RESULT_CACHE_MISS_TTL_SECONDS", "2"))
+
+QUEUED, RUNNING, FAILED, PENDING, COMPLETED = "queued", "running", "failed", "pending", "completed"
+
+# Concurrent misses for the same scan in this process share one database read
+_inflight: Dict[str, "asyncio.Future"] = {}
+
+
+def _result_key(scan_id: str) -> str:
+    return f"scan_result:{scan_id}"
+
+
+def _state_key(scan_id: str) -> str:
+    return f"scan_state:{scan_id}"
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+# --- Worker side (sync) ---
+
+def store_result(scan_id: str, row: Optional[Dict[str, Any]]) -> None:
+    """Caches the saved row and clears the job state. Without a row the cache is only invalidated."""
+    try:
+        pipe = get_redis().pipeline()
+        if row:
+            pipe.set(_result_key(scan_id), json.dumps(row, default=str), ex=RESULT_CACHE_TTL_SECONDS)
+        else:
+            pipe.delete(_result_key(scan_id))
+        pipe.delete(_state_key(scan_id))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to cache result for scan_id={scan_id}: {e}")
+
+
+def set_job_state(scan_id: str, state: Optional[str]) -> None:
+    """Records a job state from a worker; None clears it so polls fall back to the database."""
+    try:
+        redis = get_redis()
+        if state is None:
+            redis.delete(_state_key(scan_id))
+        else:
+            ttl = RESULT_CACHE_TTL_SECONDS if state == FAILED else JOB_STATE_TTL_SECONDS
+            redis.set(_state_key(scan_id), state, ex=ttl)
+    except Exception as e:
+        logger.warning(f"Failed to record job state '{state}' for scan_id={scan_id}: {e}")
+
+
+# --- API side (async) ---
+
+async def mark_queued(scan_id: str) -> None:
+    """
+    Called just before enqueueing (a fast worker could otherwise finish first and
+    have its result dropped). Also clears a stale result when a scan_id is re-run.
+    """
+    try:
+        pipe = get_async_redis().pipeline()
+        pipe.delete(_result_key(scan_id))
+        pipe.set(_state_key(scan_id), QUEUED, ex=JOB_STATE_TTL_SECONDS)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to record queued state for scan_id={scan_id}: {e}")
+
+
+async def _read_cache(scan_id: str) -> Tuple[Optional[bytes], Optional[str]]:
+    try:
+        pipe = get_async_redis().pipeline()
+        pipe.get(_result_key(scan_id))
+        pipe.get(_state_key(scan_id))
+        raw, state = await pipe.execute()
+        return raw, state.decode() if isinstance(state, bytes) else state
+    except Exception as e:
+        logger.warning(f"Result cache read failed for scan_id={scan_id}: {e}")
+        return None, None
+
+
+async def _fill(scan_id: str, load_row: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+                load_state: Callable[[], Awaitable[str]]) -> Tuple[Optional[Dict[str, Any]], str]:
+    row = await load_row()
+    state = COMPLETED if row else await load_state()
+    try:
+        redis = get_async_redis()
+        if row:
+            await redis.set(_result_key(scan_id), json.dumps(row, default=str), ex=RESULT_CACHE_TTL_SECONDS)
+        else:
+            ttl = {FAILED: RESULT_CACHE_TTL_SECONDS, PENDING: MISS_TTL_SECONDS}.get(state, JOB_STATE_TTL_SECONDS)
+            # nx: never overwrite a state a worker wrote while we were reading
+            await redis.set(_state_key(scan_id), state, ex=ttl, nx=True)
+    except Exception as e:
+        logger.warning(f"Result cache write failed for scan_id={scan_id}: {e}")
+    return row, state
+
+
+async def get_scan_result(scan_id: str, load_row: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+                          load_state: Callable[[], Awaitable[str]]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Returns (row, state): (row, "completed") once the scan is saved, otherwise
+    (None, queued / running / failed / pending). `load_row` reads the database and
+    `load_state` asks the job queue; both run only on a cache miss.
+    """
+    raw, state = await _read_cache(scan_id)
+    if raw is not None:
+        return json.loads(raw), COMPLETED
+    if state is not None:
+        return None, state
+
+    future = _inflight.get(scan_id)
+    if future is None:
+        future = asyncio.ensure_future(_fill(scan_id, load_row, load_state))
+        _inflight[scan_id] = future
+        future.add_done_callback(lambda _: _inflight.pop(scan_id, None))
+    return await asyncio.shield(future)
@@ -0,0 +1,98 @@
+import json
+import time
+import uuid
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.services.redis_layer import get_redis, get_async_redis
+
+logger = logging.getLogger("post_truth_scanner")
+
+# Events are also appended to a short-lived log so late subscribers can catch up
+EVENT_LOG_TTL_SECONDS = 900
+TERMINAL_EVENTS = {"completed", "failed"}
+
+
+def _channel(scan_id: str) -> str:
+    return f"scan_events:{scan_id}"
+
+
+def _log_key(scan_id: str) -> str:
+    return f"scan_events:{scan_id}:log"
+
+
+def make_event(scan_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4().hex,
+        "event": event,
+        "scan_id": scan_id,
+        "data": data or {},
+        "ts": time.time(),
+    }
+
+
+def publish_event(scan_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Publishes a scan event from a worker. Failures are logged and swallowed:
+    losing a progress event must never fail the analysis job itself.
+    """
+    message = json.dumps(make_event(scan_id, event, data))
+    try:
+        pipe = get_redis().pipeline()
+        pipe.rpush(_log_key(scan_id), message)
+        pipe.expire(_log_key(scan_id), EVENT_LOG_TTL_SECONDS)
+        pipe.publish(_channel(scan_id), message)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish '{event}' event for scan_id={scan_id}: {e}")
+
+
+def _format_sse(message: Dict[str, Any]) -> str:
+    return f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+
+
+async def stream_events(scan_id: str, heartbeat_seconds: float = 15, timeout_seconds: float = 600,
+                        snapshot: Optional[Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = None
+                        ) -> AsyncIterator[str]:
+    """
+    Yields Server-Sent Events for a scan: first the events already logged, then the
+    current state from `snapshot()` (covers scans whose log has expired or that
+    finished before anything was logged), then live events from pub/sub, until a
+    terminal event arrives or the timeout passes.
+    """
+    redis = get_async_redis()
+    pubsub = redis.pubsub()
+    # Subscribe before reading the log so nothing published in between is lost
+    await pubsub.subscribe(_channel(scan_id))
+    seen_ids = set()
+    try:
+        for raw in await redis.lrange(_log_key(scan_id), 0, -1):
+            message = json.loads(raw)
+            seen_ids.add(message["id"])
+            yield _format_sse(message)
+            if message["event"] in TERMINAL_EVENTS:
+                return
+
+        if snapshot is not None:
+            message = await snapshot()
+            if message:
+                yield _format_sse(message)
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+
+        deadline = time.monotonic() + timeout_seconds
+        while time.monotonic() < deadline:
+            raw = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat_seconds)
+            if raw is None:
+                yield ": keep-alive\n\n"
+                continue
+            message = json.loads(raw["data"])
+            if message["id"] in seen_ids:
+                continue
+            yield _format_sse(message)
+            if message["event"] in TERMINAL_EVENTS:
+                return
+        yield _format_sse({"event": "timeout", "scan_id": scan_id, "data": {}})
+    finally:
+        await pubsub.unsubscribe(_channel(scan_id))
+        await pubsub.aclose()
@@ -0,0 +1,420 @@
+# app/services/sqlite_store.py
+"""
+Local SQLite (WAL mode) storage backend, used with STORAGE_BACKEND=sqlite.
+
+Implements the part of supabase-py's query builder this codebase uses, so
+repositories, workers and scripts run unchanged on a single machine:
+
+    client.table("scan_results").select("id,score").eq("user_id", uid)
+          .order("created_at", desc=True).limit(50).execute().data
+
+Supported: select (count=, head=), insert, upsert (on_conflict=), update,
+delete; filters eq / neq / gt / gte / lt / lte / in_ / like / ilike / is_ /
+contains and PostgREST-style or_() logic trees; order and limit. JSON columns
+are stored as text and returned decoded, like JSONB through PostgREST.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import SQLITE_PATH
+
+logger = logging.getLogger("post_truth_scanner")
+
+# table -> {column: type}; "json" and "bool" are decoded on read
+SCHEMA: Dict[str, Dict[str, str]] = {
+    "scan_results": {
+        "id": "text", "created_at": "text", "scan_id": "text", "user_id": "text", "caption": "text",
+        "truth_summary": "text", "score": "real", "mismatch_reason": "text", "entities": "json", "results": "json",
+        "stage_timings": "json",
+    },
+    "author_matches": {
+        "id": "text", "created_at": "text", "transcript": "text", "matched_author": "text", "author": "text",
+        "confidence": "real", "timestamp": "text", "raw_response": "json", "raw_scores": "json",
+    },
+    "smart_news": {
+        "id": "text", "created_at": "text", "title": "text", "summary": "text", "source_name": "text",
+        "source_url": "text", "bias": "text", "bias_confidence": "real", "trust_score": "real",
+        "language": "text", "author_fingerprint": "text", "cluster_id": "text", "published_at": "text",
+    },
+    "claims": {
+        "id": "text", "created_at": "text", "article_id": "text", "claim_text": "text", "claim_type": "text",
+        "context": "text",
+    },
+    "news_songs": {
+        "id": "text", "created_at": "text", "news_id": "text", "genre": "text", "lyrics": "text",
+        "song_url": "text",
+    },
+    "feed_catalog": {
+        "id": "text", "created_at": "text", "url": "text", "enabled": "bool",
+    },
+}
+
+UNIQUE_COLUMNS = {"scan_results": ["scan_id"], "feed_catalog": ["url"]}
+INDEXED_COLUMNS = {"smart_news": ["source_url"], "claims": ["article_id"], "scan_results": ["score"]}
+
+_SQL_TYPES = {"text": "TEXT", "real": "REAL", "integer": "INTEGER", "json": "TEXT", "bool": "INTEGER"}
+_COMPARISONS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE"}
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class SQLiteResponse:
+    """Same shape as supabase-py's APIResponse for the fields callers read."""
+    data: List[Dict[str, Any]] = field(default_factory=list)
+    count: Optional[int] = None
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Splits `a.eq.1,and(b.eq.2,c.eq.3)` on commas outside parentheses and quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(text):
+        if ch == '"' and (i == 0 or text[i - 1] != "\\"):
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unquote(value: str) -> str:
+    return json.loads(value) if value.startswith('"') and value.endswith('"') else value
+
+
+class SQLiteQuery:
+    def __init__(self, client: "SQLiteClient", table: str):
+        if table not in SCHEMA:
+            raise ValueError(f"Unknown table '{table}'")
+        self._client = client
+        self._table = table
+        self._columns = SCHEMA[table]
+        self._op = "select"
+        self._select = "*"
+        self._count: Optional[str] = None
+        self._head = False
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._where: List[Tuple[str, List[Any]]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+
+    # --- Operations ---
+
+    def select(self, columns: str = "*", count: Optional[str] = None, head: bool = False) -> "SQLiteQuery":
+        self._op, self._select, self._count, self._head = "select", columns, count, head
+        return self
+
+    def insert(self, rows: Any, **_) -> "SQLiteQuery":
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: Optional[str] = None, **_) -> "SQLiteQuery":
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict or "id"
+        return self
+
+    def update(self, values: Dict[str, Any], **_) -> "SQLiteQuery":
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self, **_) -> "SQLiteQuery":
+        self._op = "delete"
+        return self
+
+    # --- Filters ---
+
+    def _column(self, name: str) -> str:
+        if name not in self._columns:
+            raise ValueError(f"Unknown column '{name}' on '{self._table}'")
+        return _quote(name)
+
+    def _condition(self, column: str, op: str, value: Any) -> Tuple[str, List[Any]]:
+        col = self._column(column)
+        if op in ("like", "ilike"):
+            value = value.replace("*", "%")  # PostgREST wildcard
+        if op in _COMPARISONS:
+            return f"{col} {_COMPARISONS[op]} ?", [self._encode(column, value)]
+        if op == "ilike":
+            return f"lower({col}) LIKE lower(?)", [value]
+        if op == "in":
+            values = list(value)
+            if not values:
+                return "0", []
+            return f"{col} IN ({','.join('?' * len(values))})", [self._encode(column, v) for v in values]
+        if op == "is":
+            keyword = {None: "NULL", "null": "NULL", True: "TRUE", "true": "TRUE", False: "FALSE", "false": "FALSE"}
+            return f"{col} IS {keyword[value]}", []
+        if op == "cs":
+            return self._contains(column, json.loads(value) if isinstance(value, str) else value)
+        raise ValueError(f"Unsupported filter operator '{op}'")
+
+    def _contains(self, column: str, value: Any) -> Tuple[str, List[Any]]:
+        """JSON containment (`@>`) for the shapes used here: {key: [items]}, {key: scalar}, [items]."""
+        col = self._column(column)
+        clauses, params = [], []
+
+        def has_items(path: str, items: List[Any]):
+            for item in items:
+                clauses.append(f"EXISTS (SELECT 1 FROM json_each({col}, ?) WHERE value = ?)")
+                params.extend([path, item])
+
+        if isinstance(value, dict):
+            for key, expected in value.items():
+                path = "$." + json.dumps(key)
+                if isinstance(expected, list):
+                    has_items(path, expected)
+                else:
+                    clauses.append(f"json_extract({col}, ?) = ?")
+                    params.extend([path, expected])
+        elif isinstance(value, list):
+            has_items("$", value)
+        else:
+            raise ValueError("contains() expects a dict or list")
+        return " AND ".join(clauses) or "1", params
+
+    def _filter(self, column: str, op: str, value: Any) -> "SQLiteQuery":
+        self._where.append(self._condition(column, op, value))
+        return self
+
+    def eq(self, column: str, value: Any): return self._filter(column, "eq", value)
+    def neq(self, column: str, value: Any): return self._filter(column, "neq", value)
+    def gt(self, column: str, value: Any): return self._filter(column, "gt", value)
+    def gte(self, column: str, value: Any): return self._filter(column, "gte", value)
+    def lt(self, column: str, value: Any): return self._filter(column, "lt", value)
+    def lte(self, column: str, value: Any): return self._filter(column, "lte", value)
+    def like(self, column: str, pattern: str): return self._filter(column, "like", pattern)
+    def ilike(self, column: str, pattern: str): return self._filter(column, "ilike", pattern)
+    def in_(self, column: str, values): return self._filter(column, "in", values)
+    def is_(self, column: str, value: Any): return self._filter(column, "is", value)
+    def contains(self, column: str, value: Any): return self._filter(column, "cs", value)
+
+    def _logic_tree(self, expression: str, joiner: str) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for part in _split_top_level(expression):
+            for keyword in ("and", "or"):
+                if part.startswith(keyword + "(") and part.endswith(")"):
+                    sql, sub_params = self._logic_tree(part[len(keyword) + 1:-1], keyword.upper())
+                    break
+            else:
+                column, op, raw = part.split(".", 2)
+                value = raw
+                if op == "in":
+                    value = [_unquote(v) for v in _split_top_level(raw.strip("()"))]
+                elif op != "cs":
+                    value = _unquote(raw)
+                sql, sub_params = self._condition(column, op, value)
+            clauses.append(f"({sql})")
+            params.extend(sub_params)
+        return f" {joiner} ".join(clauses), params
+
+    def or_(self, filters: str, **_) -> "SQLiteQuery":
+        """PostgREST logic tree, e.g. `created_at.lt."...",and(created_at.eq."...",id.lt."...")`."""
+        self._where.append(self._logic_tree(filters, "OR"))
+        return self
+
+    def order(self, column: str, desc: bool = False, **_) -> "SQLiteQuery":
+        self._column(column)
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **_) -> "SQLiteQuery":
+        self._limit = size
+        return self
+
+    # --- Encoding ---
+
+    def _encode(self, column: str, value: Any) -> Any:
+        kind = self._columns.get(column)
+        if kind == "json":
+            return None if value is None else json.dumps(value, default=str)
+        if kind == "bool" and value is not None:
+            return int(bool(value))
+        return value
+
+    def _decode(self, row: sqlite3.Row) -> Dict[str, Any]:
+        out = {}
+        for key in row.keys():
+            value, kind = row[key], self._columns.get(key)
+            if value is not None and kind == "json":
+                value = json.loads(value)
+            elif value is not None and kind == "bool":
+                value = bool(value)
+            out[key] = value
+        return out
+
+    def _where_sql(self) -> Tuple[str, List[Any]]:
+        if not self._where:
+            return "", []
+        return " WHERE " + " AND ".join(f"({sql})" for sql, _ in self._where), \
+            [p for _, params in self._where for p in params]
+
+    # --- Execution ---
+
+    def execute(self) -> SQLiteResponse:
+        with self._client.connection(write=self._op != "select") as conn:
+            return getattr(self, f"_execute_{self._op}")(conn)
+
+    def _execute_select(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        where, params = self._where_sql()
+        table = _quote(self._table)
+        count = None
+        if self._count:
+            # exact, planned and estimated are all exact here
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        if self._head:
+            return SQLiteResponse([], count)
+
+        if self._select.strip() == "*":
+            columns = "*"
+        else:
+            columns = ",".join(self._column(c.strip()) for c in self._select.split(",") if c.strip())
+        sql = f"SELECT {columns} FROM {table}{where}"
+        if self._order:
+            sql += " ORDER BY " + ", ".join(f"{_quote(c)} {'DESC' if d else 'ASC'}" for c, d in self._order)
+        if self._limit is not None:
+            sql += f" LIMIT {int(self._limit)}"
+        return SQLiteResponse([self._decode(r) for r in conn.execute(sql, params)], count)
+
+    def _prepare(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = {"id": str(uuid.uuid4()), "created_at": _now(), **row}
+        for column in row:
+            self._column(column)
+        return row
+
+    def _execute_insert(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        out = []
+        for original in rows:
+            row = self._prepare(original)
+            cols = list(row)
+            sql = (f"INSERT INTO {_quote(self._table)} ({','.join(map(_quote, cols))}) "
+                   f"VALUES ({','.join('?' * len(cols))})")
+            if self._op == "upsert":
+                conflict = [c.strip() for c in self._on_conflict.split(",")]
+                # Only the columns the caller sent are overwritten; generated id/created_at are kept
+                assignments = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in original if c not in conflict)
+                sql += f" ON CONFLICT ({','.join(map(_quote, conflict))}) " + \
+                    (f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING")
+            sql += " RETURNING *"
+            out.extend(self._decode(r) for r in conn.execute(sql, [self._encode(c, row[c]) for c in cols]))
+        return SQLiteResponse(out)
+
+    _execute_upsert = _execute_insert
+
+    def _execute_update(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        cols = list(self._payload)
+        assignments = ", ".join(f"{self._column(c)} = ?" for c in cols)
+        where, params = self._where_sql()
+        sql = f"UPDATE {_quote(self._table)} SET {assignments}{where} RETURNING *"
+        rows = conn.execute(sql, [self._encode(c, self._payload[c]) for c in cols] + params)
+        return SQLiteResponse([self._decode(r) for r in rows])
+
+    def _execute_delete(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        where, params = self._where_sql()
+        rows = conn.execute(f"DELETE FROM {_quote(self._table)}{where} RETURNING *", params)
+        return SQLiteResponse([self._decode(r) for r in rows])
+
+
+class SQLiteClient:
+    """
+    One connection per thread on a shared WAL-mode database file: readers never
+    block the writer, and concurrent writers wait on busy_timeout instead of failing.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.connection() as conn:
+            self._create_schema(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA case_sensitive_like=ON")  # like() is case-sensitive in Postgres too
+        return conn
+
+    def connection(self, write: bool = True) -> "_Transaction":
+        # A forked child (e.g. an RQ work horse) must not reuse the parent's connection
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.conn, self._local.pid = self._connect(), os.getpid()
+        return _Transaction(self._local.conn, write)
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
+        for table, columns in SCHEMA.items():
+            defs = [f"{_quote(c)} {_SQL_TYPES[t]}" + (" PRIMARY KEY" if c == "id" else "")
+                    for c, t in columns.items()]
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({', '.join(defs)})")
+            # Columns added to SCHEMA after a database file was created
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+            for c, t in columns.items():
+                if c not in existing:
+                    conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(c)} {_SQL_TYPES[t]}")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(table + '_created_at_id')} "
+                         f"ON {_quote(table)} (created_at, id)")
+            for column in UNIQUE_COLUMNS.get(table, []):
+                conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(f'{table}_{column}_key')} "
+                             f"ON {_quote(table)} ({_quote(column)})")
+            for column in INDEXED_COLUMNS.get(table, []):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(f'{table}_{column}_idx')} "
+                             f"ON {_quote(table)} ({_quote(column)})")
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+
+class _Transaction:
+    """
+    Each execute() is one transaction, so multi-row inserts are atomic like
+    PostgREST's. Writes take the write lock up front (IMMEDIATE) to avoid
+    deadlocking on lock upgrade; reads stay deferred and run beside the writer.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, write: bool):
+        self.conn = conn
+        self.write = write
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE" if self.write else "BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+_client: Optional[SQLiteClient] = None
+_client_lock = threading.Lock()
+
+
+def get_sqlite_client() -> SQLiteClient:
+    """Process-wide SQLite client for SQLITE_PATH."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SQLiteClient()
+                logger.info(f"Using SQLite storage at {SQLITE_PATH}")
+    return _client
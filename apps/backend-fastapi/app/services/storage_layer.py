@@ -0,0 +1,32 @@
+# app/services/storage_layer.py
+"""
+Storage backend selection. Everything that persists scan_results,
+author_matches, smart_news, claims or news_songs goes through
+get_storage_client(), which returns either the pooled Supabase client or the
+local SQLite store depending on STORAGE_BACKEND.
+
+Both backends expose the same supabase-py style query builder; see
+app/services/sqlite_store.py for the subset callers may rely on.
+"""
+
+from typing import Any, Protocol
+
+from app.config import STORAGE_BACKEND
+
+STORAGE_BACKENDS = ("supabase", "sqlite")
+
+
+class StorageClient(Protocol):
+    def table(self, name: str) -> Any:
+        """Query builder for one table: select/insert/upsert/update/delete, filters, order, limit, execute()."""
+
+
+def get_storage_client() -> StorageClient:
+    """Process-wide client for the configured backend. Imports are lazy so SQLite runs need no Supabase settings."""
+    if STORAGE_BACKEND == "sqlite":
+        from app.services.sqlite_store import get_sqlite_client
+        return get_sqlite_client()
+    if STORAGE_BACKEND == "supabase":
+        from app.services.supabase_layer import get_supabase_client
+        return get_supabase_client()
+    raise ValueError(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}' (expected one of {', '.join(STORAGE_BACKENDS)})")
@@ -1,6 +1,11 @@
 import os
 import logging
+import threading
+from typing import Optional
+
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -8,21 +13,63 @@ load_dotenv()
 
 logger = logging.getLogger("post_truth_scanner")
 
-# Initialize the Supabase client
+# HTTP pool shared by every Supabase call in the process
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "30"))
+SUPABASE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_CONNECT_TIMEOUT_SECONDS", "5"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10"))
+SUPABASE_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
+_client: Optional[Client] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def _create_client() -> Client:
+    url: str = os.environ.get("SUPABASE_URL")
+    key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        raise ValueError("Supabase URL or Key not found in environment variables.")
+
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(SUPABASE_TIMEOUT_SECONDS, connect=SUPABASE_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+    options = SyncClientOptions(
+        httpx_client=http_client,
+        postgrest_client_timeout=SUPABASE_TIMEOUT_SECONDS,
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+    return create_client(url, key, options=options)
+
+
 def get_supabase_client() -> Client:
-    """Creates and returns a Supabase client instance."""
-    try:
-        url: str = os.environ.get("SUPABASE_URL")
-        key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-        if not url or not key:
-            raise ValueError("Supabase URL or Key not found in environment variables.")
-        
-        supabase_client: Client = create_client(url, key)
-        logger.info("Successfully connected to Supabase.")
-        return supabase_client
-    except Exception as e:
-        logger.error(f"Failed to connect to Supabase: {e}")
-        raise
+    """
+    Returns the process-wide Supabase client.
+
+    All callers share one client and one keep-alive HTTP pool, so requests reuse
+    open connections instead of paying a TLS handshake each time. A forked child
+    (e.g. an RQ work horse) builds its own client rather than reusing the
+    parent's sockets.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                try:
+                    _client = _create_client()
+                    _client_pid = pid
+                    logger.info("Successfully connected to Supabase.")
+                except Exception as e:
+                    logger.error(f"Failed to connect to Supabase: {e}")
+                    raise
+    return _client
 
 def save_scan_result_to_supabase(scan_id: str, results: dict, caption: str, user_id: str):
     try:
@@ -4,20 +4,27 @@ import tempfile
 import uuid
 import logging
 import json
+import time
 import asyncio
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import requests
 
-# --- Supabase ---
-from app.supabase import supabase
-from app.services.supabase_layer import get_supabase_client
+# --- Storage (Supabase or local SQLite) ---
+from app.services.storage_layer import get_storage_client
+from app.services.blob_store import get_blob_store
 
 # --- Media & Claim Services ---
 from app.services.media_analysis import analyze_media_with_gemini, is_video, transcribe_audio_from_video
 from app.services.claim_validation import extract_claims_with_groq, compare_claims_with_groq
 from app.services.database_layer import save_scan_result
+from app.services.prompt_budget import count_tokens, fit_to_budget, model_budget, record_usage_from_response
+from app.services.json_stream import IncrementalJSONObjectParser
+from app.services.scan_events import publish_event
+from app.services.job_telemetry import JobTelemetry
+from app.services import result_cache
 
 # --- Logging ---
 logger = logging.getLogger("post_truth_scanner")
@@ -26,47 +33,64 @@ logging.basicConfig(level=logging.INFO)
 print("Starting the post truth scanner service...")
 
 # --- Groq API Configuration ---
+from app.config import GROQ_CHAT_URL
+
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_URL = GROQ_CHAT_URL
+GROQ_MODEL = "llama-3.1-8b-instant"
 
+ANALYSIS_SYSTEM_PROMPT = (
+    "You are an advanced intelligence platform for truth analysis. "
+    "Analyze the text and return a single JSON with the following keys: "
+    "summary, sentiment, intent, entities (persons, organizations, locations), "
+    "mismatch_reason, score."
+)
 
-def call_groq_api_for_analysis(text: str) -> Optional[dict]:
-    """
-    Sends text to Groq API for structured analysis and returns JSON.
-    """
-    if not GROQ_API_KEY:
-        logger.critical("GROQ_API_KEY is not set.")
-        return None
 
+def _build_analysis_request(text: str) -> tuple[dict, dict, str]:
+    """Returns (headers, payload, user_content) for a truth-analysis completion."""
     headers = {
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json"
     }
+    # Keep the user text inside the model's prompt budget (system prompt + framing reserved)
+    budget = model_budget(GROQ_MODEL, reserved=count_tokens(ANALYSIS_SYSTEM_PROMPT) + 16)
+    user_content = f"Analyze the following text:\n\n{fit_to_budget(text, budget)}"
     payload = {
-        "model": "llama-3.1-8b-instant",
+        "model": GROQ_MODEL,
         "messages": [
             {
                 "role": "system",
-                "content": (
-                    "You are an advanced intelligence platform for truth analysis. "
-                    "Analyze the text and return a single JSON with the following keys: "
-                    "summary, sentiment, intent, entities (persons, organizations, locations), "
-                    "mismatch_reason, score."
-                )
+                "content": ANALYSIS_SYSTEM_PROMPT
             },
             {
                 "role": "user",
-                "content": f"Analyze the following text:\n\n{text}"
+                "content": user_content
             }
         ],
         "temperature": 0.5,
         "response_format": {"type": "json_object"}
     }
+    return headers, payload, user_content
 
+
+def call_groq_api_for_analysis(text: str) -> Optional[dict]:
+    """
+    Sends text to Groq API for structured analysis and returns JSON.
+    """
+    if not GROQ_API_KEY:
+        logger.critical("GROQ_API_KEY is not set.")
+        return None
+
+    headers, payload, user_content = _build_analysis_request(text)
     try:
+        started = time.perf_counter()
         response = requests.post(GROQ_URL, headers=headers, json=payload)
         response.raise_for_status()
-        analysis_data = response.json()['choices'][0]['message']['content']
+        data = response.json()
+        analysis_data = data['choices'][0]['message']['content']
+        record_usage_from_response("tasks.analysis", GROQ_MODEL, data.get("usage"), user_content, analysis_data,
+                                   (time.perf_counter() - started) * 1000)
         return json.loads(analysis_data)
     except requests.exceptions.RequestException as e:
         logger.error(f"Error calling Groq API: {e}")
@@ -76,31 +100,120 @@ def call_groq_api_for_analysis(text: str) -> Optional[dict]:
         return None
 
 
-async def perform_analysis_job_async(caption: str, media_path: str, scan_id: str):
+def stream_groq_api_for_analysis(text: str, on_field: Callable[[str, Any], None]) -> Optional[dict]:
+    """
+    Streams the analysis completion and calls `on_field(key, value)` as soon as each
+    top-level JSON field is complete. Returns the full analysis dict.
+    """
+    if not GROQ_API_KEY:
+        logger.critical("GROQ_API_KEY is not set.")
+        return None
+
+    headers, payload, user_content = _build_analysis_request(text)
+    # Groq's JSON mode can't be streamed; the system prompt already asks for a single JSON object
+    payload.pop("response_format")
+    payload["stream"] = True
+
+    parser = IncrementalJSONObjectParser()
+    content_parts = []
+    usage = None
+    try:
+        started = time.perf_counter()
+        with requests.post(GROQ_URL, headers=headers, json=payload, stream=True) as response:
+            response.raise_for_status()
+            response.encoding = "utf-8"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                if not chunk.get("choices"):
+                    continue
+                delta = chunk["choices"][0].get("delta", {}).get("content") or ""
+                content_parts.append(delta)
+                for key, value in parser.feed(delta):
+                    on_field(key, value)
+
+        record_usage_from_response("tasks.analysis_stream", GROQ_MODEL, usage, user_content,
+                                   "".join(content_parts), (time.perf_counter() - started) * 1000)
+        if not parser.fields:
+            logger.error(f"Streamed Groq response contained no JSON fields: {''.join(content_parts)[:200]}")
+            return None
+        return parser.fields
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error streaming from Groq API: {e}")
+        return None
+    except (KeyError, json.JSONDecodeError) as e:
+        logger.error(f"Error parsing streamed Groq API response: {e}")
+        return None
+
+
+@contextmanager
+def _stage(telemetry: JobTelemetry, name: str, **inputs):
+    """Times a stage and publishes the transition to /scan-events/{scan_id} subscribers."""
+    publish_event(telemetry.scan_id, "stage", {"stage": name})
+    with telemetry.stage(name, **inputs) as record:
+        yield record
+
+
+def _fail(telemetry: JobTelemetry, reason: str) -> None:
+    telemetry.finish("failed")
+    result_cache.set_job_state(telemetry.scan_id, result_cache.FAILED)
+    publish_event(telemetry.scan_id, "failed", {"reason": reason})
+
+
+async def perform_analysis_job_async(caption: str, blob_id: str, scan_id: str):
     """
-    Async pipeline for media + text analysis.
+    Async pipeline for media + text analysis of an uploaded blob (see blob_store).
+    Stage transitions and the outcome are published for /scan-events/{scan_id};
+    stage timings go to job telemetry and are saved with the result.
     """
-    media_path_obj = Path(media_path)
+    blob_store = get_blob_store()
+    # Keyframes and audio are extracted next to the media file, so the shared blob
+    # is linked into a scratch directory of this job's own
+    work_dir = Path(tempfile.mkdtemp(prefix="post_scan_"))
+    media_path_obj = work_dir / ("media" + Path(blob_id).suffix)
+    telemetry = JobTelemetry(scan_id, "media")
+    result_cache.set_job_state(scan_id, result_cache.RUNNING)
+    publish_event(scan_id, "started")
     try:
-        logger.info(f"Starting analysis for job {scan_id} with media {media_path_obj}")
+        blob_path = blob_store.path(blob_id)
+        if not blob_path.exists():
+            _fail(telemetry, f"Media blob {blob_id} is missing from the blob store")
+            return
+        media_path_obj.symlink_to(blob_path.resolve())
+        logger.info(f"Starting analysis for job {scan_id} with media blob {blob_id}")
 
-        # --- Step 1: Media Analysis ---
-        media_analysis_results = await analyze_media_with_gemini(media_path_obj, caption)
+        # --- Step 1: Media Analysis (keyframes + Gemini are timed as sub-stages) ---
+        with _stage(telemetry, "media_analysis", media_bytes=media_path_obj.stat().st_size,
+                    caption_chars=len(caption)):
+            media_analysis_results = await analyze_media_with_gemini(media_path_obj, caption)
 
-        # --- Step 2: Audio Transcription for video ---
+        # --- Step 2: Audio Transcription for video (audio extraction + Whisper) ---
         transcription = ""
         if is_video(media_path_obj):
-            transcription = await transcribe_audio_from_video(media_path_obj)
+            with _stage(telemetry, "transcription") as record:
+                transcription = await transcribe_audio_from_video(media_path_obj)
+                record["output_chars"] = len(transcription)
 
         # --- Step 3: Claim Extraction ---
-        extracted_claims = await extract_claims_with_groq(caption + " " + transcription)
+        claims_input = caption + " " + transcription
+        with _stage(telemetry, "claim_extraction", input_chars=len(claims_input)) as record:
+            extracted_claims = await extract_claims_with_groq(claims_input)
+            record["claims"] = len(extracted_claims or [])
 
-        # --- Step 4: Claim Comparison & Fact-Checking ---
-        comparison_results = await compare_claims_with_groq(extracted_claims, media_analysis_results)
+        # --- Step 4: Claim Comparison & Fact-Checking (nothing to compare if the pre-filter found no claims) ---
+        comparison_results = None
+        if extracted_claims:
+            with _stage(telemetry, "claim_comparison", claims=len(extracted_claims)):
+                comparison_results = await compare_claims_with_groq(extracted_claims, media_analysis_results)
 
-        # --- Step 5: Save Results ---
+        # --- Step 5: Save Results (the whole dict is also stored as `results`) ---
         final_results = {
-            "media_path": str(media_path_obj),
+            "media_blob_id": blob_id,
             "caption": caption,
             "media_analysis": media_analysis_results,
             "transcription": transcription,
@@ -108,34 +221,64 @@ async def perform_analysis_job_async(caption: str, media_path: str, scan_id: str
             "comparison_results": comparison_results
         }
 
-        save_scan_result(supabase, scan_id, final_results)
+        # The breakdown is taken before saving; the save itself is timed in telemetry only
+        stage_timings = telemetry.breakdown()
+        with _stage(telemetry, "saving"):
+            saved = save_scan_result(get_storage_client(), scan_id, None, caption, final_results, stage_timings)
+        if not saved:
+            _fail(telemetry, "Could not save scan result")
+            return
+        # save_scan_result doesn't return the row; the next poll reads it through
+        result_cache.store_result(scan_id, None)
+        telemetry.finish("completed")
+        publish_event(scan_id, "completed")
         logger.info(f"Successfully completed analysis for job {scan_id}")
 
     except Exception as e:
         logger.error(f"Failed to process job {scan_id}: {e}", exc_info=True)
+        _fail(telemetry, str(e))
     finally:
-        # --- Cleanup temporary media files ---
-        if media_path_obj.parent.exists():
-            shutil.rmtree(media_path_obj.parent)
+        # --- Cleanup scratch files; the blob itself is deleted by gc once unreferenced ---
+        shutil.rmtree(work_dir, ignore_errors=True)
+        blob_store.release(blob_id)
+
+
+# --- Synchronous Wrapper for Media Analysis ---
+def perform_analysis_job_sync(caption: str, blob_id: str, scan_id: str):
+    """Entry point for RQ worker to run media + text analysis (enqueued by /analyze-post)."""
+    asyncio.run(perform_analysis_job_async(caption, blob_id, scan_id))
 
 
 # --- Synchronous Wrapper for Text Analysis ---
-def perform_text_analysis_job(text: str, scan_id: str, user_id: str):
+def perform_text_analysis_job(text: str, scan_id: str, user_id: str, stream: bool = False):
     """
     Entry point for RQ worker to run text analysis.
+    Stage events are always published for /scan-events/{scan_id}; with `stream`,
+    field-level results are published too.
     """
-    supabase_client = get_supabase_client()
-    asyncio.run(perform_text_analysis_job_async(text, scan_id, user_id, supabase_client))
+    storage_client = get_storage_client()
+    asyncio.run(perform_text_analysis_job_async(text, scan_id, user_id, storage_client, stream))
 
 
 # --- Asynchronous Text Analysis Pipeline ---
-async def perform_text_analysis_job_async(text: str, scan_id: str, user_id: str, supabase_client):
+async def perform_text_analysis_job_async(text: str, scan_id: str, user_id: str, storage_client,
+                                          stream: bool = False):
+    telemetry = JobTelemetry(scan_id, "text")
     try:
         logger.info(f"Starting async text analysis for scan_id={scan_id}, user_id={user_id}")
+        result_cache.set_job_state(scan_id, result_cache.RUNNING)
+        publish_event(scan_id, "started")
 
-        analysis_result = call_groq_api_for_analysis(text)
+        with _stage(telemetry, "analysis", input_chars=len(text), streamed=stream):
+            if stream:
+                analysis_result = stream_groq_api_for_analysis(
+                    text, lambda key, value: publish_event(scan_id, "field", {"field": key, "value": value})
+                )
+            else:
+                analysis_result = call_groq_api_for_analysis(text)
         if not analysis_result:
             logger.warning(f"No analysis result for scan_id={scan_id}")
+            _fail(telemetry, "No analysis result")
             return
 
         truth_summary = analysis_result.get("summary") or ""
@@ -156,17 +299,24 @@ async def perform_text_analysis_job_async(text: str, scan_id: str, user_id: str,
             "caption": text,
             "truth_summary": truth_summary,
             "mismatch_reason": mismatch_reason,
-            "entities": json.dumps(entities),
+            "entities": entities,  # JSONB: stored as structured JSON, not a string
             "score": score,
-            "results": json.dumps(analysis_result),
+            "results": analysis_result,
+            "stage_timings": telemetry.breakdown(),
         }
 
-        supabase_client.table("scan_results") \
-            .upsert(upsert_payload, on_conflict="scan_id") \
-            .execute()
+        with _stage(telemetry, "saving"):
+            response = storage_client.table("scan_results") \
+                .upsert(upsert_payload, on_conflict="scan_id") \
+                .execute()
+        # Pollers get the saved row from the cache without a database read
+        result_cache.store_result(scan_id, response.data[0] if response.data else None)
 
         logger.info(f"Upserted analysis results for scan_id={scan_id}")
+        telemetry.finish("completed")
+        publish_event(scan_id, "completed", {"score": score})
 
     except Exception as e:
         logger.error(f"Error in text analysis job (scan_id={scan_id}): {e}", exc_info=True)
+        _fail(telemetry, str(e))
         raise
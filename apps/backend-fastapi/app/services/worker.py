@@ -1,6 +1,30 @@
+"""
+Pre-warmed RQ worker for the analysis queues.
+
+The stock `rq worker` forks a fresh work horse per job, so every media job paid
+for importing torch/whisper and loading the Whisper model again. Here the
+parent process imports the job code and loads models once, then forks
+long-lived children that run jobs in-process (SimpleWorker). Children inherit
+the warm state copy-on-write and are recycled after --max-jobs jobs or once
+their RSS passes --max-memory-mb; the parent re-forks a replacement from the
+same warm state.
+
+    python -m app.services.worker analysis_queue analysis_queue_bulk --processes 2
+    python -m app.services.worker text_analysis_queue text_analysis_queue_bulk --max-jobs 500
+
+SIGTERM / SIGINT are forwarded to the children, which finish their current job
+first (warm shutdown), as with `rq worker`.
+"""
+
+import argparse
 import os
 import logging
-from rq import Queue, Worker
+import resource
+import signal
+import sys
+import time
+from typing import Dict, List
+from rq import Queue, SimpleWorker
 from redis import Redis
 from dotenv import load_dotenv
 
@@ -12,33 +36,145 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger("worker")
 
 # --- Import the background task logic ---
-# This is the crucial line that tells the worker where to find the job function.
-from app.services.tasks import perform_analysis_job
+# This is the crucial line that tells the worker where to find the job functions,
+# and it pulls in torch/whisper/groq/genai once, in the parent.
+from app.services.tasks import perform_analysis_job_sync, perform_text_analysis_job
+
+# Children that die this soon after starting are respawned with a delay (e.g. Redis is down)
+MIN_CHILD_LIFETIME_SECONDS = 5
+
+
+def preload(queue_names: List[str]) -> None:
+    """Loads models and tokenizers before forking, so no job pays for it."""
+    from app.services import media_analysis
+    from app.services.prompt_budget import count_tokens
+
+    started = time.perf_counter()
+    count_tokens("warm up")  # tiktoken encoding
+    if "analysis_queue" in queue_names:
+        if media_analysis.get_whisper_model() is None:
+            logger.warning("Whisper model not available; transcription will be skipped")
+    logger.info(f"Preloaded models in {time.perf_counter() - started:.1f}s")
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        # Peak rather than current RSS (kB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RecyclingWorker(SimpleWorker):
+    """Runs jobs in this process; stops after a job once RSS exceeds max_memory_mb."""
+
+    max_memory_mb: float = 0
+
+    def execute_job(self, job, queue):
+        super().execute_job(job, queue)
+        rss = _rss_mb()
+        if self.max_memory_mb and rss > self.max_memory_mb:
+            self.log.info(f"Worker {self.name}: RSS {rss:.0f} MB over {self.max_memory_mb:.0f} MB, recycling")
+            self._stop_requested = True
+
+
+def _run_child(redis_url: str, queue_names: List[str], args) -> None:
+    # Each child opens its own Redis connection; sockets are never shared across fork
+    redis_conn = Redis.from_url(redis_url)
+    worker = RecyclingWorker([Queue(name, connection=redis_conn) for name in queue_names],
+                             connection=redis_conn, default_result_ttl=args.results_ttl)
+    worker.max_memory_mb = args.max_memory_mb
+    worker.work(max_jobs=args.max_jobs or None)
+
+
+def _spawn(redis_url: str, queue_names: List[str], args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            _run_child(redis_url, queue_names, args)
+        except BaseException:
+            logger.exception("Worker child crashed")
+            code = 1
+        finally:
+            logging.shutdown()
+            os._exit(code)
+    return pid
+
+
+def supervise(redis_url: str, queue_names: List[str], args) -> None:
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.processes):
+        children[_spawn(redis_url, queue_names, args)] = time.monotonic()
+    logger.info(f"Worker is listening for jobs on {queue_names} with {args.processes} pre-warmed process(es)...")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        lifetime = time.monotonic() - started
+        logger.info(f"Worker child {pid} exited (status {os.waitstatus_to_exitcode(status)}) "
+                    f"after {lifetime:.0f}s, replacing it")
+        if lifetime < MIN_CHILD_LIFETIME_SECONDS:
+            time.sleep(MIN_CHILD_LIFETIME_SECONDS)
+        if not stopping:
+            children[_spawn(redis_url, queue_names, args)] = time.monotonic()
+
 
 # -----------------
 # Main Worker Loop
 # -----------------
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pre-warmed RQ worker for the analysis queues.")
+    # This must match the queue names used in the FastAPI app (`post_truth_scanner.py`).
+    # Order is priority: the bulk lane is only served while the interactive queue is empty.
+    parser.add_argument("queues", nargs="*", default=["analysis_queue", "analysis_queue_bulk"])
+    parser.add_argument("--processes", type=int, default=int(os.environ.get("WORKER_PROCESSES", "1")))
+    parser.add_argument("--max-jobs", type=int, default=int(os.environ.get("WORKER_MAX_JOBS", "200")),
+                        help="recycle a child after this many jobs (0 = never)")
+    parser.add_argument("--max-memory-mb", type=float, default=float(os.environ.get("WORKER_MAX_MEMORY_MB", "0")),
+                        help="recycle a child after a job that leaves its RSS above this (0 = never)")
+    parser.add_argument("--results-ttl", type=int, default=900)
+    args = parser.parse_args()
+
     # Get Redis connection details from environment variables
     redis_url = os.environ.get("REDIS_URL", "redis://my-redis-db:6379")
 
-    # Connect to Redis
+    # Check the connection before loading anything heavy
     try:
         redis_conn = Redis.from_url(redis_url)
         # Ping the server to check the connection
         redis_conn.ping()
+        redis_conn.close()
         logger.info("Successfully connected to Redis.")
     except Exception as e:
         logger.exception(f"Failed to connect to Redis at {redis_url}. Check your Redis server and connection string.")
         exit(1)
 
-    # Tell the worker which queue to listen on
-    # This must match the queue name used in your FastAPI app (`post_truth_scanner.py`)
-    queue_name = "analysis_queue"
-    listen = [queue_name]
-
-    # The Worker class automatically looks up the function from the imported module
-    worker = Worker(listen, connection=redis_conn)
-    logger.info(f"Worker is listening for jobs on '{queue_name}'...")
-    worker.work()
+    preload(args.queues)
+    supervise(redis_url, args.queues, args)
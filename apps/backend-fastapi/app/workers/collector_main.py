@@ -0,0 +1,180 @@
+# app/workers/collector_main.py
+"""
+Standalone entry point for the Smart News collector:
+
+    python -m app.workers.collector_main
+
+Feeds from the catalog are consistently hashed into COLLECTOR_SHARDS shards.
+Every instance heartbeats into a Redis node set and holds Redis leases for
+about shards / live_instances shards, so adding instances spreads the feeds
+evenly. When an instance dies its leases expire and the others take its
+shards over.
+"""
+
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.config import COLLECTOR_LEASE_TTL_SECONDS, COLLECTOR_SHARDS
+from app.services.redis_layer import get_async_redis
+from app.workers.feed_catalog import load_feed_catalog, shard_feeds
+from app.workers.leader_lease import RedisLease, new_owner_token
+
+SHARD_KEY = "smart_news:collector_shard:{}"
+# Sorted set: instance token -> last heartbeat (unix time)
+NODES_KEY = "smart_news:collector_nodes"
+CATALOG_REFRESH_SECONDS = 300
+
+
+class ShardedCollector:
+    def __init__(self, shards: int = COLLECTOR_SHARDS, ttl_seconds: float = COLLECTOR_LEASE_TTL_SECONDS):
+        self.shards = shards
+        self.ttl_seconds = ttl_seconds
+        self.redis = get_async_redis()
+        self.token = new_owner_token()
+        self.leases: Dict[int, RedisLease] = {}
+        self.tasks: Dict[int, Tuple[asyncio.Task, List[str]]] = {}
+        self.catalog: Dict[int, List[str]] = {}
+        self._catalog_loaded_at = 0.0
+        self._last_heartbeat = time.monotonic()
+
+    async def _heartbeat(self) -> Optional[int]:
+        """Registers this instance and returns how many instances are alive (None if Redis is down)."""
+        now = time.time()
+        try:
+            pipe = self.redis.pipeline()
+            pipe.zadd(NODES_KEY, {self.token: now})
+            pipe.zremrangebyscore(NODES_KEY, 0, now - self.ttl_seconds)
+            pipe.zcard(NODES_KEY)
+            _, _, alive = await pipe.execute()
+            self._last_heartbeat = time.monotonic()
+            return max(int(alive), 1)
+        except Exception as e:
+            print(f"⚠️ Collector heartbeat failed: {e}")
+            return None
+
+    async def _refresh_catalog(self, storage) -> None:
+        if time.monotonic() - self._catalog_loaded_at < CATALOG_REFRESH_SECONDS and self.catalog:
+            return
+        try:
+            feeds = await asyncio.to_thread(load_feed_catalog, storage)
+            self.catalog = shard_feeds(feeds, self.shards)
+            self._catalog_loaded_at = time.monotonic()
+        except Exception as e:
+            print(f"⚠️ Could not load feed catalog: {e}")
+
+    def _stop_shard(self, shard: int) -> None:
+        entry = self.tasks.pop(shard, None)
+        if entry:
+            entry[0].cancel()
+
+    async def _drop_shard(self, shard: int) -> None:
+        self._stop_shard(shard)
+        lease = self.leases.pop(shard, None)
+        if lease:
+            try:
+                await lease.release()
+            except Exception as e:
+                print(f"⚠️ Could not release shard {shard}: {e}")
+
+    async def _renew(self) -> None:
+        for shard, lease in list(self.leases.items()):
+            try:
+                if not await lease.renew():
+                    print(f"[SmartNewsCollector] ⚠️ Shard {shard} taken over by another instance")
+                    self._stop_shard(shard)
+                    del self.leases[shard]
+            except Exception as e:
+                print(f"⚠️ Renewal of shard {shard} failed: {e}")
+
+        # Without Redis we can't prove ownership; step down once the leases would have expired
+        if time.monotonic() - self._last_heartbeat >= self.ttl_seconds and self.leases:
+            print("[SmartNewsCollector] ⚠️ Lost Redis, releasing all shards")
+            for shard in list(self.leases):
+                self._stop_shard(shard)
+            self.leases.clear()
+
+    async def _rebalance(self, alive: int) -> None:
+        target = math.ceil(self.shards / alive)
+        # Give shards back so newly started instances can take them
+        for shard in sorted(self.leases, reverse=True)[:max(len(self.leases) - target, 0)]:
+            print(f"[SmartNewsCollector] Handing off shard {shard} ({alive} instances)")
+            await self._drop_shard(shard)
+
+        if len(self.leases) >= target:
+            return
+        # Start scanning at an instance-specific offset so instances don't all race for shard 0
+        offset = hash(self.token) % self.shards
+        for i in range(self.shards):
+            shard = (offset + i) % self.shards
+            if shard in self.leases:
+                continue
+            lease = RedisLease(self.redis, SHARD_KEY.format(shard), self.ttl_seconds, token=self.token)
+            try:
+                if await lease.acquire():
+                    self.leases[shard] = lease
+                    print(f"[SmartNewsCollector] 👑 Acquired shard {shard}")
+            except Exception as e:
+                print(f"⚠️ Could not acquire shard {shard}: {e}")
+                return
+            if len(self.leases) >= target:
+                return
+
+    def _sync_tasks(self, collector) -> None:
+        """Runs one adaptive scheduler per owned shard; restarts it when its feeds change or it crashes."""
+        for shard in list(self.tasks):
+            if shard not in self.leases:
+                self._stop_shard(shard)
+
+        for shard in self.leases:
+            feeds = self.catalog.get(shard, [])
+            running = self.tasks.get(shard)
+            if running and running[1] == feeds and not running[0].done():
+                continue
+            if running:
+                if running[0].done() and not running[0].cancelled() and running[0].exception():
+                    print(f"⚠️ Shard {shard} collector crashed: {running[0].exception()}")
+                self._stop_shard(shard)
+            if feeds:
+                print(f"[SmartNewsCollector] Shard {shard}: collecting {len(feeds)} feeds")
+                self.tasks[shard] = (asyncio.create_task(collector.start_background_task(feeds)), feeds)
+
+    async def run(self) -> None:
+        # Imported lazily: the collector connects to storage at import time
+        from app.workers import smart_news_collector
+
+        print(f"[SmartNewsCollector] Instance {self.token} joining ({self.shards} shards)")
+        try:
+            while True:
+                alive = await self._heartbeat()
+                await self._renew()
+                await self._refresh_catalog(smart_news_collector.storage)
+                if alive is not None:
+                    await self._rebalance(alive)
+                self._sync_tasks(smart_news_collector)
+                await asyncio.sleep(self.ttl_seconds / 3)
+        finally:
+            tasks = [task for task, _ in self.tasks.values()]
+            for shard in list(self.leases):
+                await self._drop_shard(shard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self.redis.zrem(NODES_KEY, self.token)
+            except Exception:
+                pass
+            print("[SmartNewsCollector] Left the collector group")
+
+
+async def run_sharded_collector(shards: int = COLLECTOR_SHARDS, ttl_seconds: float = COLLECTOR_LEASE_TTL_SECONDS):
+    await ShardedCollector(shards, ttl_seconds).run()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_sharded_collector())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,50 @@
+# app/workers/feed_catalog.py
+
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+import yaml
+from app.services.storage_layer import StorageClient
+
+FEED_CATALOG_PATH = os.getenv("FEED_CATALOG_PATH", "app/data/feed_catalog.yaml")
+# "file" reads FEED_CATALOG_PATH; "table" reads the feed_catalog table (url, enabled)
+FEED_CATALOG_SOURCE = os.getenv("FEED_CATALOG_SOURCE", "file")
+
+
+def load_feed_catalog(storage: Optional[StorageClient] = None, source: str = FEED_CATALOG_SOURCE,
+                      path: str = FEED_CATALOG_PATH) -> List[str]:
+    """Returns the enabled feed URLs, de-duplicated, in catalog order."""
+    if source == "table":
+        if storage is None:
+            raise ValueError("FEED_CATALOG_SOURCE=table needs a storage client")
+        response = storage.table("feed_catalog").select("url").eq("enabled", True).execute()
+        urls = [row["url"] for row in response.data or []]
+    else:
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+        urls = [str(url) for url in data.get("feeds") or []]
+    return list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+
+
+def _jump_hash(key: int, buckets: int) -> int:
+    # Lamping & Veach jump consistent hash: growing from N to N+1 shards moves only 1/(N+1) of the feeds
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def shard_for(url: str, shards: int) -> int:
+    key = int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "big")
+    return _jump_hash(key, shards)
+
+
+def shard_feeds(urls: List[str], shards: int) -> Dict[int, List[str]]:
+    """Maps every shard (including empty ones) to its feeds."""
+    assignment: Dict[int, List[str]] = {shard: [] for shard in range(shards)}
+    for url in urls:
+        assignment[shard_for(url, shards)].append(url)
+    return assignment
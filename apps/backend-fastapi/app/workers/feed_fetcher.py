@@ -0,0 +1,135 @@
+# app/workers/feed_fetcher.py
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import feedparser
+import httpx
+
+from app.services.redis_layer import get_async_redis
+
+HEADERS = {
+    "User-Agent": "GangstaAI-NewsCollector/3.0 (+https://gangsta.ai)"
+}
+
+FEED_FETCH_CONCURRENCY = int(os.getenv("FEED_FETCH_CONCURRENCY", "16"))
+FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", "20"))
+FEED_PARSE_WORKERS = int(os.getenv("FEED_PARSE_WORKERS", "4"))
+
+# Redis hash: feed url -> {"etag": ..., "last_modified": ...}
+VALIDATORS_KEY = "smart_news:feed_validators"
+
+
+@dataclass
+class FeedFetchResult:
+    url: str
+    status: str  # "ok" | "not_modified" | "error"
+    feed: Optional[feedparser.FeedParserDict] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+    validators: Dict[str, str] = field(default_factory=dict)
+
+
+class FeedFetcher:
+    """
+    Fetches RSS/Atom feeds concurrently over one shared HTTP client.
+
+    Requests are conditional (If-None-Match / If-Modified-Since), so an unchanged
+    feed costs a single 304. Feed bodies are parsed in a thread pool to keep
+    feedparser off the event loop.
+    """
+
+    def __init__(self, max_concurrency: int = FEED_FETCH_CONCURRENCY, timeout: float = FEED_FETCH_TIMEOUT):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=FEED_PARSE_WORKERS, thread_name_prefix="feed-parse")
+        # Used when Redis is unreachable, so conditional GETs still work within this process
+        self._local_validators: Dict[str, Dict[str, str]] = {}
+
+    async def _get_validators(self, url: str) -> Dict[str, str]:
+        try:
+            raw = await get_async_redis().hget(VALIDATORS_KEY, url)
+            if raw:
+                return json.loads(raw)
+        except Exception as e:
+            print(f"⚠️ Could not read feed validators from Redis: {e}")
+        return self._local_validators.get(url, {})
+
+    async def commit(self, result: FeedFetchResult) -> None:
+        """
+        Stores a feed's ETag/Last-Modified. Call this only after its entries were
+        processed, otherwise a failed cycle would be skipped by the next 304.
+        """
+        if result.status != "ok" or not result.validators:
+            return
+        self._local_validators[result.url] = result.validators
+        try:
+            await get_async_redis().hset(VALIDATORS_KEY, result.url, json.dumps(result.validators))
+        except Exception as e:
+            print(f"⚠️ Could not store feed validators in Redis: {e}")
+
+    async def fetch(self, url: str) -> FeedFetchResult:
+        async with self._semaphore:
+            started = time.perf_counter()
+            headers = {}
+            validators = await self._get_validators(url)
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+            try:
+                resp = await self._client.get(url, headers=headers)
+                if resp.status_code == 304:
+                    return FeedFetchResult(url, "not_modified", elapsed_ms=(time.perf_counter() - started) * 1000)
+                resp.raise_for_status()
+
+                loop = asyncio.get_running_loop()
+                feed = await loop.run_in_executor(
+                    self._executor,
+                    lambda: feedparser.parse(
+                        resp.content,
+                        response_headers={"content-location": str(resp.url), **dict(resp.headers)},
+                    ),
+                )
+                new_validators = {}
+                if resp.headers.get("etag"):
+                    new_validators["etag"] = resp.headers["etag"]
+                if resp.headers.get("last-modified"):
+                    new_validators["last_modified"] = resp.headers["last-modified"]
+
+                return FeedFetchResult(
+                    url, "ok", feed=feed, validators=new_validators,
+                    elapsed_ms=(time.perf_counter() - started) * 1000,
+                )
+            except Exception as e:
+                return FeedFetchResult(url, "error", error=str(e), elapsed_ms=(time.perf_counter() - started) * 1000)
+
+    async def fetch_all(self, urls: List[str]) -> List[FeedFetchResult]:
+        """Fetches every feed concurrently (bounded by the semaphore); results keep input order."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    async def aclose(self):
+        await self._client.aclose()
+        self._executor.shutdown(wait=False)
+
+
+_fetcher: Optional[FeedFetcher] = None
+
+
+def get_feed_fetcher() -> FeedFetcher:
+    """Returns the process-wide fetcher, created on first use inside the running loop."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = FeedFetcher()
+    return _fetcher
@@ -0,0 +1,176 @@
+# app/workers/feed_scheduler.py
+
+import asyncio
+import heapq
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.services.redis_layer import get_async_redis
+from app.workers.news_pipeline import FeedCycle
+
+FEED_POLL_DEFAULT_SECONDS = float(os.getenv("FEED_POLL_DEFAULT_SECONDS", "600"))
+FEED_POLL_MIN_SECONDS = float(os.getenv("FEED_POLL_MIN_SECONDS", "120"))
+FEED_POLL_MAX_SECONDS = float(os.getenv("FEED_POLL_MAX_SECONDS", "3600"))
+FEED_POLL_MAX_ERROR_SECONDS = float(os.getenv("FEED_POLL_MAX_ERROR_SECONDS", "7200"))
+# Aim for this many new items per poll: fast feeds are polled more often, slow ones less
+TARGET_ITEMS_PER_POLL = float(os.getenv("FEED_TARGET_ITEMS_PER_POLL", "2"))
+RATE_EWMA_ALPHA = 0.3
+# Feeds with no new items back off by this factor per empty poll
+IDLE_BACKOFF = 1.5
+
+# Redis hash: feed url -> FeedState as JSON, so a restarted collector keeps its learned rates
+SCHEDULE_KEY = "smart_news:feed_schedule"
+
+
+@dataclass
+class FeedState:
+    url: str
+    interval: float = FEED_POLL_DEFAULT_SECONDS
+    next_poll_at: float = 0.0
+    last_polled_at: Optional[float] = None
+    last_item_at: Optional[float] = None
+    rate_per_hour: Optional[float] = None  # EWMA of new items per hour
+    error_streak: int = 0
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def next_interval(state: FeedState, cycle: FeedCycle, now: float) -> float:
+    """
+    Seconds until the feed should be polled again, updating `state` in place.
+
+    - Errors back off exponentially from the learned interval.
+    - Otherwise the interval follows the observed publish rate (EWMA), so that
+      a poll finds about TARGET_ITEMS_PER_POLL new items.
+    - A poll where every fetched entry was new probably missed some, so the
+      interval is halved immediately (burst).
+    - Polls with nothing new (including 304s) stretch the interval.
+    """
+    if cycle.status == "error":
+        state.error_streak += 1
+        return min(FEED_POLL_MAX_ERROR_SECONDS, state.interval * 2 ** min(state.error_streak, 6))
+
+    state.error_streak = 0
+    if cycle.newest_item_at:
+        state.last_item_at = max(state.last_item_at or 0.0, cycle.newest_item_at)
+
+    if state.last_polled_at is None:
+        # The first poll returns the feed's backlog, which says nothing about its rate
+        return state.interval
+
+    observed = cycle.new * 3600 / max(now - state.last_polled_at, 1.0)
+    if state.rate_per_hour is None:
+        state.rate_per_hour = observed
+    else:
+        state.rate_per_hour = RATE_EWMA_ALPHA * observed + (1 - RATE_EWMA_ALPHA) * state.rate_per_hour
+
+    if cycle.new and cycle.new >= cycle.entries:
+        interval = state.interval / 2
+    elif cycle.new == 0:
+        interval = state.interval * IDLE_BACKOFF
+    else:
+        interval = TARGET_ITEMS_PER_POLL * 3600 / state.rate_per_hour
+
+    state.interval = _clamp(interval, FEED_POLL_MIN_SECONDS, FEED_POLL_MAX_SECONDS)
+    return state.interval
+
+
+class FeedScheduler:
+    """
+    Polls each feed on its own timer instead of one fixed loop for all feeds.
+
+    Next poll times live in a min-heap; whenever feeds come due they are handed
+    to `poll` as one batch, and every feed is rescheduled from what its poll
+    returned. Batches run concurrently, so a slow cycle never delays other feeds.
+    """
+
+    def __init__(self, feed_urls: List[str]):
+        self._states: Dict[str, FeedState] = {url: FeedState(url) for url in feed_urls}
+        self._heap: List[Tuple[float, str]] = []
+        self._in_flight: Set[str] = set()
+        self._changed = asyncio.Event()
+
+    async def load(self) -> None:
+        """Restores learned state from Redis; feeds without state are polled right away."""
+        try:
+            stored = await get_async_redis().hgetall(SCHEDULE_KEY)
+        except Exception as e:
+            print(f"⚠️ Could not load feed schedule from Redis: {e}")
+            stored = {}
+        for raw_url, raw in stored.items():
+            url = raw_url.decode() if isinstance(raw_url, bytes) else raw_url
+            if url in self._states:
+                try:
+                    self._states[url] = FeedState(**json.loads(raw))
+                except (TypeError, ValueError):
+                    pass
+        self._heap = [(state.next_poll_at, url) for url, state in self._states.items()]
+        heapq.heapify(self._heap)
+
+    async def _save(self, state: FeedState) -> None:
+        try:
+            await get_async_redis().hset(SCHEDULE_KEY, state.url, json.dumps(asdict(state)))
+        except Exception as e:
+            print(f"⚠️ Could not store feed schedule in Redis: {e}")
+
+    def pop_due(self, now: float) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, url = heapq.heappop(self._heap)
+            if url not in self._in_flight:
+                due.append(url)
+        self._in_flight.update(due)
+        return due
+
+    def seconds_until_next(self, now: float) -> float:
+        return max(0.0, self._heap[0][0] - now) if self._heap else FEED_POLL_DEFAULT_SECONDS
+
+    async def record(self, url: str, cycle: FeedCycle) -> None:
+        now = time.time()
+        state = self._states[url]
+        interval = next_interval(state, cycle, now)
+        state.last_polled_at = now
+        # Small jitter so feeds that share an interval drift apart
+        state.next_poll_at = now + interval * random.uniform(0.95, 1.05)
+        self._in_flight.discard(url)
+        heapq.heappush(self._heap, (state.next_poll_at, url))
+        await self._save(state)
+        print(f"[SmartNewsCollector] {url}: {cycle.status}, {cycle.new} new, "
+              f"next poll in {interval:.0f}s (rate {state.rate_per_hour or 0:.1f}/h)")
+
+    async def _poll(self, urls: List[str], poll: Callable[[List[str]], Awaitable[Dict[str, FeedCycle]]]):
+        try:
+            cycles = await poll(urls)
+        except Exception as e:
+            print(f"⚠️ Poll of {len(urls)} feeds failed: {e}")
+            cycles = {}
+        for url in urls:
+            await self.record(url, cycles.get(url, FeedCycle()))
+        self._changed.set()
+
+    async def run(self, poll: Callable[[List[str]], Awaitable[Dict[str, FeedCycle]]]) -> None:
+        await self.load()
+        tasks: Set[asyncio.Task] = set()
+        try:
+            while True:
+                due = self.pop_due(time.time())
+                if due:
+                    task = asyncio.create_task(self._poll(due, poll))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=self.seconds_until_next(time.time()))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,56 @@
+# app/workers/leader_lease.py
+
+import os
+import socket
+import uuid
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+# Only extend / delete the lease if we still own it
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def new_owner_token() -> str:
+    # Readable owner id: host, pid and a random suffix for restarts
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class RedisLease:
+    """
+    A renewable lock in Redis (SET NX PX + compare-and-extend).
+
+    Whoever holds the key is the owner until it stops renewing; the lease then
+    expires after `ttl_seconds` and another process can take over.
+    """
+
+    def __init__(self, redis: aioredis.Redis, key: str, ttl_seconds: float, token: Optional[str] = None):
+        self.redis = redis
+        self.key = key
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.token = token or new_owner_token()
+
+    async def acquire(self) -> bool:
+        return bool(await self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    async def renew(self) -> bool:
+        return bool(await self.redis.eval(_RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms))
+
+    async def release(self) -> None:
+        await self.redis.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+
+    async def owner(self) -> Optional[str]:
+        value = await self.redis.get(self.key)
+        return value.decode() if isinstance(value, bytes) else value
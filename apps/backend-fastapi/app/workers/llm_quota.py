@@ -0,0 +1,64 @@
+# app/workers/llm_quota.py
+
+import asyncio
+import os
+import time
+
+# Groq on-demand limits for llama-3.1-8b-instant; override to match the account tier
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.capacity = max(per_minute, 1.0)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, cost: float) -> float:
+        cost = min(cost, self.capacity)
+        return 0.0 if self.level >= cost else (cost - self.level) / self.rate
+
+
+class LLMQuotaLimiter:
+    """
+    Paces LLM calls to the provider quota instead of fixed sleeps.
+
+    Two token buckets (requests/min and prompt tokens/min) are shared by all
+    enrichment workers; callers wait only as long as the quota requires. A 429
+    with Retry-After pauses every caller until the provider is ready again.
+    """
+
+    def __init__(self, requests_per_minute: float = GROQ_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = GROQ_TOKENS_PER_MINUTE):
+        self._requests = _Bucket(requests_per_minute)
+        self._tokens = _Bucket(tokens_per_minute)
+        self._paused_until = 0.0
+        # Waiters are served in arrival order
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._requests.refill(now)
+                self._tokens.refill(now)
+                wait = max(
+                    self._paused_until - now,
+                    self._requests.wait_for(1),
+                    self._tokens.wait_for(tokens),
+                )
+                if wait <= 0:
+                    self._requests.level -= 1
+                    self._tokens.level -= min(tokens, self._tokens.capacity)
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Blocks new calls for `seconds` (e.g. from a 429 Retry-After header)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
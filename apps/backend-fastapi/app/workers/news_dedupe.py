@@ -0,0 +1,125 @@
+# app/workers/news_dedupe.py
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List
+
+from app.services.pagination import keyset_filter
+from app.services.storage_layer import StorageClient
+
+SEEN_URL_CAPACITY = int(os.getenv("SEEN_URL_CAPACITY", "50000"))
+# PostgREST puts `in_` filters in the query string, so keep batches well under URL length limits
+DEDUPE_BATCH_SIZE = int(os.getenv("DEDUPE_BATCH_SIZE", "50"))
+# PostgREST caps each response at max-rows (1000 on Supabase by default), so warming is paged;
+# keep this at or below the server's max-rows, since a short page ends the warm-up
+SEEN_URL_WARM_PAGE_SIZE = int(os.getenv("SEEN_URL_WARM_PAGE_SIZE", "1000"))
+
+
+class SeenUrlFilter:
+    """
+    Bounded LRU of smart_news.source_url values we know are already stored.
+
+    Warmed once with a paged projection query; afterwards only URLs missing from
+    the LRU are checked against the database, with one `in_` query per batch.
+    Steady-state cycles therefore make almost no database calls for known items.
+
+    The LRU is touched from the event loop and from to_thread workers, so every
+    access holds _lock; database queries run outside it.
+    """
+
+    def __init__(self, storage: StorageClient, capacity: int = SEEN_URL_CAPACITY, batch_size: int = DEDUPE_BATCH_SIZE):
+        self._storage = storage
+        self._capacity = capacity
+        self._batch_size = batch_size
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._warm_lock = threading.Lock()
+        self.warmed = False
+        self.db_queries = 0
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._seen
+
+    def _add_locked(self, url: str) -> None:
+        self._seen[url] = None
+        self._seen.move_to_end(url)
+        if len(self._seen) > self._capacity:
+            self._seen.popitem(last=False)
+
+    def add(self, url: str) -> None:
+        with self._lock:
+            self._add_locked(url)
+
+    def warm(self) -> None:
+        """Loads up to `capacity` of the most recent source URLs, newest first; later calls are no-ops."""
+        with self._warm_lock:
+            if self.warmed:
+                return
+            urls: List[str] = []
+            queries = 0
+            after = None
+            while len(urls) < self._capacity:
+                page_size = min(SEEN_URL_WARM_PAGE_SIZE, self._capacity - len(urls))
+                query = self._storage.table("smart_news").select("id,created_at,source_url")
+                if after:
+                    query = query.or_(keyset_filter(after))
+                rows = (
+                    query.order("created_at", desc=True)
+                    .order("id", desc=True)
+                    .limit(page_size)
+                    .execute()
+                    .data
+                )
+                queries += 1
+                rows = rows or []
+                urls += [row["source_url"] for row in rows if row.get("source_url")]
+                if len(rows) < page_size:
+                    break
+                after = (rows[-1]["created_at"], rows[-1]["id"])
+            with self._lock:
+                self.db_queries += queries
+                # Newest first, each in front of the last, so URLs added meanwhile stay most recently used
+                for url in urls:
+                    if len(self._seen) >= self._capacity:
+                        break
+                    if url not in self._seen:
+                        self._seen[url] = None
+                        self._seen.move_to_end(url, last=False)
+                self.warmed = True
+            print(f"[SmartNewsCollector] Seen-URL filter warmed with {len(self)} URLs")
+
+    def filter_new(self, urls: Iterable[str]) -> List[str]:
+        """Returns the URLs not yet stored, de-duplicated, in first-seen order."""
+        unknown: List[str] = []
+        with self._lock:
+            for url in dict.fromkeys(urls):
+                if url in self._seen:
+                    self._seen.move_to_end(url)
+                else:
+                    unknown.append(url)
+
+        stored = set()
+        for i in range(0, len(unknown), self._batch_size):
+            batch = unknown[i:i + self._batch_size]
+            response = self._storage.table("smart_news").select("source_url").in_("source_url", batch).execute()
+            found = [row["source_url"] for row in response.data or []]
+            stored.update(found)
+            with self._lock:
+                self.db_queries += 1
+                for url in found:
+                    self._add_locked(url)
+
+        return [url for url in unknown if url not in stored]
+
+    async def filter_new_async(self, urls: Iterable[str]) -> List[str]:
+        """`filter_new` off the event loop; warms the filter on first use."""
+        urls = list(urls)
+        if not self.warmed:
+            await asyncio.to_thread(self.warm)
+        return await asyncio.to_thread(self.filter_new, urls)
@@ -0,0 +1,252 @@
+# app/workers/news_pipeline.py
+
+import asyncio
+import calendar
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.workers.feed_fetcher import FeedFetcher, FeedFetchResult
+from app.workers.news_dedupe import DEDUPE_BATCH_SIZE, SeenUrlFilter
+from app.workers.news_store import NEWS_INSERT_CHUNK_SIZE, NewsBatchWriter
+
+MAX_ENTRIES_PER_FEED = int(os.getenv("MAX_ENTRIES_PER_FEED", "10"))
+LANGUAGE_CONCURRENCY = int(os.getenv("LANGUAGE_CONCURRENCY", "2"))
+LANGUAGE_BATCH_SIZE = int(os.getenv("LANGUAGE_BATCH_SIZE", "64"))
+# Enrichment is paced by the LLM quota limiter; this only caps articles in flight
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "8"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "100"))
+
+NewsItem = Dict[str, object]
+
+
+@dataclass
+class FeedCycle:
+    """What one poll of a single feed produced; feeds the adaptive scheduler."""
+    status: str = "error"  # FeedFetchResult.status
+    entries: int = 0
+    new: int = 0
+    newest_item_at: Optional[float] = None
+
+
+@dataclass
+class PipelineStats:
+    feeds: int = 0
+    not_modified: int = 0
+    feed_errors: int = 0
+    entries: int = 0
+    new: int = 0
+    enriched: int = 0
+    stored: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    per_feed: Dict[str, FeedCycle] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (
+            f"feeds={self.feeds} unchanged={self.not_modified} feed_errors={self.feed_errors} "
+            f"entries={self.entries} new={self.new} enriched={self.enriched} stored={self.stored} "
+            f"failed={self.failed} in {time.perf_counter() - self.started:.1f}s"
+        )
+
+
+class NewsPipeline:
+    """
+    One collector cycle as a staged pipeline:
+
+        fetch -> dedupe -> language -> enrich -> store
+
+    Stages are connected by bounded queues (backpressure) and each runs its own
+    number of workers, so slow LLM enrichment overlaps with fetching and storing
+    instead of processing articles one at a time.
+    """
+
+    def __init__(
+        self,
+        fetcher: FeedFetcher,
+        seen_urls: SeenUrlFilter,
+        writer_factory: Callable[[], NewsBatchWriter],
+        detect_languages: Callable[[List[str]], List[str]],
+        enrich: Callable[[NewsItem], Awaitable[Tuple[dict, List[dict]]]],
+        max_entries_per_feed: int = MAX_ENTRIES_PER_FEED,
+        language_concurrency: int = LANGUAGE_CONCURRENCY,
+        enrich_concurrency: int = ENRICH_CONCURRENCY,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+    ):
+        self.fetcher = fetcher
+        self.seen_urls = seen_urls
+        self.writer_factory = writer_factory
+        self.detect_languages = detect_languages
+        self.enrich = enrich
+        self.max_entries_per_feed = max_entries_per_feed
+        self.language_concurrency = language_concurrency
+        self.enrich_concurrency = enrich_concurrency
+        self.queue_size = queue_size
+
+    async def run(self, feed_urls: List[str]) -> PipelineStats:
+        stats = PipelineStats(feeds=len(feed_urls), per_feed={url: FeedCycle() for url in feed_urls})
+        q_dedupe: asyncio.Queue = asyncio.Queue(self.queue_size)
+        q_language: asyncio.Queue = asyncio.Queue(self.queue_size)
+        q_enrich: asyncio.Queue = asyncio.Queue(self.queue_size)
+        q_store: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        results: List[FeedFetchResult] = []
+        failed_feeds: Set[str] = set()
+        in_flight: Set[str] = set()
+        buffered: Dict[str, NewsItem] = {}
+        writer = self.writer_factory()
+
+        async def flush():
+            if not len(writer):
+                return
+            try:
+                inserted, failed = await writer.flush_async()
+            except Exception as e:
+                # flush() has already taken the rows out of the writer; their feeds are retried next cycle
+                print(f"⚠️ Store failed for {len(buffered)} articles: {e}")
+                inserted, failed = [], set(buffered)
+            for link in inserted:
+                self.seen_urls.add(link)
+                print(f"📰 Added: {str(buffered.pop(link)['title'])[:60]}")
+            for link in failed:
+                failed_feeds.add(buffered.pop(link)["feed_url"])
+            stats.stored += len(inserted)
+            stats.failed += len(failed)
+
+        # --- Stage 1: fetch ---
+        async def fetch_feed(url: str):
+            result = await self.fetcher.fetch(url)
+            results.append(result)
+            cycle = stats.per_feed[url]
+            cycle.status = result.status
+            if result.status == "not_modified":
+                stats.not_modified += 1
+                return
+            if result.status == "error":
+                stats.feed_errors += 1
+                print(f"⚠️ Feed error {url}: {result.error}")
+                return
+
+            feed = result.feed
+            if not feed.entries:
+                print(f"⚠️ No entries found for {url}")
+                return
+            published = [e.get("published_parsed") or e.get("updated_parsed") for e in feed.entries]
+            published = [calendar.timegm(p) for p in published if p]
+            cycle.newest_item_at = max(published) if published else None
+
+            for entry in feed.entries[:self.max_entries_per_feed]:
+                title = entry.get("title", "").strip()
+                link = entry.get("link", "").strip()
+                summary = entry.get("summary", "").strip()
+                if not title or not link:
+                    continue
+                stats.entries += 1
+                cycle.entries += 1
+                await q_dedupe.put({
+                    "title": title,
+                    "link": link,
+                    "summary": summary,
+                    "description": entry.get("description", summary),
+                    "source_name": feed.feed.get("title", "Unknown Source"),
+                    "feed_url": url,
+                })
+
+        # --- Stage 2: dedupe (batched so each DB lookup covers many entries) ---
+        async def dedupe_worker():
+            while True:
+                batch = [await q_dedupe.get()]
+                while len(batch) < DEDUPE_BATCH_SIZE and not q_dedupe.empty():
+                    batch.append(q_dedupe.get_nowait())
+                try:
+                    new_links = set(await self.seen_urls.filter_new_async(item["link"] for item in batch))
+                    for item in batch:
+                        # The same story can appear in more than one feed
+                        if item["link"] in new_links and item["link"] not in in_flight:
+                            in_flight.add(item["link"])
+                            stats.new += 1
+                            stats.per_feed[item["feed_url"]].new += 1
+                            await q_language.put(item)
+                except Exception as e:
+                    print(f"⚠️ Dedupe failed for {len(batch)} entries: {e}")
+                    failed_feeds.update(item["feed_url"] for item in batch)
+                finally:
+                    for _ in batch:
+                        q_dedupe.task_done()
+
+        # --- Stage 3: language (batched, CPU-bound, off the event loop) ---
+        async def language_worker():
+            while True:
+                batch = [await q_language.get()]
+                while len(batch) < LANGUAGE_BATCH_SIZE and not q_language.empty():
+                    batch.append(q_language.get_nowait())
+                forwarded = 0
+                try:
+                    texts = [f"{item['title']} {item['summary']}" for item in batch]
+                    languages = await asyncio.to_thread(self.detect_languages, texts)
+                    for item, language in zip(batch, languages):
+                        item["language"] = language
+                        await q_enrich.put(item)
+                        forwarded += 1
+                except Exception as e:
+                    print(f"⚠️ Language detection failed for {len(batch) - forwarded} entries: {e}")
+                    stats.failed += len(batch) - forwarded
+                    failed_feeds.update(item["feed_url"] for item in batch[forwarded:])
+                finally:
+                    for _ in batch:
+                        q_language.task_done()
+
+        # --- Stage 4: enrich (LLM calls, paced by the quota limiter) ---
+        async def enrich_worker():
+            while True:
+                item = await q_enrich.get()
+                try:
+                    item["news_row"], item["claims"] = await self.enrich(item)
+                    stats.enriched += 1
+                    await q_store.put(item)
+                except Exception as e:
+                    print(f"⚠️ Article error {item['link']}: {e}")
+                    stats.failed += 1
+                    failed_feeds.add(item["feed_url"])
+                finally:
+                    q_enrich.task_done()
+
+        # --- Stage 5: store (multi-row inserts per chunk) ---
+        async def store_worker():
+            while True:
+                item = await q_store.get()
+                try:
+                    buffered[item["link"]] = item
+                    writer.add(item["news_row"], item["claims"])
+                    if len(writer) >= NEWS_INSERT_CHUNK_SIZE:
+                        await flush()
+                except Exception as e:
+                    print(f"⚠️ Store failed for {item['link']}: {e}")
+                    buffered.pop(item["link"], None)
+                    stats.failed += 1
+                    failed_feeds.add(item["feed_url"])
+                finally:
+                    q_store.task_done()
+
+        workers = [asyncio.create_task(dedupe_worker()), asyncio.create_task(store_worker())]
+        workers += [asyncio.create_task(language_worker()) for _ in range(self.language_concurrency)]
+        workers += [asyncio.create_task(enrich_worker()) for _ in range(self.enrich_concurrency)]
+        try:
+            await asyncio.gather(*(fetch_feed(url) for url in feed_urls))
+            # Drain stage by stage; each join returns once everything upstream has moved on
+            for queue in (q_dedupe, q_language, q_enrich, q_store):
+                await queue.join()
+            await flush()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        # Feeds with a failed article keep their old validators so the next cycle retries them
+        for result in results:
+            if result.url not in failed_feeds:
+                await self.fetcher.commit(result)
+
+        print(f"[SmartNewsCollector] Cycle done: {stats.summary()}")
+        return stats
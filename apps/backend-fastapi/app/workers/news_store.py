@@ -0,0 +1,87 @@
+# app/workers/news_store.py
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Set, Tuple
+
+from app.services.storage_layer import StorageClient
+
+# Rows per multi-row insert; keeps each request body well under PostgREST payload limits
+NEWS_INSERT_CHUNK_SIZE = int(os.getenv("NEWS_INSERT_CHUNK_SIZE", "200"))
+CLAIMS_INSERT_CHUNK_SIZE = int(os.getenv("CLAIMS_INSERT_CHUNK_SIZE", "500"))
+
+
+def _chunks(rows: List[dict], size: int):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class NewsBatchWriter:
+    """
+    Buffers enriched articles for one collector cycle and writes them with
+    multi-row inserts: smart_news first, then all claims linked through the
+    returned article IDs. Round trips scale with chunks, not with claim count.
+    """
+
+    def __init__(self, storage: StorageClient, news_chunk_size: int = NEWS_INSERT_CHUNK_SIZE,
+                 claims_chunk_size: int = CLAIMS_INSERT_CHUNK_SIZE):
+        self._storage = storage
+        self._news_chunk_size = news_chunk_size
+        self._claims_chunk_size = claims_chunk_size
+        self._news_rows: List[dict] = []
+        self._claims_by_url: Dict[str, List[dict]] = {}
+
+    def __len__(self):
+        return len(self._news_rows)
+
+    def add(self, news_row: dict, claims: List[dict]) -> None:
+        self._news_rows.append(news_row)
+        self._claims_by_url[news_row["source_url"]] = claims or []
+
+    def flush(self) -> Tuple[List[str], Set[str]]:
+        """
+        Writes everything buffered and clears the buffer.
+        Returns (inserted source URLs, source URLs whose insert failed).
+        """
+        news_rows, claims_by_url = self._news_rows, self._claims_by_url
+        self._news_rows, self._claims_by_url = [], {}
+
+        inserted: List[str] = []
+        failed: Set[str] = set()
+        article_ids: Dict[str, str] = {}
+
+        for chunk in _chunks(news_rows, self._news_chunk_size):
+            try:
+                response = self._storage.table("smart_news").insert(chunk).execute()
+                for row in response.data or []:
+                    article_ids[row["source_url"]] = row["id"]
+            except Exception as e:
+                print(f"⚠️ smart_news bulk insert failed ({len(chunk)} rows): {e}")
+                failed.update(row["source_url"] for row in chunk)
+
+        now = datetime.now(timezone.utc).isoformat()
+        claim_rows = []
+        for url, article_id in article_ids.items():
+            inserted.append(url)
+            for c in claims_by_url.get(url, []):
+                claim_rows.append({
+                    "article_id": article_id,
+                    "claim_text": c.get("claim_text"),
+                    "claim_type": c.get("claim_type"),
+                    "context": c.get("context"),
+                    "created_at": now,
+                })
+
+        for chunk in _chunks(claim_rows, self._claims_chunk_size):
+            try:
+                self._storage.table("claims").insert(chunk).execute()
+            except Exception as e:
+                # Articles are already stored; losing their claims is logged rather than retried
+                print(f"⚠️ claims bulk insert failed ({len(chunk)} rows): {e}")
+
+        print(f"[SmartNewsCollector] Stored {len(inserted)} articles and {len(claim_rows)} claims")
+        return inserted, failed
+
+    async def flush_async(self) -> Tuple[List[str], Set[str]]:
+        return await asyncio.to_thread(self.flush)
@@ -1,38 +1,80 @@
 # app/workers/smart_news_collector.py
 
 import asyncio
-import feedparser
+import json
 import os
+import time
 import httpx
 from datetime import datetime, timezone
-from langdetect import detect
-from supabase import create_client, Client
+from typing import Optional
+
+from app.config import GROQ_CHAT_URL
+from app.services.claim_prefilter import prefilter_claims
+from app.services.language_id import detect_languages
+from app.services.storage_layer import StorageClient, get_storage_client
+from app.services.prompt_budget import count_tokens, fit_to_budget, record_usage_from_response
+from app.workers.feed_catalog import load_feed_catalog
+from app.workers.feed_fetcher import get_feed_fetcher
+from app.workers.feed_scheduler import FeedScheduler
+from app.workers.llm_quota import LLMQuotaLimiter
+from app.workers.news_dedupe import SeenUrlFilter
+from app.workers.news_pipeline import NewsPipeline
+from app.workers.news_store import NewsBatchWriter
+from app.workers.story_clusters import StoryClusterIndex
 
 # ======================================================
 # Initialization
 # ======================================================
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Missing Supabase credentials — check .env")
+storage: StorageClient = get_storage_client()
+seen_urls = SeenUrlFilter(storage)
+story_clusters = StoryClusterIndex()
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+GROQ_MODEL = "llama-3.1-8b-instant"
+
+# Token budgets for the article text inserted into each prompt
+BIAS_INPUT_TOKENS = 1000
+SUMMARY_INPUT_TOKENS = 1500
+CLAIMS_INPUT_TOKENS = 1250
 
-HEADERS = {
-    "User-Agent": "GangstaAI-NewsCollector/3.0 (+https://gangsta.ai)"
-}
 
 # ======================================================
-# Reliable Global RSS Feeds
+# Shared Groq client, paced by the provider quota
 # ======================================================
-RSS_FEEDS = [
-    "https://feeds.bbci.co.uk/news/world/rss.xml",
-    "https://www.aljazeera.com/xml/rss/all.xml",
-    "https://www.npr.org/rss/rss.php?id=1004",
-    "https://www.reutersagency.com/feed/?best-topics=world",
-]
+llm_limiter = LLMQuotaLimiter()
+GROQ_MAX_RETRIES = 2
+_groq_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_groq_client() -> httpx.AsyncClient:
+    global _groq_client
+    if _groq_client is None or _groq_client.is_closed:
+        _groq_client = httpx.AsyncClient(headers={"Authorization": f"Bearer {GROQ_API_KEY}"})
+    return _groq_client
+
+
+async def _groq_chat(call: str, payload: dict, prompt_text: str, timeout: float) -> str:
+    """
+    Sends one chat completion through the shared client and returns the message content.
+    Waits for quota before sending; a 429 pauses all callers for Retry-After and is retried.
+    """
+    prompt_tokens = count_tokens(prompt_text)
+    for attempt in range(GROQ_MAX_RETRIES + 1):
+        await llm_limiter.acquire(prompt_tokens)
+        started = time.perf_counter()
+        resp = await _get_groq_client().post(GROQ_CHAT_URL, json=payload, timeout=timeout)
+        if resp.status_code == 429 and attempt < GROQ_MAX_RETRIES:
+            retry_after = float(resp.headers.get("retry-after") or 2 ** (attempt + 1))
+            print(f"⚠️ Groq rate limited ({call}), pausing {retry_after:.0f}s")
+            llm_limiter.pause(retry_after)
+            continue
+        resp.raise_for_status()
+        data = resp.json()
+        content = data["choices"][0]["message"]["content"].strip()
+        record_usage_from_response(call, GROQ_MODEL, data.get("usage"), prompt_text, content,
+                                   (time.perf_counter() - started) * 1000)
+        return content
 
 
 # ======================================================
@@ -47,14 +89,11 @@ async def ai_detect_bias(text: str) -> tuple[str, float]:
         print("⚠️ Missing GROQ_API_KEY — fallback to center")
         return "center", 0.50
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
-
     prompt = f"""
 You are a political bias detection AI. 
 Classify the ideological bias of this news text:
 
-{text[:4000]}
+{fit_to_budget(text, BIAS_INPUT_TOKENS)}
 
 Return JSON only in this EXACT format:
 {{
@@ -64,22 +103,16 @@ Return JSON only in this EXACT format:
 """
 
     payload = {
-        "model": "llama-3.1-8b-instant",
+        "model": GROQ_MODEL,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0.0,
     }
 
     try:
-        async with httpx.AsyncClient(timeout=45) as client:
-            resp = await client.post(url, headers=headers, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            response = data["choices"][0]["message"]["content"].strip()
+        response = await _groq_chat("collector.bias", payload, prompt, timeout=45)
+        parsed = json.loads(response)
 
-            import json
-            parsed = json.loads(response)
-
-            return parsed.get("bias", "center"), float(parsed.get("confidence", 0.5))
+        return parsed.get("bias", "center"), float(parsed.get("confidence", 0.5))
 
     except Exception as e:
         print(f"⚠️ AI bias detection failed: {e}")
@@ -94,27 +127,21 @@ async def summarize_text(text: str) -> str:
         print("⚠️ Missing GROQ_API_KEY, skipping summarization.")
         return text[:350]
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
-
+    content = fit_to_budget(text, SUMMARY_INPUT_TOKENS)
     payload = {
-        "model": "llama-3.1-8b-instant",
+        "model": GROQ_MODEL,
         "messages": [
             {
                 "role": "system",
                 "content": "Summarize in under 4 sentences, preserve truth."
             },
-            {"role": "user", "content": text[:6000]},
+            {"role": "user", "content": content},
         ],
         "temperature": 0.3,
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(url, headers=headers, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            return data["choices"][0]["message"]["content"].strip()
+        return await _groq_chat("collector.summary", payload, content, timeout=60)
     except Exception as e:
         print(f"⚠️ Summarizer failure: {e}")
         return text[:350]
@@ -131,13 +158,14 @@ async def extract_claims(text: str) -> list[dict]:
     if not GROQ_API_KEY:
         return []
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
+    text, has_candidates = prefilter_claims(text, "collector.claims")
+    if not has_candidates:
+        return []
 
     prompt = f"""
 Extract factual claims from this article and return JSON list only:
 
-{text[:5000]}
+{fit_to_budget(text, CLAIMS_INPUT_TOKENS)}
 
 Response example:
 [
@@ -147,108 +175,86 @@ Response example:
 """
 
     payload = {
-        "model": "llama-3.1-8b-instant",
+        "model": GROQ_MODEL,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0.0,
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(url, headers=headers, json=payload)
-            resp.raise_for_status()
-            raw = resp.json()["choices"][0]["message"]["content"]
-
-            import json
-            return json.loads(raw)
+        raw = await _groq_chat("collector.claims", payload, prompt, timeout=60)
+        return json.loads(raw)
     except Exception as e:
         print(f"⚠️ Claim extraction failed: {e}")
         return []
 
 
 # ======================================================
-# Main Fetch + Store Routine
+# Per-article stages used by the pipeline
 # ======================================================
-async def fetch_and_store_news():
-    print("[SmartNewsCollector] 🌍 Fetching global news...")
-
-    for url in RSS_FEEDS:
-        try:
-            feed = feedparser.parse(url, request_headers=HEADERS)
-
-            if not feed.entries:
-                print(f"⚠️ No entries found for {url}")
-                continue
-
-            for entry in feed.entries[:4]:
-                title = entry.get("title", "").strip()
-                link = entry.get("link", "").strip()
-                summary = entry.get("summary", "").strip()
-                description = entry.get("description", summary)
-
-                if not title or not link:
-                    continue
-
-                # === Duplicate Check ===
-                existing = supabase.table("smart_news").select("id").eq("source_url", link).execute()
-                if existing.data:
-                    continue
-
-                # === Language Detection ===
-                try:
-                    lang = detect(title + " " + summary)
-                except Exception:
-                    lang = "en"
-
-                # === Bias via AI ===
-                bias, confidence = await ai_detect_bias(summary or description or title)
-
-                # === Summarization ===
-                summarized = await summarize_text(summary or description or title)
-
-                # === Insert into smart_news ===
-                news_row = {
-                    "title": title,
-                    "summary": summarized,
-                    "source_name": feed.feed.get("title", "Unknown Source"),
-                    "source_url": link,
-                    "bias": bias,
-                    "bias_confidence": confidence,
-                    "trust_score": 0.5,
-                    "language": lang,
-                    "author_fingerprint": None,
-                    "created_at": datetime.now(timezone.utc).isoformat(),
-                    "published_at": datetime.now(timezone.utc).isoformat(),
-                }
-
-                inserted = supabase.table("smart_news").insert(news_row).execute()
-
-                if inserted.data:
-                    article_id = inserted.data[0]["id"]
-                    print(f"📰 Added: {title[:60]}")
+async def enrich_article(item: dict) -> tuple[dict, list[dict]]:
+    """
+    Bias, summary and claims for one article; the LLM calls run concurrently.
 
-                    # === Claims Extraction ===
-                    claims = await extract_claims(summary or description or title)
+    Near-duplicate copies of a story (same cluster) reuse the claims extracted
+    from the first copy. Bias and summary are always computed per article: the
+    summary is stored under this outlet's source_url, so it has to describe
+    this outlet's text.
+    """
+    text = item["summary"] or item["description"] or item["title"]
+    cluster = await story_clusters.assign(item["link"], f"{item['title']} {text}")
+
+    (bias, confidence), summarized, (claims, reused) = await asyncio.gather(
+        ai_detect_bias(text),
+        summarize_text(text),
+        cluster.shared_enrichment(lambda: extract_claims(text)),
+    )
+    if reused:
+        print(f"[SmartNewsCollector] Reused cluster {cluster.cluster_id[:8]} claims for {item['link']}")
+
+    news_row = {
+        "title": item["title"],
+        "summary": summarized,
+        "source_name": item["source_name"],
+        "source_url": item["link"],
+        "bias": bias,
+        "bias_confidence": confidence,
+        "trust_score": 0.5,
+        "language": item["language"],
+        "author_fingerprint": None,
+        "cluster_id": cluster.cluster_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "published_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return news_row, claims
 
-                    for c in claims:
-                        supabase.table("claims").insert({
-                            "article_id": article_id,
-                            "claim_text": c.get("claim_text"),
-                            "claim_type": c.get("claim_type"),
-                            "context": c.get("context"),
-                            "created_at": datetime.now(timezone.utc).isoformat()
-                        }).execute()
 
-                await asyncio.sleep(2)
+# ======================================================
+# Main Fetch + Store Routine
+# ======================================================
+async def fetch_and_store_news(feed_urls: Optional[list[str]] = None):
+    feed_urls = feed_urls or load_feed_catalog(storage)
+    print(f"[SmartNewsCollector] 🌍 Fetching {len(feed_urls)} feeds...")
 
-        except Exception as e:
-            print(f"⚠️ Feed error {url}: {e}")
+    pipeline = NewsPipeline(
+        fetcher=get_feed_fetcher(),
+        seen_urls=seen_urls,
+        writer_factory=lambda: NewsBatchWriter(storage),
+        detect_languages=detect_languages,
+        enrich=enrich_article,
+    )
+    return await pipeline.run(feed_urls)
 
 
 # ======================================================
 # Background Task
 # ======================================================
-async def start_background_task():
-    while True:
-        await fetch_and_store_news()
-        print("[SmartNewsCollector] Sleeping for 10 minutes...")
-        await asyncio.sleep(600)
+async def start_background_task(feed_urls: Optional[list[str]] = None):
+    """
+    Polls every feed on its own adaptive timer (see FeedScheduler).
+    collector_main runs one of these per owned shard; without feed_urls the whole catalog is polled.
+    """
+    async def poll(feed_urls: list[str]):
+        stats = await fetch_and_store_news(feed_urls)
+        return stats.per_feed
+
+    await FeedScheduler(feed_urls or load_feed_catalog(storage)).run(poll)
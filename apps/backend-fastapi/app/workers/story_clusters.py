@@ -0,0 +1,282 @@
+# app/workers/story_clusters.py
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+import weakref
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.redis_layer import get_async_redis
+
+# 32 bands x 4 rows: LSH threshold ~(1/32)^(1/4) = 0.42; pairs at 0.6+ Jaccard share a band >99% of the time
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+# Estimated Jaccard similarity needed to join an existing story cluster
+STORY_CLUSTER_THRESHOLD = float(os.getenv("STORY_CLUSTER_THRESHOLD", "0.5"))
+STORY_CLUSTER_WINDOW_HOURS = float(os.getenv("STORY_CLUSTER_WINDOW_HOURS", "48"))
+STORY_CLUSTER_CAPACITY = int(os.getenv("STORY_CLUSTER_CAPACITY", "5000"))
+
+# Redis copy of the index, shared by collector shards and kept across restarts (TTL = window)
+_REDIS_PREFIX = "story_clusters"
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)  # fixed seed: signatures must be stable across restarts
+_A = _rng.integers(1, _PRIME, MINHASH_PERMUTATIONS, dtype=np.int64)
+_B = _rng.integers(0, _PRIME, MINHASH_PERMUTATIONS, dtype=np.int64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'\-]+")
+_STOPWORDS = {
+    "the", "and", "for", "that", "with", "this", "from", "was", "were", "are", "has", "have", "had",
+    "his", "her", "its", "their", "they", "she", "him", "but", "not", "been", "will", "would", "said",
+    "says", "after", "over", "into", "about", "more", "than", "who", "what", "when", "which", "also",
+}
+
+
+def shingles(text: str) -> Set[str]:
+    """Content words of the text; word order is ignored so rephrased copies still overlap."""
+    return {t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS}
+
+
+def minhash(tokens: Set[str]) -> Optional[np.ndarray]:
+    if not tokens:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(t.encode(), digest_size=4).digest(), "little") % _PRIME for t in tokens),
+        dtype=np.int64,
+        count=len(tokens),
+    )
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+def estimated_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / MINHASH_PERMUTATIONS
+
+
+def _article_key(key: str) -> str:
+    return f"{_REDIS_PREFIX}:article:{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"
+
+
+def _band_key(band_key: Tuple[int, bytes]) -> str:
+    band, rows = band_key
+    return f"{_REDIS_PREFIX}:band:{band}:{hashlib.blake2b(rows, digest_size=8).hexdigest()}"
+
+
+def _shared_key(cluster_id: str) -> str:
+    return f"{_REDIS_PREFIX}:shared:{cluster_id}"
+
+
+@dataclass
+class StoryCluster:
+    cluster_id: str
+    members: int = 0
+    # Seconds the shared enrichment is kept in Redis for other instances; 0 = this process only
+    shared_ttl: int = 0
+    # Enrichment shared by all members (e.g. extracted claims), computed once by the first member
+    _shared: Optional[Any] = None
+    _pending: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    async def _load_shared(self) -> Optional[Any]:
+        if not self.shared_ttl:
+            return None
+        try:
+            raw = await get_async_redis().get(_shared_key(self.cluster_id))
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            print(f"⚠️ Could not load story cluster enrichment from Redis: {e}")
+            return None
+
+    async def _store_shared(self, result: Any) -> None:
+        if not self.shared_ttl:
+            return
+        try:
+            await get_async_redis().set(_shared_key(self.cluster_id), json.dumps(result), ex=self.shared_ttl)
+        except Exception as e:
+            print(f"⚠️ Could not store story cluster enrichment in Redis: {e}")
+
+    async def shared_enrichment(self, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Returns (result, reused). The first caller runs `compute`, unless another
+        instance already stored the result in Redis; members arriving while it
+        is in flight wait for it instead of repeating the LLM calls.
+        """
+        if self._shared is not None:
+            return self._shared, True
+        if self._pending is not None:
+            return await asyncio.shield(self._pending), True
+
+        async def load_or_compute():
+            stored = await self._load_shared()
+            if stored is not None:
+                return stored, True
+            result = await compute()
+            await self._store_shared(result)
+            return result, False
+
+        self._pending = asyncio.ensure_future(load_or_compute())
+        try:
+            self._shared, reused = await asyncio.shield(self._pending)
+            return self._shared, reused
+        finally:
+            self._pending = None
+
+
+@dataclass
+class _Entry:
+    signature: np.ndarray
+    cluster: StoryCluster
+    added_at: float
+
+
+class StoryClusterIndex:
+    """
+    MinHash + LSH index over recent article text.
+
+    Each incoming article is hashed once and looked up in LSH_BANDS band buckets,
+    so assigning it to a cluster costs the same regardless of how many articles
+    are indexed. Only the most recent articles (window / capacity bound) are kept.
+
+    With `shared` (the default) the band buckets, signatures and cluster
+    enrichment are also written to Redis with the window as TTL, so articles
+    seen by another collector shard or before a restart still join their
+    cluster. The in-process index answers repeats without a round trip; Redis
+    errors fall back to it alone.
+    """
+
+    def __init__(self, threshold: float = STORY_CLUSTER_THRESHOLD,
+                 window_hours: float = STORY_CLUSTER_WINDOW_HOURS,
+                 capacity: int = STORY_CLUSTER_CAPACITY,
+                 shared: bool = True):
+        self.threshold = threshold
+        self.window_seconds = window_hours * 3600
+        self.capacity = capacity
+        self.shared_ttl = int(self.window_seconds) if shared else 0
+        self._rows = MINHASH_PERMUTATIONS // LSH_BANDS
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+        # Clusters still referenced by an entry or an in-flight article, so members share one object
+        self._clusters: "weakref.WeakValueDictionary[str, StoryCluster]" = weakref.WeakValueDictionary()
+        self.stats = {"assigned": 0, "joined": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(LSH_BANDS):
+            yield band, signature[band * self._rows:(band + 1) * self._rows].tobytes()
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.capacity and now - entry.added_at <= self.window_seconds:
+                break
+            self._entries.popitem(last=False)
+            for band_key in self._bands(entry.signature):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band_key]
+            entry.cluster.members -= 1
+
+    def _cluster(self, cluster_id: Optional[str] = None) -> StoryCluster:
+        cluster_id = cluster_id or str(uuid.uuid4())
+        cluster = self._clusters.get(cluster_id)
+        if cluster is None:
+            cluster = StoryCluster(cluster_id=cluster_id, shared_ttl=self.shared_ttl)
+            self._clusters[cluster_id] = cluster
+        return cluster
+
+    async def _shared_candidates(self, key: str, band_keys: List[Tuple[int, bytes]]) -> List[Tuple[str, np.ndarray]]:
+        """(cluster_id, signature) of articles in the same Redis band buckets that this process hasn't indexed."""
+        redis = get_async_redis()
+        pipe = redis.pipeline()
+        for band_key in band_keys:
+            pipe.smembers(_band_key(band_key))
+        article_keys = set().union(*await pipe.execute())
+        article_keys.discard(_article_key(key).encode())
+        local = {_article_key(k).encode() for k in self._entries}
+        article_keys = [k for k in article_keys if k not in local]
+        if not article_keys:
+            return []
+        pipe = redis.pipeline()
+        for article_key in article_keys:
+            pipe.hgetall(article_key)
+        found = []
+        for fields in await pipe.execute():
+            if fields:  # expired since the bucket was read
+                found.append((fields[b"cluster_id"].decode(), np.frombuffer(fields[b"signature"], dtype=np.int64)))
+        return found
+
+    async def _share(self, key: str, signature: np.ndarray, cluster: StoryCluster,
+                     band_keys: List[Tuple[int, bytes]]) -> None:
+        pipe = get_async_redis().pipeline()
+        article_key = _article_key(key)
+        pipe.hset(article_key, mapping={"cluster_id": cluster.cluster_id, "signature": signature.tobytes()})
+        pipe.expire(article_key, self.shared_ttl)
+        for band_key in band_keys:
+            pipe.sadd(_band_key(band_key), article_key)
+            pipe.expire(_band_key(band_key), self.shared_ttl)
+        await pipe.execute()
+
+    async def assign(self, key: str, text: str) -> StoryCluster:
+        """Returns the story cluster for this article, creating a new one if nothing is close enough."""
+        if key in self._entries:
+            return self._entries[key].cluster
+
+        now = time.time()
+        self._evict(now)
+        self.stats["assigned"] += 1
+
+        signature = minhash(shingles(text))
+        if signature is None:
+            cluster = self._cluster()
+            cluster.members = 1
+            return cluster
+
+        band_keys = list(self._bands(signature))
+        candidates: Set[str] = set()
+        for band_key in band_keys:
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best: Optional[StoryCluster] = None
+        best_score = self.threshold
+        for candidate in candidates:
+            entry = self._entries[candidate]
+            score = estimated_similarity(signature, entry.signature)
+            if score >= best_score:
+                best, best_score = entry.cluster, score
+
+        if self.shared_ttl:
+            try:
+                for cluster_id, other in await self._shared_candidates(key, band_keys):
+                    score = estimated_similarity(signature, other)
+                    if score >= best_score:
+                        best, best_score = self._cluster(cluster_id), score
+            except Exception as e:
+                print(f"⚠️ Could not look up story clusters in Redis: {e}")
+
+        if best is not None:
+            cluster = best
+            self.stats["joined"] += 1
+        else:
+            cluster = self._cluster()
+
+        cluster.members += 1
+        self._entries[key] = _Entry(signature, cluster, now)
+        for band_key in band_keys:
+            self._buckets[band_key].add(key)
+
+        if self.shared_ttl:
+            try:
+                await self._share(key, signature, cluster, band_keys)
+            except Exception as e:
+                print(f"⚠️ Could not store story cluster in Redis: {e}")
+        return cluster
@@ -13,6 +13,59 @@ export type NewsArticle = {
   bias: string; // The political bias of the article (e.g., 'LEFT', 'CENTER', 'RIGHT').
   trust_score: number; // A numerical score representing the trustworthiness of the source.
   published_at: string; // The publication date and time of the article.
+  cluster_id?: string | null; // Story cluster shared by near-duplicate articles from different sources.
+};
+
+// Per-stage timing of one stage of an analysis job (see the backend's job_telemetry).
+export type StageTiming = {
+  inputs: Record<string, unknown>; // Input sizes and counts, e.g. { input_chars: 1200 }.
+  outcome: 'ok' | 'error';
+  error?: string;
+  duration_ms: number;
+  ended_at: number; // Unix time in seconds.
+  [extra: string]: unknown; // Outputs recorded by the stage, e.g. { claims: 3 }.
+};
+
+// Named entities found in a scanned caption or text (scan_results.entities, JSONB).
+export type ScanEntities = {
+  persons: string[];
+  organizations: string[];
+  locations: string[];
+};
+
+// Full analysis output of a scan (scan_results.results, JSONB). Text scans store the
+// text analysis fields; media scans add the media analysis and the claims checked.
+export type ScanAnalysis = {
+  truth_summary?: string;
+  score?: number;
+  mismatch_reason?: string;
+  entities?: ScanEntities;
+  caption?: string; // Media scans: the post caption.
+  media_blob_id?: string; // Media scans: the uploaded media, by content hash.
+  media_analysis?: string; // Media scans: description of the image or video keyframes.
+  transcription?: string; // Video scans: transcribed audio.
+  claims?: string[] | null; // Media scans: claims extracted from the caption and audio.
+  comparison_results?: Record<string, unknown> | null; // Media scans: each claim checked against the media.
+  [extra: string]: unknown;
+};
+
+// Represents a single text or media scan from the 'scan_results' Supabase table.
+export type ScanResult = {
+  id: string;
+  created_at: string; // The timestamp when the record was created in the database.
+  scan_id: string; // The id returned by /analyze-post or /analyze-text.
+  user_id: string | null;
+  caption: string; // The scanned text or the post caption.
+  truth_summary: string | null;
+  score: number | null; // Accuracy score, 0-100.
+  mismatch_reason: string | null;
+  entities: ScanEntities | null;
+  results: ScanAnalysis | null; // Full analysis output.
+  stage_timings?: {
+    job_type: 'text' | 'media';
+    total_ms: number;
+    stages: Record<string, StageTiming>;
+  } | null; // How long each stage of the analysis job took.
 };
 
 // You can add more types here as your application grows,
@@ -0,0 +1,7 @@
+-- Story cluster shared by near-duplicate articles from different sources
+-- (see apps/backend-fastapi/app/workers/story_clusters.py).
+alter table public.smart_news add column if not exists cluster_id text;
+create index if not exists smart_news_cluster_id_idx on public.smart_news (cluster_id);
+
+-- Make the new column visible to PostgREST without a restart
+notify pgrst, 'reload schema';
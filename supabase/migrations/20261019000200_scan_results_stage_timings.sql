@@ -0,0 +1,6 @@
+-- Per-stage timing breakdown of the analysis job that produced each scan
+-- (see apps/backend-fastapi/app/services/job_telemetry.py).
+alter table public.scan_results add column if not exists stage_timings jsonb;
+
+-- Make the new column visible to PostgREST without a restart
+notify pgrst, 'reload schema';
@@ -0,0 +1,47 @@
+-- scan_results.entities / results as structured JSONB, plus the indexes behind the
+-- /post-scans score and ?person= / ?organization= / ?location= (entities @> ...) filters.
+-- Same repair as apps/backend-fastapi/app/scripts/migrate_scan_results_jsonb.py; safe to re-run.
+
+-- Text that isn't valid JSON is kept as a JSON string rather than failing the migration
+create or replace function pg_temp.try_jsonb(value text) returns jsonb
+language plpgsql immutable as $$
+begin
+  return value::jsonb;
+exception when others then
+  return to_jsonb(value);
+end $$;
+
+do $$
+begin
+  if (select data_type from information_schema.columns
+      where table_schema = 'public' and table_name = 'scan_results' and column_name = 'entities') <> 'jsonb' then
+    alter table public.scan_results alter column entities type jsonb using pg_temp.try_jsonb(entities::text);
+  end if;
+  if (select data_type from information_schema.columns
+      where table_schema = 'public' and table_name = 'scan_results' and column_name = 'results') <> 'jsonb' then
+    alter table public.scan_results alter column results type jsonb using pg_temp.try_jsonb(results::text);
+  end if;
+end $$;
+
+-- Unwrap json.dumps() strings; double-encoded rows need more than one pass
+do $$
+declare
+  entities_changed integer;
+  results_changed integer;
+begin
+  loop
+    update public.scan_results set entities = pg_temp.try_jsonb(entities #>> '{}')
+    where jsonb_typeof(entities) = 'string' and pg_temp.try_jsonb(entities #>> '{}') is distinct from entities;
+    get diagnostics entities_changed = row_count;
+    update public.scan_results set results = pg_temp.try_jsonb(results #>> '{}')
+    where jsonb_typeof(results) = 'string' and pg_temp.try_jsonb(results #>> '{}') is distinct from results;
+    get diagnostics results_changed = row_count;
+    exit when entities_changed = 0 and results_changed = 0;
+  end loop;
+end $$;
+
+create index if not exists scan_results_entities_gin on public.scan_results using gin (entities jsonb_path_ops);
+create index if not exists scan_results_score_idx on public.scan_results (score);
+
+-- Make the new column types visible to PostgREST without a restart
+notify pgrst, 'reload schema';